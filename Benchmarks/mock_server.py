@@ -0,0 +1,421 @@
+#
+# Script: Local Freshservice / Freshstatus mock server
+#
+# Overview:
+# Stand-in for the endpoints the Freshservice and Freshstatus scripts use,
+# so they can be exercised and timed without touching a real tenant.
+# Serves paginated /api/v2/* lists, the solutions tree and the Freshstatus
+# /api/v1/groups|services|maintenance endpoints from a generated dataset,
+# with configurable size, latency, error rate and 429 rate limiting.
+#
+# Point the scripts at it with:
+#   FS_API_BASE=http://127.0.0.1:8080                  (Freshservice)
+#   FRESHSTATUS_API_BASE=http://127.0.0.1:8080/api/v1/  (Freshstatus)
+#
+# Usage:
+#   python mock_server.py --port 8080 --size 5000 --latency 0.05 --error-rate 0.01 --rate-limit 500
+
+import re
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+from typing import Dict, List, Optional, Tuple
+
+PER_PAGE_MAX = 100
+
+
+class MockConfig:
+    """Knobs for the mock server."""
+
+    def __init__(self, size: int = 1000, latency: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: int = 0, rate_window: float = 60.0, seed: int = 1):
+        self.size = size                # base record count; see build_dataset()
+        self.latency = latency          # seconds added to every response
+        self.error_rate = error_rate    # fraction of requests answered with a 503
+        self.rate_limit = rate_limit    # requests per rate_window before 429s (0 = unlimited)
+        self.rate_window = rate_window
+        self.seed = seed
+
+
+def _stamp(rng: random.Random) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1577836800 + rng.randrange(0, 5 * 365 * 86400)))
+
+
+def _now() -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+def _attachment(rng: random.Random, article_id: int) -> Dict:
+    size = rng.randint(1, 256) * 1024
+    return {'id': article_id * 10, 'name': f'attachment-{article_id}.pdf', 'content_type': 'application/pdf',
+            'size': size, 'attachment_url': f'https://s3.amazonaws.com/attachments/{article_id * 10}?size={size}',
+            'created_at': _stamp(rng), 'updated_at': _stamp(rng)}
+
+
+def attachment_body(attachment_id: int, size: int) -> bytes:
+    """Deterministic attachment contents; every third id repeats another's bytes."""
+    seed = attachment_id - attachment_id % 3
+    return (f'%PDF mock attachment {seed}\n'.encode() * (size // 20 + 1))[:size]
+
+
+def build_dataset(size: int, seed: int = 1) -> Dict:
+    """
+    Generates a deterministic dataset. Requesters, assets and tickets get
+    size records, service items size // 2, KB articles about size, and the
+    lookup tables size // 10 (at least 5).
+    """
+    rng = random.Random(seed)
+    small = max(5, size // 10)
+    words = ('vpn cisco printer email outlook password reset network wifi laptop monitor install '
+             'software license badge access release maintenance server backup').split()
+
+    def text(n):
+        return ' '.join(rng.choice(words) for _ in range(n))
+
+    data = {
+        'asset_types': [{'id': i, 'name': f'Type {i}', 'parent_asset_type_id': None,
+                         'created_at': _stamp(rng), 'updated_at': _stamp(rng)} for i in range(1, small + 1)],
+        'vendors': [{'id': i, 'name': f'Vendor {i}', 'created_at': _stamp(rng), 'updated_at': _stamp(rng)}
+                    for i in range(1, small + 1)],
+        'locations': [{'id': i, 'name': f'Location {i}', 'parent_location_id': None,
+                       'created_at': _stamp(rng), 'updated_at': _stamp(rng)} for i in range(1, small + 1)],
+        'products': [{'id': i, 'name': f'Product {i}', 'asset_type_id': rng.randint(1, small),
+                      'manufacturer': f'Maker {i % 7}', 'created_at': _stamp(rng), 'updated_at': _stamp(rng)}
+                     for i in range(1, small + 1)],
+        'assets': [{'id': i, 'display_id': i, 'name': f'Asset {i}', 'asset_type_id': rng.randint(1, small),
+                    'location_id': rng.randint(1, small), 'user_id': rng.randint(1, max(size, 1)),
+                    'department_id': None, 'type_fields': {f'vendor_{i % 5}': rng.randint(1, small)},
+                    'created_at': _stamp(rng), 'updated_at': _stamp(rng)} for i in range(1, size + 1)],
+        'requesters': [{'id': i, 'first_name': f'First{i}', 'last_name': f'Last{i}',
+                        'primary_email': f'user{i}@example.com', 'location_id': rng.randint(1, small),
+                        'active': rng.random() > 0.1, 'created_at': _stamp(rng), 'updated_at': _stamp(rng)}
+                       for i in range(1, size + 1)],
+        'service_items': [{'id': i, 'display_id': i, 'workspace_id': rng.choice([1, 2]), 'name': f'Item {i}',
+                           'category_id': rng.randint(1, 10), 'delivery_time': rng.randint(1, 72),
+                           'deleted': False, 'configs': {'attachment_mandatory': False},
+                           'description': f'<p>{text(40)}</p>', 'short_description': text(8), 'cost': 10.0,
+                           'custom_fields': [], 'child_items': [],
+                           'created_at': _stamp(rng), 'updated_at': _stamp(rng)} for i in range(1, size // 2 + 1)],
+        'workspaces': [{'id': i, 'name': f'Workspace {i}', 'state': 'active'} for i in (1, 2, 3)],
+        'sla_policies': [{'id': i, 'name': f'SLA {i}', 'workspace_id': 1 + i % 3} for i in range(1, 6)],
+        'ticket_form_fields': [{'id': i, 'name': f'field_{i}', 'label': f'Field {i}', 'field_type': 'custom_text'}
+                               for i in range(1, 21)],
+        'tickets': [{'id': i, 'subject': text(6), 'status': rng.randint(2, 5), 'priority': rng.randint(1, 4),
+                     'workspace_id': rng.choice([1, 2, 3]), 'description_text': text(30),
+                     'created_at': _stamp(rng), 'updated_at': _stamp(rng)} for i in range(1, size + 1)],
+    }
+
+    # Canned responses: folders of 5 responses each
+    data['canned_response_folders'] = []
+    data['canned_responses'] = {}
+    for f in range(1, max(1, size // 50) + 1):
+        data['canned_response_folders'].append({'id': f, 'name': f'Folder {f}', 'description': text(5),
+                                                'created_at': _stamp(rng), 'updated_at': _stamp(rng)})
+        data['canned_responses'][f] = [{'id': f * 100 + r, 'title': text(3), 'content': f'<p>{text(60)}</p>',
+                                        'created_at': _stamp(rng), 'updated_at': _stamp(rng)} for r in range(5)]
+
+    # Solutions: 3 categories x 10 folders, about size articles in total
+    per_folder = max(1, size // 30)
+    data['categories'] = [{'id': c, 'name': f'Category {c}', 'position': c} for c in (1, 2, 3)]
+    data['folders'] = []
+    data['articles'] = []
+    for c in (1, 2, 3):
+        for f in range(10):
+            folder_id = c * 100 + f
+            data['folders'].append({'id': folder_id, 'name': f'Folder {folder_id}', 'category_id': c,
+                                    'position': f + 1, 'visibility': 1, 'updated_at': _stamp(rng)})
+            for a in range(per_folder):
+                body = text(120)
+                data['articles'].append({
+                    'id': folder_id * 1000 + a, 'folder_id': folder_id, 'category_id': c, 'title': f'{text(4)} {a}',
+                    'description': f'<p>{body}</p>', 'description_text': body, 'status': 2, 'article_type': 1,
+                    'keywords': [rng.choice(words)], 'views': rng.randint(0, 500), 'thumbs_up': 0, 'thumbs_down': 0,
+                    'attachments': [_attachment(rng, folder_id * 1000 + a)] if a % 4 == 0 else [],
+                    'url': f'/support/solutions/articles/{folder_id * 1000 + a}',
+                    'created_at': _stamp(rng), 'updated_at': _stamp(rng)})
+
+    # Freshstatus groups and services
+    data['fs_groups'] = [{'id': g, 'name': f'Group {g}', 'parent': None if g <= 3 else 1 + g % 3, 'order': g}
+                         for g in range(1, 11)]
+    data['fs_services'] = [{'id': s, 'name': f'Service {s}', 'description': text(5), 'order': s,
+                            'group': dict(data['fs_groups'][s % 10]),
+                            'display_options': {'uptime_history_enabled': True}, 'status': 'OP'}
+                           for s in range(1, max(10, size // 10) + 1)]
+    data['fs_maintenance'] = []
+    return data
+
+
+class MockServer(ThreadingHTTPServer):
+    """HTTP server holding the dataset, config and request statistics."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: MockConfig):
+        super().__init__(address, MockHandler)
+        self.config = config
+        self.data = build_dataset(config.size, config.seed)
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        self.next_id = 10 ** 9
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.stats = Counter()
+            self.window = deque()
+
+    def new_id(self) -> int:
+        with self.lock:
+            self.next_id += 1
+            return self.next_id
+
+    def admit(self) -> Tuple[Optional[int], int]:
+        """
+        Applies rate limiting and error injection to a request.
+
+        Returns:
+            tuple: (status to fail with or None, remaining quota; for a 429,
+                   minus the seconds until the window frees a slot)
+        """
+        config = self.config
+        with self.lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            while self.window and now - self.window[0] > config.rate_window:
+                self.window.popleft()
+            if config.rate_limit and len(self.window) >= config.rate_limit:
+                self.stats['429'] += 1
+                return 429, -max(1, math.ceil(self.window[0] + config.rate_window - now))
+            self.window.append(now)
+            remaining = config.rate_limit - len(self.window) if config.rate_limit else 10 ** 6
+            if config.error_rate and self.rng.random() < config.error_rate:
+                self.stats['503'] += 1
+                return 503, remaining
+        return None, remaining
+
+
+class MockHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body=None, headers: Optional[Dict] = None) -> None:
+        payload = b'' if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode('utf-8'))
+        self.send_response(status)
+        if 'Content-Type' not in (headers or {}):
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.server.lock:
+            self.server.stats['bytes'] += len(payload)
+            self.server.stats[f'status_{status}'] += 1
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _handle(self, method: str) -> None:
+        server = self.server
+        if server.config.latency:
+            time.sleep(server.config.latency)
+
+        failure, remaining = server.admit()
+        limit_headers = {}
+        if server.config.rate_limit:
+            limit_headers = {'X-RateLimit-Total': str(server.config.rate_limit),
+                             'X-RateLimit-Remaining': str(max(remaining, 0))}
+        if failure == 429:
+            self._send(429, {'message': 'Rate limit exceeded'}, {**limit_headers, 'Retry-After': str(-remaining)})
+            return
+        if failure:
+            self._send(failure, {'message': 'Service unavailable'}, limit_headers)
+            return
+
+        parts = urlsplit(self.path)
+        # Both APIs take Basic auth (api_key:X for Freshservice, api_key:account for Freshstatus)
+        if parts.path.startswith('/api/') and not (self.headers.get('Authorization') or '').startswith('Basic '):
+            self._send(401, {'message': 'Authentication failed'}, limit_headers)
+            return
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        body = self._read_json() if method in ('POST', 'PUT') else None
+
+        try:
+            if parts.path.startswith('/attachments/'):
+                status, result, headers = attachment(int(parts.path.rsplit('/', 1)[1]), int(query['size']),
+                                                     self.headers.get('Range'))
+            else:
+                status, result, headers = route(server, method, parts.path.rstrip('/'), query, body)
+        except KeyError:
+            status, result, headers = 404, {'message': 'Not found'}, {}
+        self._send(status, result, {**limit_headers, **headers})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+
+def paginate(path: str, key: str, records: List[Dict], query: Dict) -> Tuple[int, Dict, Dict]:
+    """Slices a list Freshservice-style and adds a rel="next" Link header when more pages follow."""
+    per_page = min(int(query.get('per_page', 30)), PER_PAGE_MAX)
+    page = max(int(query.get('page', 1)), 1)
+    chunk = records[(page - 1) * per_page: page * per_page]
+    headers = {}
+    if page * per_page < len(records):
+        next_query = urlencode({**query, 'page': page + 1, 'per_page': per_page})
+        headers['Link'] = f'<{path}?{next_query}>; rel="next"'
+    return 200, {key: chunk}, headers
+
+
+def attachment(attachment_id: int, size: int, range_header: Optional[str]):
+    """Serves attachment contents, honouring 'Range: bytes=N-'."""
+    body = attachment_body(attachment_id, size)
+    headers = {'Content-Type': 'application/octet-stream', 'Accept-Ranges': 'bytes'}
+    match = re.fullmatch(r'bytes=(\d+)-', range_header or '')
+    if not match:
+        return 200, body, headers
+    start = int(match.group(1))
+    if start >= size:
+        return 416, b'', {**headers, 'Content-Range': f'bytes */{size}'}
+    return 206, body[start:], {**headers, 'Content-Range': f'bytes {start}-{size - 1}/{size}'}
+
+
+def route(server: MockServer, method: str, path: str, query: Dict, body: Optional[Dict]):
+    data = server.data
+
+    # Freshstatus public API
+    if path.startswith('/api/v1/'):
+        resource = path[len('/api/v1/'):]
+        if method == 'GET' and resource in ('groups', 'services', 'maintenance'):
+            return 200, {'results': data['fs_' + resource]}, {}
+        if method == 'POST' and resource == 'groups':
+            group = {'id': server.new_id(), 'name': body['name'], 'parent': body.get('parent_id') or body.get('parent'),
+                     'order': body.get('order', 0)}
+            data['fs_groups'].append(group)
+            return 201, group, {}
+        if method == 'POST' and resource == 'services':
+            group = next((g for g in data['fs_groups'] if g['id'] == body.get('group')), None)
+            service = {**body, 'id': server.new_id(), 'group': dict(group) if group else None}
+            data['fs_services'].append(service)
+            return 201, service, {}
+        if method == 'PUT' and resource.split('/')[0] in ('groups', 'services'):
+            kind, record_id = resource.split('/')[0], int(resource.split('/')[1])
+            record = next((r for r in data['fs_' + kind] if r['id'] == record_id), None)
+            if record is None:
+                return 404, {'detail': 'Not found.'}, {}
+            record.update({k: v for k, v in body.items() if k not in ('id', 'group')})
+            return 200, record, {}
+        if method == 'POST' and resource == 'maintenance':
+            maintenance = {**body, 'id': server.new_id()}
+            data['fs_maintenance'].append(maintenance)
+            return 201, maintenance, {}
+        raise KeyError(path)
+
+    # Teams webhook stand-in (pymsteams expects a body of "1")
+    if path == '/webhook':
+        return 200, b'1', {}
+
+    if not path.startswith('/api/v2/'):
+        raise KeyError(path)
+    resource = path[len('/api/v2/'):]
+
+    if method == 'GET':
+        if resource in ('asset_types', 'vendors', 'locations', 'products', 'assets', 'requesters'):
+            return paginate(path, resource, data[resource], query)
+        if resource == 'service_catalog/items':
+            items = data['service_items']
+            if query.get('workspace_id') not in (None, '0'):
+                items = [i for i in items if str(i['workspace_id']) == query['workspace_id']]
+            return paginate(path, 'service_items', items, query)
+        if resource == 'tickets':
+            tickets = data['tickets']
+            if query.get('updated_since'):
+                tickets = [t for t in tickets if t['updated_at'] >= query['updated_since']]
+            if query.get('workspace_id') not in (None, '0'):
+                tickets = [t for t in tickets if str(t['workspace_id']) == query['workspace_id']]
+            # The real endpoint sorts by created_at unless told otherwise
+            field = query.get('order_by', 'created_at')
+            tickets = sorted(tickets, key=lambda t: (t[field], t['id']), reverse=query.get('order_type') == 'desc')
+            return paginate(path, 'tickets', tickets, query)
+        if resource in ('workspaces', 'sla_policies', 'ticket_form_fields'):
+            return 200, {resource: data[resource]}, {}
+        if resource == 'canned_response_folders':
+            return paginate(path, resource, data[resource], query)
+        match = re.fullmatch(r'canned_response_folders/(\d+)/canned_responses', resource)
+        if match:
+            return 200, {'canned_responses': data['canned_responses'][int(match.group(1))]}, {}
+        if resource == 'solutions/categories':
+            return 200, {'categories': data['categories']}, {}
+        if resource == 'solutions/folders':
+            folders = [f for f in data['folders'] if str(f['category_id']) == query.get('category_id')]
+            return paginate(path, 'folders', folders, {'per_page': PER_PAGE_MAX, **query})
+        if resource == 'solutions/articles':
+            articles = [a for a in data['articles'] if str(a['folder_id']) == query.get('folder_id')]
+            return paginate(path, 'articles', articles, {'per_page': PER_PAGE_MAX, **query})
+        if resource == 'solutions/articles/search':
+            term = query.get('search_term', '').lower()
+            return 200, {'articles': [a for a in data['articles'] if term in a['title'].lower()]}, {}
+
+    if method in ('POST', 'PUT') and resource.startswith('solutions/'):
+        kind, _, record_id = resource[len('solutions/'):].partition('/')
+        key = {'folders': 'folder', 'articles': 'article'}[kind]
+        # The server stamps records on create and update, as the real API does
+        now = _now()
+        if method == 'POST':
+            record = {**body, 'id': server.new_id(), 'created_at': now, 'updated_at': now}
+            data[kind].append(record)
+            return 201, {key: record}, {}
+        record = next(r for r in data[kind] if str(r['id']) == record_id)
+        record.update({k: v for k, v in body.items() if k not in ('id', 'created_at')}, updated_at=now)
+        return 200, {key: record}, {}
+
+    raise KeyError(path)
+
+
+def start_server(config: MockConfig, host: str = '127.0.0.1', port: int = 0) -> MockServer:
+    """Starts the mock server on a background thread; port 0 picks a free port."""
+    server = MockServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Freshservice/Freshstatus mock server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--size', type=int, default=1000, help='Base dataset size (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with 503')
+    parser.add_argument('--rate-limit', type=int, default=0, help='Requests per window before 429 (0 = off)')
+    parser.add_argument('--rate-window', type=float, default=60.0, help='Rate-limit window in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    config = MockConfig(args.size, args.latency, args.error_rate, args.rate_limit, args.rate_window, args.seed)
+    server = MockServer((args.host, args.port), config)
+    print(f"Mock server listening on http://{args.host}:{server.server_port} (size {args.size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Requests served: {dict(server.stats)}")
+
+
+if __name__ == "__main__":
+    main()
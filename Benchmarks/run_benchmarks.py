@@ -0,0 +1,176 @@
+#
+# Script: Freshservice / Freshstatus benchmark suite
+#
+# Overview:
+# Runs each exporter and the Freshstatus push/publish flows against the
+# local mock server (mock_server.py) and reports wall time, requests/sec
+# and peak memory per scenario. Every scenario runs as its own process in a
+# scratch directory whose HOME holds mock API keys and webhooks, so nothing
+# is written next to the scripts or under the real home directory.
+#
+# Usage:
+#   python run_benchmarks.py
+#   python run_benchmarks.py --size 5000 --latency 0.02 --rate-limit 500 --only KB_Import FSAssets
+#   python run_benchmarks.py --json results.json
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from typing import Dict, List, Optional
+
+from mock_server import MockConfig, start_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRESHSERVICE = os.path.join(ROOT, 'Freshservice')
+FRESHSTATUS = os.path.join(ROOT, 'Freshstatus')
+
+# Name -> (script, stdin lines). FSAssets and FSSolutions write under their
+# hard-coded Downloads path, which resolves relative to the scratch directory.
+SCENARIOS = {
+    'KB_Import': (os.path.join(FRESHSERVICE, 'KB_Import.py'), []),
+    'CR_Import': (os.path.join(FRESHSERVICE, 'CR_Import.py'), []),
+    'SR_Import': (os.path.join(FRESHSERVICE, 'SR_Import.py'), []),
+    'Tickets_Import': (os.path.join(FRESHSERVICE, 'Tickets_Import.py'), []),
+    'FSAssets': (os.path.join(FRESHSERVICE, 'FSAssets.py'), []),
+    'FSSolutions': (os.path.join(FRESHSERVICE, 'FSSolutions.py'), []),
+    'list_workspaces': (os.path.join(FRESHSERVICE, 'list_workspaces.py'), []),
+    'print_sla': (os.path.join(FRESHSERVICE, 'print_sla.py'), []),
+    'freshstatus_push': (os.path.join(FRESHSTATUS, '_freshstatus_push.py'), ['bench', '{backup}', 'yes']),
+    'freshstatus_publish': (os.path.join(FRESHSTATUS, '_freshstatus_publish.py'),
+                            ['9.9.9', '', 'yes', '', '', '', '', '', 'yes']),
+}
+
+FRESHSTATUS_ACCOUNTS = ['kore', 'hts-texas', 'bench']
+
+
+def prepare_workdir(workdir: str, base_url: str, server) -> None:
+    """Writes mock secrets, a push backup file and the Downloads tree into workdir."""
+    secrets = os.path.join(workdir, '.secrets')
+    os.makedirs(secrets, exist_ok=True)
+    for acct in FRESHSTATUS_ACCOUNTS:
+        with open(os.path.join(secrets, f'freshstatus_{acct}.key'), 'w') as file:
+            file.write('mock-key')
+    with open(os.path.join(secrets, 'freshstatus_htseng.webhook'), 'w') as file:
+        json.dump([{'webhook_name': 'StatusPublisher', 'teams_webhook': base_url + '/webhook'}], file)
+
+    # Backup in the shape _freshstatus_fetch.py saves: the mock's own groups
+    # and services under new names, so push has everything to create.
+    groups = [{**g, 'name': g['name'] + ' (restored)'} for g in server.data['fs_groups']]
+    services = [{**s, 'name': s['name'] + ' (restored)',
+                 'group': {**s['group'], 'name': s['group']['name'] + ' (restored)'} if s.get('group') else None}
+                for s in server.data['fs_services']]
+    with open(os.path.join(workdir, 'freshstatus_backup.json'), 'w') as file:
+        json.dump({'groups': groups, 'services': services}, file)
+
+    os.makedirs(os.path.join(workdir, 'C:', 'Users', 'nestor.sanchez', 'Downloads'), exist_ok=True)
+
+
+def run_scenario(name: str, workdir: str, env: Dict[str, str]) -> Dict:
+    """
+    Runs one scenario to completion.
+
+    Returns:
+        dict: name, exit status, wall time (s), peak RSS (MB) and the log path.
+    """
+    script, lines = SCENARIOS[name]
+    stdin = '\n'.join(line.format(backup=os.path.join(workdir, 'freshstatus_backup.json')) for line in lines) + '\n'
+    log_path = os.path.join(workdir, name + '.log')
+
+    read_fd, write_fd = os.pipe()
+    start = time.perf_counter()
+    with open(log_path, 'wb') as log:
+        pid = os.fork()
+        if pid == 0:
+            os.dup2(read_fd, 0)
+            os.dup2(log.fileno(), 1)
+            os.dup2(log.fileno(), 2)
+            os.close(write_fd)
+            os.chdir(workdir)
+            try:
+                os.execve(sys.executable, [sys.executable, script], env)
+            finally:
+                os._exit(127)
+        os.close(read_fd)
+        with os.fdopen(write_fd, 'w') as pipe:
+            try:
+                pipe.write(stdin)
+            except BrokenPipeError:
+                pass
+        _, status, usage = os.wait4(pid, 0)
+    wall = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return {'scenario': name, 'exit': os.waitstatus_to_exitcode(status), 'wall_s': round(wall, 3),
+            'peak_rss_mb': round(peak, 1), 'log': log_path}
+
+
+def print_table(results: List[Dict]) -> None:
+    header = f"{'Scenario':<22}{'Exit':>5}{'Wall (s)':>10}{'Requests':>10}{'Req/s':>9}{'429s':>6}{'5xx':>6}{'MB out':>9}{'Peak RSS (MB)':>15}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['scenario']:<22}{r['exit']:>5}{r['wall_s']:>10.2f}{r['requests']:>10}{r['requests_per_s']:>9.1f}"
+              f"{r['throttled']:>6}{r['errors']:>6}{r['mb_served']:>9.2f}{r['peak_rss_mb']:>15.1f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmark the Freshservice/Freshstatus scripts against a local mock.')
+    parser.add_argument('--size', type=int, default=1000, help='Mock dataset size (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with 503')
+    parser.add_argument('--rate-limit', type=int, default=0, help='Requests per window before 429 (0 = off)')
+    parser.add_argument('--rate-window', type=float, default=60.0, help='Rate-limit window in seconds')
+    parser.add_argument('--only', nargs='+', choices=list(SCENARIOS), help='Scenarios to run (default: all)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch directory (exports and logs)')
+    args = parser.parse_args(argv)
+
+    config = MockConfig(args.size, args.latency, args.error_rate, args.rate_limit, args.rate_window)
+    server = start_server(config)
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    workdir = tempfile.mkdtemp(prefix='fs_bench_')
+    prepare_workdir(workdir, base_url, server)
+
+    env = dict(os.environ, HOME=workdir, USERPROFILE=workdir, PYTHONUNBUFFERED='1',
+               FS_API_BASE=base_url, FRESHSTATUS_API_BASE=base_url + '/api/v1/')
+    env.pop('DRY_RUN', None)
+
+    results = []
+    try:
+        for name in args.only or SCENARIOS:
+            server.reset_stats()
+            result = run_scenario(name, workdir, env)
+            stats = server.stats
+            result.update({'requests': stats['requests'],
+                           'requests_per_s': round(stats['requests'] / result['wall_s'], 1) if result['wall_s'] else 0.0,
+                           'throttled': stats['429'], 'errors': stats['503'],
+                           'mb_served': round(stats['bytes'] / (1024 * 1024), 2)})
+            results.append(result)
+            if result['exit'] != 0:
+                print(f"{name} exited with {result['exit']}, see {result['log']}")
+    finally:
+        server.shutdown()
+
+    print(f"\nDataset size {args.size}, latency {args.latency}s, error rate {args.error_rate}, "
+          f"rate limit {args.rate_limit or 'off'}\n")
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'config': vars(args), 'results': results}, file, indent=4)
+
+    if args.keep:
+        print(f"\nScratch directory kept at {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return 1 if any(r['exit'] != 0 for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
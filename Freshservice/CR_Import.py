@@ -1,6 +1,9 @@
-import requests
-import json
-import csv
+from _freshservice_api import api_get
+from _freshservice_paginate import iter_pages
+from _freshservice_export import CSVStream, ParquetStream
+from _freshservice_checkpoint import Checkpoint, is_resume_mode
+from _freshservice_blobs import BlobStore
+from _freshservice_json import loads
 from datetime import datetime
 
 # Define the API key and domain
@@ -8,64 +11,51 @@ api_key = '[redacted]'
 domain = 'hts'
 headers = {'Content-Type': 'application/json'}
 
-# Function to fetch canned response folders with pagination
-def fetch_canned_response_folders(page):
-    canned_response_folders_url = f'https://{domain}.freshservice.com/api/v2/canned_response_folders?per_page=100&page={page}'
-    response = requests.get(canned_response_folders_url, headers=headers, auth=(api_key, 'X'))
-    return json.loads(response.text)
+# Output format: 'csv', or 'parquet' for a typed columnar file (needs pyarrow)
+output_format = 'csv'
+
+# Blob store for response content and folder descriptions: when set, bodies
+# over 1 KB are written once, compressed, under their hash and the rows hold
+# a blob:sha256:<hash> reference instead (see _freshservice_blobs)
+blob_dir = None
+blobs = BlobStore(blob_dir) if blob_dir else None
+
+# Function to move a large body to the blob store, if one is configured
+def body_ref(body):
+    return blobs.put(body) if blobs else body
+
+# Function to build the URL of a page of canned response folders
+def canned_response_folders_url(page):
+    return f'https://{domain}.freshservice.com/api/v2/canned_response_folders?per_page=100&page={page}'
 
 # Function to fetch canned responses for a specific folder
 def fetch_canned_responses(folder_id):
     canned_responses_url = f'https://{domain}.freshservice.com/api/v2/canned_response_folders/{folder_id}/canned_responses'
-    response = requests.get(canned_responses_url, headers=headers, auth=(api_key, 'X'))
-    return json.loads(response.text)
-
-# List to store canned response folder information
-rowCannedResponseFolders = []
-page = 1
-
-while True:
-    canned_response_folders = fetch_canned_response_folders(page)
-    folders = canned_response_folders['canned_response_folders']
-    
-    if not folders:
-        break
-    
-    for folder in folders:
-        folder_info = {
+    response = api_get(canned_responses_url, headers=headers, auth=(api_key, 'X'))
+    return loads(response.content)
+
+# Function to build the CSV rows for one folder and its canned responses
+def rows_canned_responses(folder):
+    canned_responses = fetch_canned_responses(folder['id'])
+    for response in canned_responses['canned_responses']:
+        yield {
             'Folder ID': folder['id'],
             'Folder Name': folder['name'],
-            'Folder Description': folder.get('description', ''),
+            'Folder Description': body_ref(folder.get('description', '')),
             'Folder Created At': folder['created_at'],
             'Folder Updated At': folder['updated_at'],
-            'Canned Responses': []
+            'Response ID': response['id'],
+            'Response Title': response['title'],
+            'Response Content': body_ref(response['content']),
+            'Response Created At': response['created_at'],
+            'Response Updated At': response['updated_at']
         }
-        
-        # Fetch canned responses for the current folder
-        canned_responses = fetch_canned_responses(folder['id'])
-        responses = canned_responses['canned_responses']
-        
-        for response in responses:
-            folder_info['Canned Responses'].append({
-                'Response ID': response['id'],
-                'Response Title': response['title'],
-                'Response Content': response['content'],
-                'Response Created At': response['created_at'],
-                'Response Updated At': response['updated_at']
-            })
-        
-        rowCannedResponseFolders.append(folder_info)
-    
-    if len(folders) < 100:
-        break
-    
-    page += 1
 
 # Get the current timestamp and format it
 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
 # Define the CSV file name with timestamp
-csv_file = f'Freshservice_Canned_Response_Folders_Export_{domain}_{timestamp}.csv'
+csv_file = f'Freshservice_Canned_Response_Folders_Export_{domain}_{timestamp}.{output_format}'
 
 # Define the CSV headers
 csv_headers = [
@@ -73,23 +63,50 @@ csv_headers = [
     'Response ID', 'Response Title', 'Response Content', 'Response Created At', 'Response Updated At'
 ]
 
-# Write the canned response folders and responses to the CSV file
-with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.DictWriter(file, fieldnames=csv_headers)
-    writer.writeheader()
-    for folder in rowCannedResponseFolders:
-        for response in folder['Canned Responses']:
-            writer.writerow({
-                'Folder ID': folder['Folder ID'],
-                'Folder Name': folder['Folder Name'],
-                'Folder Description': folder['Folder Description'],
-                'Folder Created At': folder['Folder Created At'],
-                'Folder Updated At': folder['Folder Updated At'],
-                'Response ID': response['Response ID'],
-                'Response Title': response['Response Title'],
-                'Response Content': response['Response Content'],
-                'Response Created At': response['Response Created At'],
-                'Response Updated At': response['Response Updated At']
-            })
-
-print(f"All canned response folders and their responses have been exported to {csv_file}.")
\ No newline at end of file
+# Define the column types for parquet output
+parquet_schema = {
+    'Folder ID': 'int', 'Folder Name': 'string', 'Folder Description': 'string',
+    'Folder Created At': 'timestamp', 'Folder Updated At': 'timestamp',
+    'Response ID': 'int', 'Response Title': 'string', 'Response Content': 'string',
+    'Response Created At': 'timestamp', 'Response Updated At': 'timestamp'
+}
+
+# Journal every completed page of folders (with their response rows) so an
+# interrupted run can continue with --resume
+checkpoint = Checkpoint(f'Freshservice_Canned_Response_Folders_Export_{domain}.checkpoint',
+                        {'csv_file': csv_file}, resume=is_resume_mode())
+csv_file = checkpoint.meta['csv_file']
+
+# Stream the canned response folders and responses to the output file a page at a time
+if output_format == 'parquet':
+    stream = ParquetStream(csv_file, parquet_schema)
+else:
+    stream = CSVStream(csv_file, csv_headers)
+
+with stream:
+    page = 1
+    size = None
+
+    # Replay the pages an interrupted run already fetched
+    for page, rows, size in checkpoint.pages():
+        stream.write_page(rows)
+        page += 1
+
+    # Fetch the remaining pages of folders a few ahead of the one being written
+    pages = iter_pages(canned_response_folders_url, 'canned_response_folders', auth=(api_key, 'X'),
+                       headers=headers, start=page) if size is None or size == 100 else []
+
+    for page, canned_response_folders in pages:
+        folders = canned_response_folders['canned_response_folders']
+        size = len(folders)
+
+        rows = [row for folder in folders for row in rows_canned_responses(folder)]
+        checkpoint.save_page(page, rows, size)
+
+        stream.write_page(rows)
+
+checkpoint.finish()
+
+print(f"All canned response folders and their responses have been exported to {csv_file}.")
+if blobs:
+    print(blobs.summary())
\ No newline at end of file
@@ -5,8 +5,14 @@
 # 2023-06-07    created by nestor.sanchez@hts.com
 
 
-import requests
+from _freshservice_paginate import iter_pages as fetch_pages
+from _freshservice_export import NDJSONStream
+from _freshservice_mirror import AssetMirror
+from _freshservice_records import RecordTable, Record, Asset, Requester
+from _freshservice_checkpoint import Checkpoint, is_resume_mode
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 path = 'C:/Users/nestor.sanchez/Downloads/'
 option = 0
@@ -17,6 +23,15 @@ actions = {
 auth = ('[redacted]', 'hts')
 ver = 0.1
 debug = 1
+concurrent = 1      # fetch all resources at once when option is 0
+max_workers = 4     # page requests in flight, shared across all resources
+prefetch = 4        # pages of one resource requested ahead of the one being written
+output = 'ndjson'   # 'ndjson' streams one record per line, 'json' writes the legacy dump,
+                    # 'sqlite' updates the local mirror database in place
+mirror_db = path + 'Freshservice_Mirror.db'
+compression = 'gzip'    # 'gzip', 'zstd' or None, for ndjson output
+
+_slots = threading.BoundedSemaphore(max_workers)
 
 
 if not debug:
@@ -28,49 +43,126 @@ if not debug:
     #if userOpt != "Y": endMe()
 
 
-def build_data(sel=''):
-
-    import uuid
-    from datetime import datetime
+def iter_pages(sel=''):
 
+    # every page is journaled so an interrupted run can continue with --resume
+    checkpoint = Checkpoint(path + 'Exported_FS_Data-' + sel + '.checkpoint', resume=is_resume_mode())
     page=0
     count = 100
-    getResponse = dict([])
-    
-    while count == 100:
 
-        page += 1;     
-        headers = {'Content-Type': 'application/json'}
-        url = 'https://hts.freshservice.com/api/v2/' + sel + '?per_page=100&page=' + str(page)
-        rawResponse = requests.get(url, headers=headers, auth=auth)
-        rawResponse = json.loads(rawResponse.content.decode("utf-8")) if type(rawResponse.content) is bytes else rawResponse.content
-        if rawResponse.get("errors"): print( 'Something went wrong! /n' + rawResp['errors']); exit()
+    for page, records, count in checkpoint.pages():
+        yield {sel: records}
+
+    url = 'https://hts.freshservice.com/api/v2/' + sel + '?per_page=100&page='
+    if sel == 'assets' and output == 'sqlite': url = url.replace('?', '?include=type_fields&')    # vendor lives in type_fields
+
+    # later pages are fetched ahead while this one is written; _slots caps the requests in flight
+    pages = fetch_pages(lambda page: url + str(page), sel, auth=auth, headers={'Content-Type': 'application/json'},
+                        start=page + 1, window=prefetch, slots=_slots) if count == 100 else []
+
+    for page, rawResponse in pages:
+        if rawResponse.get("errors") or sel not in rawResponse: print( 'Something went wrong! /n' + str(rawResponse.get('errors', rawResponse))); exit()
 
-        count = len( rawResponse[sel] )
+        checkpoint.save_page(page, rawResponse[sel])
+        yield rawResponse
 
-        if getResponse: getResponse[sel] = getResponse[sel] + rawResponse[sel] 
-        else: getResponse = rawResponse
+        if page > 1: print('Over 100 results for \"' +sel+ '\", admending list...')
 
-        if count == 100: print('Over 100 results for \"' +sel+ '\", admending list...'); continue
-        else: break
+    checkpoint.finish()
+
+
+def build_data(sel=''):
+
+    # slotted records with the heavy fields packed keep a full export in memory cheaply
+    getResponse = {sel: RecordTable({'assets': Asset, 'requesters': Requester}.get(sel, Record))}
+
+    for rawResponse in iter_pages(sel):
+        getResponse[sel].extend(rawResponse[sel])
 
     print( 'Total ' + sel + ' type found: ' + str(len(getResponse[sel])) + '\n' )
     return getResponse 
 
 
+def write_json(f, payload):
+
+    # same text as json.dumps(payload, indent = 4), written one record at a time
+    f.write('{')
+    for n, (sel, table) in enumerate(payload.items()):
+        f.write((',' if n else '') + '\n    ' + json.dumps(sel) + ': [')
+        for i, record in enumerate(table):
+            f.write((',' if i else '') + '\n        ' + json.dumps(record.to_dict(), indent = 4).replace('\n', '\n        '))
+        f.write('\n    ]' if len(table) else ']')
+    f.write('\n}' if payload else '}')
+
+
+def export_data(sel='', stream=None):
+
+    total = 0
+
+    for rawResponse in iter_pages(sel):
+        total += stream.write_page({'resource': sel, 'record': record} for record in rawResponse[sel])
+
+    print( 'Total ' + sel + ' type found: ' + str(total) + '\n' )
+    return total
+
+
+def mirror_data(sel='', mirror=None):
+
+    import time
+
+    total = 0
+    started = time.time()
+
+    for rawResponse in iter_pages(sel):
+        total += mirror.upsert_page(sel, rawResponse[sel], started)
+
+    removed = mirror.prune(sel, started, total)
+    print( 'Total ' + sel + ' type mirrored: ' + str(total) + ', removed: ' + str(removed) + '\n' )
+    return total
+
+
 def main():
     
     from datetime import datetime
 
     payload = {}
-    
-    if not option:        
-        for i in actions.keys(): payload.update(build_data(actions[i]))    
-    else: payload.update(build_data(actions[option]))
-    
+    selected = list(actions.values()) if not option else [actions[option]]
     t = datetime.now().strftime("-%Y%m%d%H%M")
+
+    if output == 'sqlite':
+        with AssetMirror(mirror_db) as mirror:
+            if concurrent and len(selected) > 1:
+                # one thread per resource; _slots caps the requests actually in flight
+                with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+                    list(pool.map(lambda sel: mirror_data(sel, mirror), selected))
+            else:
+                for sel in selected: mirror_data(sel, mirror)
+
+        print( mirror_db +' mirror updated. \n' )
+        return
+
+    if output == 'ndjson':
+        ext = {'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}.get(compression, '.ndjson')
+        with NDJSONStream(fname := (path + 'Exported_FS_Data' + t + ext), compression) as stream:
+            if concurrent and len(selected) > 1:
+                # one thread per resource; _slots caps the requests actually in flight
+                with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+                    list(pool.map(lambda sel: export_data(sel, stream), selected))
+            else:
+                for sel in selected: export_data(sel, stream)
+
+        print( fname +' file generated. \n' )
+        return
+
+    if concurrent and len(selected) > 1:
+        # one thread per resource; _slots caps the requests actually in flight
+        with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+            for result in pool.map(build_data, selected): payload.update(result)
+    else:
+        for sel in selected: payload.update(build_data(sel))
+    
     f = open( fname := (path + 'Exported_FS_Data' +t + '.json'), 'w',  encoding="utf-8")
-    f.write(str(json.dumps(payload, indent = 4)))
+    write_json(f, payload)
     f.close()
 
     print( fname +' file generated. \n' )
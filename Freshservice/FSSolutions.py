@@ -6,12 +6,26 @@
 
 # fpath value: Change the values of the destgination 
 # folder where you want to create the directories
-# fcat value: this is in teh URL of the desired solutions catalog.
+# fcats value: the ids in the URL of the desired solutions catalogs,
 # i.e. https://hts.freshservice.com/a/solutions/categories/4000040529
-
-import requests
+# Leave the list empty to mirror every category. Each category is written
+# to its own directory under fpath.
+# A manifest of article updated_at values and content hashes is kept in
+# fpath, so unchanged articles are not rewritten. Files of articles that
+# were renamed, moved or deleted since the last run are removed.
+# blob_dir value: article bodies are stored once, compressed, in this
+# content-addressed store and the .json files reference them by hash
+# (see _freshservice_blobs); no .html copy of the body is written then.
+# Set to None to keep bodies inline and write a readable .html per article.
+
+from _freshservice_api import api_get
+from _freshservice_blobs import BlobStore, BLOB_DIR
+from _freshservice_json import loads
 import json
 import datetime
+import hashlib
+import os.path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tabulate import tabulate
 from colorama import Fore, Style
 
@@ -32,15 +46,26 @@ auth = ('[redacted]', 'hts')
 
 
 fpath = 'C:/Users/nestor.sanchez/Downloads/'
-fcat = '4000040529' #TRAX Knowledge Base
+fcats = ['4000040529'] #TRAX Knowledge Base
+max_workers = 8
+manifest_file = fpath + 'solutions_manifest.json'
+blob_dir = fpath + BLOB_DIR
+headers = {'Content-Type': 'application/json'}
+
+blobs = BlobStore(blob_dir) if blob_dir else None
 
-def ArticlesFunc(fAbsPath='', rawResp={}):
+def ArticlesFunc(fAbsPath='', rawResp={}, html=True):
 
-    # make JSON file
+    # make JSON file, with the body moved to the blob store
     f = open( fAbsPath + '.json', 'w',  encoding="utf-8")
-    f.write(str(json.dumps(rawResp, indent = 4)))
+    f.write(str(json.dumps(dict(rawResp, description=blobs.put(rawResp['description'])) if blobs else rawResp, indent = 4)))
     f.close()
 
+    # with a blob store the body is kept there only, so an .html copy from an earlier run goes
+    if blobs:
+        if os.path.exists(fAbsPath + '.html'): os.remove(fAbsPath + '.html')
+        return
+    if not html: return
 
     # make HTML file
     f = open( fAbsPath + '.html', 'w',  encoding="utf-8")
@@ -60,40 +85,106 @@ def ArticlesFunc(fAbsPath='', rawResp={}):
     f.write(ftemplate % (ftitle, fbody))
     f.close()
 
-import os.path
+def getJSON(url):
+    getResponse = api_get(url, headers=headers, auth=auth)
+    return loads(getResponse.content)
 
-# get folders list and create directories if not found
-url = 'https://hts.freshservice.com/api/v2/solutions/folders?category_id=' + fcat
-headers = {'Content-Type': 'application/json'}
-getResponse = requests.get(url, headers=headers, auth=auth)
-rawResp = getResponse.content
+def safeName(name):
+    return name.replace( '/', '-').strip()
 
-if type(getResponse.content) is bytes: rawResp = json.loads(rawResp.decode("utf-8"))
-foldList = []
+def contentHash(rawResp):
+    return hashlib.sha256((str(rawResp['title']) + '\0' + str(rawResp['description'])).encode('utf-8')).hexdigest()
 
-for i in range(len(rawResp['folders'])):
-    
-    fname = (str(rawResp['folders'][i]['position']) + '. ' + rawResp['folders'][i]['name']).replace( '/', '-').strip()
-    foldList.append([fname, rawResp['folders'][i]['id']])
+def loadManifest():
+    if not os.path.exists(manifest_file): return {'folders': {}}
+    with open(manifest_file, 'r', encoding='utf-8') as f: return json.load(f)
 
-    if not os.path.exists(fpath + fname): os.mkdir(fpath + fname); print(fname)
-    else: print('Directory ' + fname + ' exists, skipping.')
-
-for i in range(len(foldList)):
-    url = 'https://hts.freshservice.com/api/v2/solutions/articles?folder_id=' + str(foldList[i][1])
-    headers = {'Content-Type': 'application/json'}
-    getResponse = requests.get(url, headers=headers, auth=auth)
-    rawResp = getResponse.content
-    fname = foldList[i][0] + '/'
-
-    if type(getResponse.content) is bytes: rawResp = json.loads(rawResp.decode("utf-8"))
-
-    for i in range(len(rawResp['articles'])):
-
-        if not os.path.exists(fpath + fname + (ftitle := (rawResp['articles'][i]['title'].replace( '/', '-').strip()))):
-            print('Generating files for article ' + fname + ftitle + '.')
-            ArticlesFunc(fpath + fname + ftitle, rawResp['articles'][i])
-        else: print('Article ' + fname + ftitle + ' exists, skipping.')
-            
-
-print('end')
\ No newline at end of file
+def saveManifest(manifest):
+    f = open( manifest_file + '.tmp', 'w',  encoding="utf-8")
+    f.write(str(json.dumps(manifest, indent = 4)))
+    f.close()
+    os.replace(manifest_file + '.tmp', manifest_file)
+
+def MirrorFolder(cpath='', folder={}, manifest={}, known_articles={}):
+
+    # returns the folder's new manifest entry and how many articles were written/skipped;
+    # the article list is always requested, since an edited article does not always move the folder's updated_at
+    fname = safeName(str(folder['position']) + '. ' + folder['name']) + '/'
+    if not os.path.exists(cpath + fname): os.mkdir(cpath + fname); print(cpath + fname)
+
+    rawResp = getJSON('https://hts.freshservice.com/api/v2/solutions/articles?folder_id=' + str(folder['id']))
+    entries = {}
+    written = skipped = 0
+
+    for article in rawResp['articles']:
+
+        ftitle = safeName(article['title'])
+        digest = contentHash(article)
+        prev = known_articles.get(str(article['id']))
+        entries[str(article['id'])] = {'updated_at': article['updated_at'], 'hash': digest, 'path': cpath + fname + ftitle}
+
+        if prev and prev['path'] == cpath + fname + ftitle and os.path.exists(cpath + fname + ftitle + '.json') \
+                and prev['updated_at'] == article['updated_at']:
+            skipped += 1; continue
+
+        # metadata-only change: the HTML body is the same, only the JSON needs rewriting
+        sameBody = prev and prev['hash'] == digest and prev['path'] == cpath + fname + ftitle and \
+            os.path.exists(cpath + fname + ftitle + '.html')
+        print('Generating files for article ' + fname + ftitle + '.')
+        ArticlesFunc(cpath + fname + ftitle, article, html=not sameBody)
+        written += 1
+
+    return {'updated_at': folder['updated_at'], 'articles': entries}, written, skipped
+
+def main():
+
+    manifest = loadManifest()
+    known_articles = {aid: a for f in manifest['folders'].values() for aid, a in f['articles'].items()}
+
+    # get categories, then folders per category and create directories if not found
+    categories = getJSON('https://hts.freshservice.com/api/v2/solutions/categories')['categories']
+    if fcats: categories = [c for c in categories if str(c['id']) in fcats]
+
+    written = skipped = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+        folderLists = {pool.submit(getJSON, 'https://hts.freshservice.com/api/v2/solutions/folders?category_id=' + str(c['id'])): c
+                       for c in categories}
+        folderJobs = []
+
+        for future in as_completed(folderLists):
+            category = folderLists[future]
+            cpath = fpath + safeName(category['name']) + '/'
+            if not os.path.exists(cpath): os.mkdir(cpath); print(cpath)
+            for folder in future.result()['folders']:
+                folderJobs.append((category, folder, pool.submit(MirrorFolder, cpath, folder, manifest, known_articles)))
+
+        folders = {}
+        for category, folder, future in folderJobs:
+            entry, w, s = future.result()
+            folders[str(folder['id'])] = dict(entry, category_id=category['id'])
+            written += w; skipped += s
+
+    # keep manifest entries for categories that were not part of this run
+    mirrored = {str(c['id']) for c in categories}
+    for fid, entry in manifest['folders'].items():
+        if fid not in folders and str(entry.get('category_id')) not in mirrored: folders[fid] = entry
+
+    # files left behind by articles that were renamed, moved or deleted; blobs are shared by hash and kept
+    current = {a['path'] for f in folders.values() for a in f['articles'].values()}
+    removed = 0
+    for fid, entry in manifest['folders'].items():
+        if str(entry.get('category_id')) not in mirrored: continue
+        for a in entry['articles'].values():
+            if a['path'] in current: continue
+            stale = [a['path'] + ext for ext in ('.json', '.html') if os.path.exists(a['path'] + ext)]
+            for fstale in stale: os.remove(fstale)
+            if stale: removed += len(stale); print('Removed files of renamed or deleted article ' + a['path'] + '.')
+
+    saveManifest({'folders': folders})
+    print(str(written) + ' articles written, ' + str(skipped) + ' unchanged, ' + str(removed) + ' stale files removed.')
+    if blobs: print(blobs.summary())
+
+main()
+
+print('end')
@@ -0,0 +1,176 @@
+# Python script to restore a solutions tree exported by FSSolutions.py
+# into a Freshservice category using REST operations
+# Freshservice API documentation can be found at
+# https://api.freshservice.com/
+
+# fpath value: the folder FSSolutions.py exported to (its fpath)
+# fcategory value: the category directory under fpath to restore, one
+# directory per solutions folder and a .json file per article
+# fcat value: id of the target category in the destination instance
+# Folders are matched by name and articles by title, so re-running the
+# restore updates what it created before instead of duplicating it.
+# blob_dir value: the blob store FSSolutions.py moved article bodies to,
+# under the same fpath
+
+from _freshservice_api import make_api_request, POST, PUT
+from _freshservice_blobs import BlobStore, BLOB_DIR
+from _freshservice_paginate import iter_pages
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+ver = 0.1
+debug = 1
+
+if not debug:
+    userOpt = input('\n\n\nThe use of this script is purely for testing and experimental purposes \n' \
+        'You should not be using this script if you are not willing to accept liability \n' \
+        'of any unintended results. Always have someone with agent access to Freshservice to verify \n'
+        'any actions completed with this script.\n\n\n' \
+        'Confirm and continue with [Y] (case-sensitive)\t>')
+    #if userOpt != "Y": endMe()
+
+api_key = '[redacted]'
+domain = 'hts-fs-sandbox'
+auth = (api_key, 'X')
+
+fpath = 'C:/Users/nestor.sanchez/Downloads/'
+fcategory = 'TRAX Knowledge Base'
+fcat = '4000040529'
+max_workers = 4         # folder/article writes in flight
+folder_visibility = 3   # agents only, until the restored content has been reviewed (new folders only)
+category_path = fpath + fcategory + '/'
+map_file = category_path + 'folder_id_map.json'
+blob_dir = fpath + BLOB_DIR
+
+base_url = f'https://{domain}.freshservice.com/api/v2/solutions/'
+
+# Article fields carried over from the export; everything else is server-managed
+article_fields = ['title', 'description', 'article_type', 'status', 'keywords', 'review_date']
+
+
+blobs = BlobStore(blob_dir)
+
+
+def read_tree(root):
+    """
+    Reads the exported tree.
+
+    Returns:
+        list: [folder name, old folder id, [article dicts]] per directory,
+              ordered by the position prefix FSSolutions.py gave each folder.
+    """
+    tree = []
+    for entry in os.listdir(root):
+        if not os.path.isdir(os.path.join(root, entry)) or not (match := re.match(r'^(\d+)\. (.+)$', entry)):
+            continue
+
+        articles = []
+        for name in sorted(os.listdir(os.path.join(root, entry))):
+            if name.endswith('.json'):
+                with open(os.path.join(root, entry, name), 'r', encoding='utf-8') as f:
+                    articles.append(json.load(f))
+
+        old_id = articles[0]['folder_id'] if articles else None
+        tree.append([int(match.group(1)), match.group(2), old_id, articles])
+
+    return [item[1:] for item in sorted(tree, key=lambda item: item[0])]
+
+
+def check(response, what):
+    if response.status_code not in [200, 201]:
+        raise RuntimeError(f"{what} failed. Status code: {response.status_code}, Response: {response.text}")
+    return response.json()
+
+
+def list_all(url, key, what):
+    """Every record of a paginated list endpoint; url already carries its query string."""
+    records = []
+    for page, rawResp in iter_pages(lambda page: url + '&per_page=100&page=' + str(page), key, auth=auth):
+        if key not in rawResp:
+            raise RuntimeError(f"{what} failed. Response: {rawResp}")
+        records += rawResp[key]
+    return records
+
+
+def restore_folder(name, existing):
+    """Creates the folder in fcat, or updates the one with the same name. Returns its id."""
+    payload = {'name': name, 'category_id': int(fcat)}
+    if name in existing:
+        # visibility is left alone: the folder may have been published since the last run
+        check(make_api_request(base_url + 'folders/' + str(existing[name]), mode=PUT, auth=auth,
+                               payload=payload), 'Updating folder ' + name)
+        print('Folder ' + name + ' updated.')
+        return existing[name]
+
+    folder = check(make_api_request(base_url + 'folders', mode=POST, auth=auth,
+                                    payload=dict(payload, visibility=folder_visibility)),
+                   'Creating folder ' + name)['folder']
+    print('Folder ' + name + ' created.')
+    return folder['id']
+
+
+def restore_article(article, folder_id, existing):
+    payload = {key: blobs.resolve(article[key]) for key in article_fields if article.get(key) is not None}
+    payload['folder_id'] = folder_id
+
+    if article['title'] in existing:
+        check(make_api_request(base_url + 'articles/' + str(existing[article['title']]), mode=PUT,
+                               auth=auth, payload=payload), 'Updating article ' + article['title'])
+        return 'updated'
+
+    check(make_api_request(base_url + 'articles', mode=POST, auth=auth, payload=payload),
+          'Creating article ' + article['title'])
+    return 'created'
+
+
+def restore_articles(articles, folder_id, pool):
+    """Queues the folder's articles on the pool, matching existing ones by title."""
+    listed = list_all(base_url + 'articles?folder_id=' + str(folder_id), 'articles', 'Listing articles')
+    existing = {a['title']: a['id'] for a in listed}
+    return [(article, pool.submit(restore_article, article, folder_id, existing)) for article in articles]
+
+
+def main():
+
+    tree = read_tree(category_path)
+    existing = {f['name']: f['id'] for f in list_all(base_url + 'folders?category_id=' + fcat, 'folders', 'Listing folders')}
+    # ids mapped by an earlier, partial run are kept
+    folder_map = {}
+    if os.path.exists(map_file):
+        with open(map_file, 'r', encoding='utf-8') as f: folder_map = json.load(f)
+    results = []
+    failed = []
+
+    # any error (HTTP, retries exhausted, bad JSON, missing blob) fails only its folder or article,
+    # and the folder map of what was restored is written even if the run is cut short
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            folder_futures = [(name, old_id, articles, pool.submit(restore_folder, name, existing))
+                              for name, old_id, articles in tree]
+
+            for name, old_id, articles, future in folder_futures:
+                try:
+                    new_id = future.result()
+                    if old_id is not None: folder_map[str(old_id)] = new_id
+                    results += restore_articles(articles, new_id, pool)
+                except Exception as e:
+                    print('Folder ' + name + ': ' + str(e)); failed.append(name)
+
+            for article, future in results:
+                try:
+                    print('Article ' + article['title'] + ' ' + future.result() + '.')
+                except Exception as e:
+                    print('Article ' + article['title'] + ': ' + str(e)); failed.append(article['title'])
+    finally:
+        with open(map_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(folder_map, indent = 4))
+
+    print(str(len(tree)) + ' folders and ' + str(len(results)) + ' articles processed, ' +
+          str(len(failed)) + ' failed. Folder id map written to ' + map_file + '.')
+
+
+main()
+
+print('end')
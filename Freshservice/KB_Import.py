@@ -1,81 +1,183 @@
-import requests
+from _freshservice_api import api_get
+from _freshservice_export import CSVStream, ParquetStream
+from _freshservice_attachments import AttachmentDownloader
+from _freshservice_json import loads
+import os
+import ast
 import json
 import csv
-from datetime import datetime
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 # Define the API key and domain
 api_key = '[redacted]'
 domain = 'hts-fs-sandbox'
 headers = {'Content-Type': 'application/json'}
 
+# Maximum number of folder/article requests in flight
+max_workers = 8
+
+# Output format: 'csv', or 'parquet' for a typed columnar file (needs pyarrow)
+output_format = 'csv'
+
+# Incremental mode: folders whose updated_at has not moved since the last
+# export are copied from the previous CSV instead of being re-downloaded
+# (CSV output only). This relies on an article edit moving its folder's
+# updated_at, which Freshservice does not guarantee, so every folder is
+# downloaded again once the last full export is older than
+# full_refresh_days (0 makes every run a full export)
+incremental = 1
+full_refresh_days = 7
+state_file = f'Freshservice_KB_State_{domain}.json'
+
+# Download the article attachments into attachments_dir while the export
+# runs; files already downloaded are skipped and cut-off ones resumed
+download_attachments = 1
+attachments_dir = f'Freshservice_KB_Attachments_{domain}/'
+attachment_workers = 4
+
+# Function to load the previous export's state and its rows grouped by folder
+def load_state():
+    empty = {'csv_file': None, 'folders': {}}
+    if not incremental or output_format != 'csv' or not os.path.exists(state_file):
+        return empty, {}
+
+    with open(state_file, mode='r', encoding='utf-8') as file:
+        state = json.load(file)
+
+    # Without the previous CSV there is nothing to merge into
+    if not state.get('csv_file') or not os.path.exists(state['csv_file']):
+        return empty, {}
+
+    # Articles edited inside an unchanged folder are only picked up by a full export
+    last_full = state.get('full_refresh_at')
+    if not last_full or datetime.now() - datetime.fromisoformat(last_full) >= timedelta(days=full_refresh_days):
+        print(f"Last full export {last_full or 'unknown'}, downloading every folder again.")
+        return dict(state, full_refresh=True), {}
+
+    previous_rows = defaultdict(list)
+    with open(state['csv_file'], mode='r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            previous_rows[row['Folder ID']].append(row)
+
+    return state, previous_rows
+
+# Function to save the per-folder and per-article updated_at watermarks
+def save_state(state):
+    with open(state_file, mode='w', encoding='utf-8') as file:
+        json.dump(state, file, indent=4)
+
+# Function to fetch the folders within a category
+def fetch_folders(category_id):
+    folders_url = f'https://{domain}.freshservice.com/api/v2/solutions/folders?category_id={category_id}'
+    folders_response = api_get(folders_url, headers=headers, auth=(api_key, 'X'))
+    return loads(folders_response.content)['folders']
+
+# Function to fetch the articles within a folder
+def fetch_articles(folder_id):
+    articles_url = f'https://{domain}.freshservice.com/api/v2/solutions/articles?folder_id={folder_id}'
+    articles_response = api_get(articles_url, headers=headers, auth=(api_key, 'X'))
+    return loads(articles_response.content)['articles']
+
+# Function to build a CSV row for an article
+def row_article(category, folder, article):
+    return {
+        'Category ID': category['id'],
+        'Category Name': category['name'],
+        'Folder ID': folder['id'],
+        'Folder Name': folder['name'],
+        'Article ID': article['id'],
+        'Title': article['title'],
+        'Description Text': article.get('description_text', ''),
+        'Created At': article['created_at'],
+        'Updated At': article['updated_at'],
+        'Status': article['status'],
+        'Approval Status': article.get('approval_status', ''),
+        'Thumbs Up': article.get('thumbs_up', 0),
+        'Thumbs Down': article.get('thumbs_down', 0),
+        'Modified By': article.get('modified_by', ''),
+        'Modified At': article.get('modified_at', ''),
+        'Inserted Into Tickets': article.get('inserted_into_tickets', 0),
+        'Article Type': article.get('article_type', ''),
+        'Agent ID': article.get('agent_id', ''),
+        'Views': article.get('views', 0),
+        'Keywords': article.get('keywords', ''),
+        'Review Date': article.get('review_date', ''),
+        'URL': article.get('url', ''),
+        'Attachments': article.get('attachments', ''),
+        #'Description': article.get('description', '')
+    }
+
+# Function to build the rows for one folder, either from its fetched articles
+# or, when future is None, from the previous export's rows for that folder
+def folder_rows(category, folder, future, state, previous_rows, new_state):
+    rows = []
+    watermarks = {}
+    new_state['folders'][str(folder['id'])] = {'updated_at': folder['updated_at'], 'articles': watermarks}
+
+    if future is None:
+        new_state['reused'] += 1
+        for row in previous_rows.pop(str(folder['id']), []):
+            row.update({'Category ID': category['id'], 'Category Name': category['name'],
+                        'Folder Name': folder['name']})
+            watermarks[row['Article ID']] = row['Updated At']
+            rows.append(row)
+        return rows
+
+    known = state['folders'].get(str(folder['id']), {}).get('articles', {})
+    for article in future.result():
+        if known.get(str(article['id'])) != article['updated_at']:
+            new_state['changed'] += 1
+        watermarks[str(article['id'])] = article['updated_at']
+        rows.append(row_article(category, folder, article))
+    return rows
+
+# Function to crawl categories -> folders -> articles with a bounded worker pool.
+# All folder lists are requested at once and article requests are queued as
+# the folders are discovered, at most 2 * max_workers folders ahead of the
+# writer. Yields one list of rows per folder in category, folder, article
+# order regardless of completion order. Unchanged folders (per state) reuse
+# previous_rows; new_state collects the watermarks for the next run.
+def crawl_articles(categories, state, previous_rows, new_state):
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        folder_futures = [pool.submit(fetch_folders, category['id']) for category in categories]
+        pending = deque()
+
+        for category, folder_future in zip(categories, folder_futures):
+            for folder in folder_future.result():
+                known = state['folders'].get(str(folder['id']))
+                if (known and not state.get('full_refresh') and known['updated_at'] == folder['updated_at']
+                        and (str(folder['id']) in previous_rows or not known['articles'])):
+                    pending.append((category, folder, None))
+                else:
+                    pending.append((category, folder, pool.submit(fetch_articles, folder['id'])))
+
+                if len(pending) >= 2 * max_workers:
+                    yield folder_rows(*pending.popleft(), state, previous_rows, new_state)
+
+        while pending:
+            yield folder_rows(*pending.popleft(), state, previous_rows, new_state)
+
 # Define the URL for fetching categories
 categories_url = f'https://{domain}.freshservice.com/api/v2/solutions/categories'
 
 # Make the API request to fetch categories
-response = requests.get(categories_url, headers=headers, auth=(api_key, 'X'))
-categories = json.loads(response.text)
-
-# List to store category, folder, and article information
-rowArticle = []
-
-# Iterate over the list of categories
-for category in categories['categories']:
-    category_id = category['id']
-    category_name = category['name']
-    
-    # Define the URL for fetching folders within the category
-    folders_url = f'https://{domain}.freshservice.com/api/v2/solutions/folders?category_id={category_id}'
-    
-    # Make the API request to fetch folders
-    folders_response = requests.get(folders_url, headers=headers, auth=(api_key, 'X'))
-    folders = json.loads(folders_response.text)
-    
-    # Iterate over the list of folders
-    for folder in folders['folders']:
-        folder_id = folder['id']
-        folder_name = folder['name']
-        
-        # Define the URL for fetching articles within the folder
-        articles_url = f'https://{domain}.freshservice.com/api/v2/solutions/articles?folder_id={folder_id}'
-        
-        # Make the API request to fetch articles
-        articles_response = requests.get(articles_url, headers=headers, auth=(api_key, 'X'))
-        articles = json.loads(articles_response.text)
-        
-        # Iterate over the list of articles and append to rowArticle
-        for article in articles['articles']:
-            rowArticle.append({
-                'Category ID': category_id,
-                'Category Name': category_name,
-                'Folder ID': folder_id,
-                'Folder Name': folder_name,
-                'Article ID': article['id'],
-                'Title': article['title'],
-                'Description Text': article.get('description_text', ''),
-                'Created At': article['created_at'],
-                'Updated At': article['updated_at'],
-                'Status': article['status'],
-                'Approval Status': article.get('approval_status', ''),
-                'Thumbs Up': article.get('thumbs_up', 0),
-                'Thumbs Down': article.get('thumbs_down', 0),
-                'Modified By': article.get('modified_by', ''),
-                'Modified At': article.get('modified_at', ''),
-                'Inserted Into Tickets': article.get('inserted_into_tickets', 0),
-                'Article Type': article.get('article_type', ''),
-                'Agent ID': article.get('agent_id', ''),
-                'Views': article.get('views', 0),
-                'Keywords': article.get('keywords', ''),
-                'Review Date': article.get('review_date', ''),
-                'URL': article.get('url', ''),
-                'Attachments': article.get('attachments', ''),
-                #'Description': article.get('description', '')
-            })
+response = api_get(categories_url, headers=headers, auth=(api_key, 'X'), cache=True)
+categories = loads(response.content)
 
 # Get the current timestamp and format it
 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
 # Define the CSV file name with timestamp
-csv_file = f'Freshservice_KB_Export_{domain}_{timestamp}.csv'
+csv_file = f'Freshservice_KB_Export_{domain}_{timestamp}.{output_format}'
+
+# Load the previous export (if any) and crawl only what changed since
+state, previous_rows = load_state()
+new_state = {'csv_file': csv_file, 'folders': {}, 'changed': 0, 'reused': 0,
+             'full_refresh_at': datetime.now().isoformat() if state.get('full_refresh') or not state['folders']
+                                else state['full_refresh_at']}
 
 # Define the CSV headers
 csv_headers = [
@@ -97,11 +199,55 @@ csv_headers = [
     #'Description'
 ]
 
-# Write the categories, folders, and articles to the CSV file
-with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.DictWriter(file, fieldnames=csv_headers)
-    writer.writeheader()
-    for row in rowArticle:
-        writer.writerow(row)
+# Define the column types for parquet output
+parquet_schema = {
+    'Category ID': 'int', 'Category Name': 'string',
+    'Folder ID': 'int', 'Folder Name': 'string',
+    'Article ID': 'int', 'Title': 'string',
+    'Description Text': 'string',
+    'Created At': 'timestamp',
+    'Updated At': 'timestamp', 'Status': 'int',
+    'Approval Status': 'int', 'Thumbs Up': 'int',
+    'Thumbs Down': 'int', 'Modified By': 'int',
+    'Modified At': 'timestamp', 'Inserted Into Tickets': 'int',
+    'Article Type': 'int',
+    'Agent ID': 'int',
+    'Views': 'int', 'Keywords': 'string_list',
+    'Review Date': 'timestamp',
+    'URL': 'string',
+    'Attachments': 'attachments',
+}
+
+# Stream the categories, folders, and articles to the CSV file a folder at a time
+if output_format == 'parquet':
+    stream = ParquetStream(csv_file, parquet_schema)
+else:
+    stream = CSVStream(csv_file, csv_headers)
+
+downloader = AttachmentDownloader(attachments_dir, attachment_workers) if download_attachments else None
+
+# The downloader writes its index on the way out even if the crawl fails
+with stream, downloader or nullcontext():
+    for rows in crawl_articles(categories['categories'], state, previous_rows, new_state):
+        stream.write_page(rows)
+
+        # Rows reused from the previous CSV carry the attachments as their str()
+        if downloader:
+            for row in rows:
+                attachments = row['Attachments']
+                if isinstance(attachments, str):
+                    attachments = ast.literal_eval(attachments) if attachments else []
+                downloader.submit(attachments, row['Article ID'])
+
+if downloader:
+    print(downloader.summary())
+
+# Record the watermarks only once the snapshot is complete
+if incremental and output_format == 'csv':
+    save_state(new_state)
+    print(f"{new_state['changed']} new or updated articles since the previous export.")
+    if new_state['reused']:
+        print(f"{new_state['reused']} unchanged folders were copied from the previous export; articles edited in them "
+              f"are picked up by the next full export (last {new_state['full_refresh_at']}, every {full_refresh_days} days).")
 
 print(f"All categories, folders, and articles have been exported to {csv_file}.")
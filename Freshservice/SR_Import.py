@@ -1,6 +1,7 @@
-import requests
-import json
-import csv
+from _freshservice_paginate import iter_pages
+from _freshservice_export import CSVStream, ParquetStream
+from _freshservice_checkpoint import Checkpoint, is_resume_mode
+from _freshservice_workspaces import ALL, resolve_workspaces, merge_pages
 from datetime import datetime
 
 # Define the API key and domain
@@ -8,65 +9,57 @@ api_key = '[redacted]'
 domain = 'hts-fs-sandbox'
 headers = {'Content-Type': 'application/json'}
 
-# Function to fetch service items with pagination
-def fetch_service_items(page):
-    service_items_url = f'https://{domain}.freshservice.com/api/v2/service_catalog/items?per_page=100&page={page}&workspace_id=0'
-    response = requests.get(service_items_url, headers=headers, auth=(api_key, 'X'))
-    return json.loads(response.text)
-
-# List to store service item information
-rowServiceItems = []
-page = 1
-
-while True:
-    service_items = fetch_service_items(page)
-    items = service_items['service_items']
-    
-    if not items:
-        break
-    
-    for item in items:
-        rowServiceItems.append({
-            'ID': item['id'],
-            'Workspace ID': item.get('workspace_id', ''),
-            'Created At': item['created_at'],
-            'Updated At': item['updated_at'],
-            'Name': item['name'],
-            'Delivery Time': item.get('delivery_time', 0),
-            'Display ID': item.get('display_id', ''),
-            'Category ID': item.get('category_id', ''),
-            'Product ID': item.get('product_id', ''),
-            'Quantity': item.get('quantity', 0),
-            'Deleted': item.get('deleted', False),
-            'Group Visibility': item.get('group_visibility', 0),
-            'Item Type': item.get('item_type', 0),
-            'CI Type ID': item.get('ci_type_id', ''),
-            'Cost Visibility': item.get('cost_visibility', False),
-            'Delivery Time Visibility': item.get('delivery_time_visibility', False),
-            'Configs': item.get('configs', ''),
-            'Botified': item.get('botified', False),
-            'Visibility': item.get('visibility', 0),
-            'Allow Attachments': item.get('allow_attachments', False),
-            'Allow Quantity': item.get('allow_quantity', False),
-            'Is Bundle': item.get('is_bundle', False),
-            'Create Child': item.get('create_child', False),
-            'Description': item.get('description', ''),
-            'Short Description': item.get('short_description', ''),
-            'Cost': item.get('cost', 0),
-            'Custom Fields': item.get('custom_fields', ''),
-            'Child Items': item.get('child_items', '')
-        })
-    
-    if len(items) < 100:
-        break
-    
-    page += 1
+# Output format: 'csv', or 'parquet' for a typed columnar file (needs pyarrow)
+output_format = 'csv'
+
+# Workspaces to export: [0] walks the items of every workspace as one list;
+# a list of ids, or ALL to discover them, walks each workspace in parallel
+# and merges the pages into the one output file
+workspaces = [0]
+max_workers = 4
+
+# Function to build the URL of a page of service items
+def service_items_url(page, workspace_id=0):
+    return f'https://{domain}.freshservice.com/api/v2/service_catalog/items?per_page=100&page={page}&workspace_id={workspace_id}'
+
+# Function to build a CSV row for a service item
+def row_service_item(item):
+    return {
+        'ID': item['id'],
+        'Workspace ID': item.get('workspace_id', ''),
+        'Created At': item['created_at'],
+        'Updated At': item['updated_at'],
+        'Name': item['name'],
+        'Delivery Time': item.get('delivery_time', 0),
+        'Display ID': item.get('display_id', ''),
+        'Category ID': item.get('category_id', ''),
+        'Product ID': item.get('product_id', ''),
+        'Quantity': item.get('quantity', 0),
+        'Deleted': item.get('deleted', False),
+        'Group Visibility': item.get('group_visibility', 0),
+        'Item Type': item.get('item_type', 0),
+        'CI Type ID': item.get('ci_type_id', ''),
+        'Cost Visibility': item.get('cost_visibility', False),
+        'Delivery Time Visibility': item.get('delivery_time_visibility', False),
+        'Configs': item.get('configs', ''),
+        'Botified': item.get('botified', False),
+        'Visibility': item.get('visibility', 0),
+        'Allow Attachments': item.get('allow_attachments', False),
+        'Allow Quantity': item.get('allow_quantity', False),
+        'Is Bundle': item.get('is_bundle', False),
+        'Create Child': item.get('create_child', False),
+        'Description': item.get('description', ''),
+        'Short Description': item.get('short_description', ''),
+        'Cost': item.get('cost', 0),
+        'Custom Fields': item.get('custom_fields', ''),
+        'Child Items': item.get('child_items', '')
+    }
 
 # Get the current timestamp and format it
 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
 # Define the CSV file name with timestamp
-csv_file = f'Freshservice_Service_Items_Export_{domain}_{timestamp}.csv'
+csv_file = f'Freshservice_Service_Items_Export_{domain}_{timestamp}.{output_format}'
 
 # Define the CSV headers
 csv_headers = [
@@ -79,11 +72,58 @@ csv_headers = [
     'Short Description', 'Cost', 'Custom Fields', 'Child Items'
 ]
 
-# Write the service items to the CSV file
-with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.DictWriter(file, fieldnames=csv_headers)
-    writer.writeheader()
-    for row in rowServiceItems:
-        writer.writerow(row)
+# Define the column types for parquet output
+parquet_schema = {
+    'ID': 'int', 'Workspace ID': 'int', 'Created At': 'timestamp', 'Updated At': 'timestamp', 'Name': 'string',
+    'Delivery Time': 'float', 'Display ID': 'int', 'Category ID': 'int', 'Product ID': 'int',
+    'Quantity': 'int', 'Deleted': 'bool', 'Group Visibility': 'int', 'Item Type': 'int',
+    'CI Type ID': 'int', 'Cost Visibility': 'bool', 'Delivery Time Visibility': 'bool',
+    'Configs': 'nested', 'Botified': 'bool', 'Visibility': 'int', 'Allow Attachments': 'bool',
+    'Allow Quantity': 'bool', 'Is Bundle': 'bool', 'Create Child': 'bool', 'Description': 'string',
+    'Short Description': 'string', 'Cost': 'float', 'Custom Fields': 'nested', 'Child Items': 'nested'
+}
+
+# Journal every completed page (one journal per workspace) so an interrupted
+# run can continue with --resume
+selected = resolve_workspaces(workspaces, domain, (api_key, 'X'), headers)
+checkpoints = {
+    workspace['id']: Checkpoint(f'Freshservice_Service_Items_Export_{domain}'
+                                + (f'_ws{workspace["id"]}' if workspace['id'] else '') + '.checkpoint',
+                                {'csv_file': csv_file}, resume=is_resume_mode())
+    for workspace in selected
+}
+csv_file = checkpoints[selected[0]['id']].meta['csv_file']
+
+# Function to yield a workspace's pages of items: first the ones an
+# interrupted run already fetched, then the rest, a few pages ahead
+def workspace_pages(workspace):
+    checkpoint = checkpoints[workspace['id']]
+    page = 1
+    items = None
+
+    for page, items, size in checkpoint.pages():
+        yield items
+        page += 1
+
+    pages = iter_pages(lambda page: service_items_url(page, workspace['id']), 'service_items',
+                       auth=(api_key, 'X'), headers=headers, start=page) if items is None or len(items) == 100 else []
+
+    for page, service_items in pages:
+        items = service_items['service_items']
+        checkpoint.save_page(page, items)
+        yield items
+
+# Stream the service items to the output file a page at a time
+if output_format == 'parquet':
+    stream = ParquetStream(csv_file, parquet_schema)
+else:
+    stream = CSVStream(csv_file, csv_headers)
+
+with stream:
+    for workspace, items in merge_pages(selected, workspace_pages, max_workers):
+        stream.write_page(row_service_item({'workspace_id': workspace['id'] or '', **item}) for item in items)
+
+for checkpoint in checkpoints.values():
+    checkpoint.finish()
 
 print(f"All service items have been exported to {csv_file}.")
\ No newline at end of file
@@ -0,0 +1,71 @@
+from _freshservice_export import NDJSONStream
+from _freshservice_paginate import iter_pages
+from _freshservice_tickets import (TicketWriter, compact, fetch_window, format_time, initial_windows,
+                                   parse_time)
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+
+# Define the API key and domain
+api_key = '[redacted]'
+domain = 'hts-fs-sandbox'
+headers = {'Content-Type': 'application/json'}
+
+# Export every ticket updated from `since` until now. The range is cut into
+# updated_since windows of window_days that are fetched in parallel; a window
+# that still has tickets after max_pages (the API's pagination depth limit)
+# is split in two and both halves are queued.
+since = '2015-01-01T00:00:00Z'
+window_days = 30
+max_workers = 4
+max_pages = 300
+workspace_id = 0        # 0 = all workspaces
+
+# NDJSON output, one ticket per line: 'gzip', 'zstd' or None
+compression = 'gzip'
+
+# Function to build the URL of a page of tickets updated since a point in time.
+# order_by=updated_at is what the window walk relies on; fetch_window raises
+# if the API ignores it.
+def tickets_url(start, page):
+    return (f'https://{domain}.freshservice.com/api/v2/tickets?updated_since={format_time(start)}'
+            f'&order_by=updated_at&order_type=asc&workspace_id={workspace_id}&per_page=100&page={page}')
+
+# Function to page through the tickets updated since a point in time, one page in flight
+def ticket_pages(start):
+    return iter_pages(lambda page: tickets_url(start, page), 'tickets', auth=(api_key, 'X'),
+                      headers=headers, window=1)
+
+# Get the current timestamp and format it
+timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+# Define the output file name with timestamp
+ext = {'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}.get(compression, '.ndjson')
+output_file = f'Freshservice_Tickets_Export_{domain}_{timestamp}{ext}'
+
+# Function to fetch windows in parallel, queueing the halves of dense ones
+def run_windows(pool, windows, writer):
+    running = {pool.submit(fetch_window, start, end, writer, ticket_pages, max_pages) for start, end in windows}
+    while running:
+        done, running = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            running |= {pool.submit(fetch_window, start, end, writer, ticket_pages, max_pages)
+                        for start, end in future.result()}
+
+export_end = datetime.now(timezone.utc).replace(microsecond=0)
+windows = initial_windows(parse_time(since), export_end, window_days)
+print(f"Exporting tickets updated since {since} in {len(windows)} windows.")
+
+with NDJSONStream(output_file, compression) as stream:
+    writer = TicketWriter(stream)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        run_windows(pool, windows, writer)
+
+        # Tickets updated during the export have left the window they were in;
+        # pick them up (as the newer copy) with a final catch-up window
+        run_windows(pool, [(export_end, datetime.now(timezone.utc) + timedelta(days=1))], writer)
+
+if writer.superseded:
+    compact(output_file, writer.superseded, compression)
+
+print(f"{len(writer.seen)} tickets have been exported to {output_file} "
+      f"({writer.duplicates} duplicate copies skipped).")
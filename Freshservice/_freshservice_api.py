@@ -0,0 +1,220 @@
+#
+# Script: Freshservice API client
+#
+# Overview:
+# Shared HTTP client for the Freshservice exporters. Keeps one keep-alive
+# session (and connection pool) per domain, retries transient 5xx/429
+# responses with exponential backoff, honours Retry-After, and paces
+# requests once X-RateLimit-Remaining runs low. Every call
+# is recorded by _freshservice_telemetry for the end-of-run report.
+#
+# Freshservice API documentation can be found at
+# https://api.freshservice.com/
+#
+# Set FS_API_BASE (e.g. http://127.0.0.1:8080) to send every request to that
+# server instead, keeping path and query; used to run against a local mock.
+
+import os
+import time
+import threading
+import requests
+import _freshservice_cache as cache_store
+from _freshservice_telemetry import telemetry
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Optional, Tuple
+
+# Constants for HTTP methods
+GET = 'GET'
+POST = 'POST'
+PUT = 'PUT'
+DELETE = 'DELETE'
+
+# Connection pool and retry settings
+POOL_SIZE = 10
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 1
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Once less than RATE_LIMIT_PACE_FROM of the quota is left in the current
+# rate-limit window (Freshservice quotas are per minute), requests are
+# spaced so that the calls left above RATE_LIMIT_HEADROOM last a window
+RATE_LIMIT_HEADROOM = 10
+RATE_LIMIT_PACE_FROM = 0.25
+RATE_LIMIT_WINDOW = 60
+
+_sessions: Dict[str, requests.Session] = {}
+_rate_limits: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def is_debug_mode() -> bool:
+    """Check if the debug mode is enabled via environment variable."""
+    return os.getenv('DEBUG', 'False').lower() in ['true', '1', 't', 'y', 'yes']
+
+
+def get_session(host: str) -> requests.Session:
+    """
+    Returns the pooled session for the given host, creating it on first use.
+
+    Args:
+        host (str): Host name, e.g. 'hts.freshservice.com'.
+
+    Returns:
+        requests.Session: A keep-alive session with retries mounted.
+    """
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            retry = Retry(
+                total=MAX_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUSES,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE,
+                                  pool_block=True, max_retries=retry)
+            session = requests.Session()
+            session.headers.update({'Content-Type': 'application/json'})
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return session
+
+
+def pacing_delay(remaining: int, total: int) -> float:
+    """
+    Seconds to wait before the next call when `remaining` of a quota of
+    `total` calls per window are left (total 0 when the API does not say).
+    """
+    # Without X-RateLimit-Total, only the last 2 * RATE_LIMIT_HEADROOM calls are paced
+    threshold = max(total * RATE_LIMIT_PACE_FROM if total else 0, 2 * RATE_LIMIT_HEADROOM)
+    if remaining > threshold:
+        return 0.0
+    # Spread the calls left above the headroom over a window
+    return RATE_LIMIT_WINDOW / max(remaining - RATE_LIMIT_HEADROOM, 1)
+
+
+def _throttle(host: str) -> None:
+    """Take one call from the host's remaining quota, sleeping first when it is running low."""
+    with _lock:
+        limits = _rate_limits.get(host)
+        if not limits:
+            return
+        # Reserved before sending, so workers that saw the same response do not all count the same call;
+        # the next response's headers replace the estimate
+        remaining, total = limits['remaining'], limits['total']
+        limits['remaining'] -= 1
+    delay = pacing_delay(remaining, total)
+    if not delay:
+        return
+    if is_debug_mode():
+        print(f"Rate limit headroom low for {host} ({remaining} left), waiting {delay:.2f}s")
+    time.sleep(delay)
+    telemetry.record_pacing(host, delay)
+
+
+def _record_rate_limit(host: str, response: requests.Response) -> None:
+    """Remember the rate-limit headers from the last response for the host."""
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    total = response.headers.get('X-RateLimit-Total')
+    if remaining is None:
+        return
+    try:
+        limits = {'remaining': int(remaining), 'total': int(total) if total else 0}
+    except ValueError:
+        return
+    with _lock:
+        _rate_limits[host] = limits
+    telemetry.record_rate_limit(host, limits['remaining'], limits['total'])
+
+
+def _retry_after(response: requests.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a throttled request."""
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return BACKOFF_FACTOR * (2 ** attempt)
+
+
+def make_api_request(url: str, mode: Optional[str] = GET, auth: Optional[Tuple[str, str]] = None,
+                     payload: Optional[Dict] = None, params: Optional[Dict] = None,
+                     headers: Optional[Dict] = None, cache: bool = False, **kwargs) -> requests.Response:
+    """
+    Sends a request through the pooled, rate-limit aware session for the URL's host.
+
+    Args:
+        url (str): Full request URL.
+        mode (str): HTTP method.
+        auth (tuple): Basic auth tuple, e.g. (api_key, 'X').
+        payload (dict): JSON body for POST/PUT requests.
+        params (dict): Query string parameters.
+        headers (dict): Extra headers for this request only.
+        cache (bool): Allow the on-disk response cache for this GET (see
+            _freshservice_cache; only used when FS_CACHE is enabled).
+
+    Returns:
+        requests.Response: The final response after any retries.
+    """
+    if os.getenv('FS_API_BASE'):
+        parts = urlsplit(url)
+        url = os.getenv('FS_API_BASE').rstrip('/') + parts.path + ('?' + parts.query if parts.query else '')
+
+    host = urlsplit(url).netloc
+    session = get_session(host)
+    started = time.perf_counter()
+
+    entry = None
+    use_cache = cache and mode == GET and cache_store.is_cache_mode()
+    if use_cache:
+        key = cache_store.cache_key(requests.Request(GET, url, params=params).prepare().url, auth)
+        entry = None if cache_store.is_cache_bypass() else cache_store.load(key)
+        if entry and cache_store.is_fresh(entry[0]):
+            telemetry.record(mode, url, 200, time.perf_counter() - started, cached=True)
+            return cache_store.to_response(*entry)
+        if entry:
+            headers = {**(headers or {}), **cache_store.conditional_headers(entry[0])}
+
+    retries = throttled = 0
+    for attempt in range(MAX_RETRIES + 1):
+        _throttle(host)
+        response = session.request(method=mode, url=url, auth=auth, json=payload,
+                                    params=params, headers=headers, **kwargs)
+        _record_rate_limit(host, response)
+
+        # Attempts urllib3 retried inside the adapter before handing back this response
+        history = getattr(getattr(response.raw, 'retries', None), 'history', None) or ()
+        retries += len(history) + (attempt > 0)
+        throttled += sum(1 for h in history if h.status == 429) + (response.status_code == 429)
+
+        # urllib3 only retries idempotent methods; a 429 means the request was
+        # never processed, so POST is safe to repeat after Retry-After
+        if response.status_code != 429 or mode in Retry.DEFAULT_ALLOWED_METHODS or attempt == MAX_RETRIES:
+            break
+        time.sleep(_retry_after(response, attempt))
+
+    body = response.request.body or b''
+    telemetry.record(mode, url, response.status_code, time.perf_counter() - started,
+                     bytes_out=len(body), retries=retries, throttled=throttled, cached=response.status_code == 304,
+                     bytes_in=int(response.headers.get('Content-Length') or 0) if kwargs.get('stream')
+                     else len(response.content))
+
+    if use_cache and entry and response.status_code == 304:
+        cache_store.refresh(key, entry[0])
+        return cache_store.to_response(*entry)
+    if use_cache and response.status_code == 200:
+        cache_store.store(key, response)
+
+    if is_debug_mode() and response.status_code >= 400:
+        print(f"Request failed: {mode} {url}")
+        print("Response status code:", response.status_code)
+        print("Response content:", response.text)
+
+    return response
+
+
+def api_get(url: str, auth: Optional[Tuple[str, str]] = None, **kwargs) -> requests.Response:
+    """Shorthand for a GET through make_api_request."""
+    return make_api_request(url, mode=GET, auth=auth, **kwargs)
@@ -0,0 +1,209 @@
+#
+# Script: Freshservice attachment downloader
+#
+# Overview:
+# Downloads the files attached to KB articles alongside the metadata export.
+# Files are streamed to disk in chunks by a bounded pool of workers, so the
+# downloads overlap the article crawl instead of following it. A transfer
+# that is cut off is resumed with a Range request on the next run, as long
+# as the attachment's updated_at and size are still the ones the partial
+# file was started for, and every finished file is checked against the
+# expected size. Finished files are stored once under their SHA-256
+# (identical attachments on different articles share a file), and an index
+# maps each attachment id to its file so attachments already downloaded are
+# skipped.
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from _freshservice_api import api_get
+
+CHUNK_SIZE = 1024 * 1024
+INDEX_FILE = 'attachments_index.json'
+SAVE_EVERY = 50         # downloads between index saves
+SAVE_INTERVAL = 10.0    # seconds between index saves
+
+_range_total = re.compile(r'/(\d+)\s*$')
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+class AttachmentDownloader:
+    """
+    Bounded-concurrency, resumable attachment downloads into root.
+
+    Layout:
+        root/files/<2 hex>/<sha256>   attachment contents, one file per hash
+        root/partial/<id>.part        transfers in progress
+        root/partial/<id>.part.json   updated_at and size the transfer was started for
+        root/attachments_index.json   attachment id -> hash, name, size, article
+    """
+
+    def __init__(self, root: str, max_workers: int = 4):
+        self.root = root
+        self.index_file = os.path.join(root, INDEX_FILE)
+        self.downloaded = self.skipped = self.deduplicated = self.failed = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._queued = set()
+        os.makedirs(os.path.join(root, 'files'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'partial'), exist_ok=True)
+
+        self.index: Dict[str, Dict] = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r', encoding='utf-8') as file:
+                self.index = json.load(file)
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def file_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'files', digest[:2], digest)
+
+    def _is_current(self, attachment: Dict) -> bool:
+        """True when the attachment is indexed unchanged and its file is on disk."""
+        entry = self.index.get(str(attachment['id']))
+        return bool(entry and entry.get('updated_at') == attachment.get('updated_at')
+                    and entry.get('size') == attachment.get('size')
+                    and os.path.exists(self.file_path(entry['sha256'])))
+
+    def submit(self, attachments: List[Dict], article_id=None) -> None:
+        """Queues an article's attachments; ones already downloaded are skipped."""
+        for attachment in attachments or []:
+            key = str(attachment['id'])
+            with self._lock:
+                if key in self._queued:
+                    continue
+                self._queued.add(key)
+                if self._is_current(attachment):
+                    self.skipped += 1
+                    continue
+            self._pool.submit(self._download, attachment, article_id)
+
+    def _transfer(self, url: str, part: str, resume: bool) -> Tuple:
+        """
+        Streams url into part, continuing from its end when resume is set.
+
+        Returns:
+            tuple: (sha256 of the whole file, its length, the length the
+                   server reported in Content-Range or None).
+        """
+        digest = hashlib.sha256()
+        offset = 0
+
+        # Hash what an earlier, interrupted run already wrote and ask for the rest
+        if resume:
+            with open(part, 'rb') as file:
+                for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    offset += len(chunk)
+
+        request_headers = {'Range': f'bytes={offset}-'} if offset else None
+        response = api_get(url, headers=request_headers, stream=True)
+        match = _range_total.search(response.headers.get('Content-Range', ''))
+        reported = int(match.group(1)) if match else None
+        if response.status_code == 416 and offset:
+            response.close()        # the part file is already complete
+        elif response.status_code in (200, 206):
+            if response.status_code == 200 and offset:
+                digest, offset = hashlib.sha256(), 0    # no range support: start over
+            with response, open(part, 'ab' if offset else 'wb') as file:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    offset += len(chunk)
+                    with self._lock:
+                        self.bytes += len(chunk)
+        else:
+            raise RuntimeError(f"status code {response.status_code}")
+        return digest, offset, reported
+
+    def _download(self, attachment: Dict, article_id) -> None:
+        part = os.path.join(self.root, 'partial', f"{attachment['id']}.part")
+        version_file = part + '.json'
+        version = {'updated_at': attachment.get('updated_at'), 'size': attachment.get('size')}
+
+        try:
+            # A part file is only continued for the attachment version it was started for
+            resume = os.path.exists(part) and _read_json(version_file) == version
+            while True:
+                if not resume:
+                    with open(version_file, 'w', encoding='utf-8') as file:
+                        json.dump(version, file)
+                digest, length, reported = self._transfer(attachment['attachment_url'], part, resume)
+                expected = attachment.get('size') if attachment.get('size') is not None else reported
+                if expected is None or length == expected:
+                    break
+                os.remove(part)
+                if not resume:
+                    os.remove(version_file)
+                    raise RuntimeError(f"received {length} bytes, expected {expected}")
+                resume = False      # the resumed prefix belonged to other contents: download it whole
+        except Exception as e:
+            print(f"Failed to download attachment {attachment.get('name')} ({attachment['id']}): {e}")
+            with self._lock:
+                self.failed += 1
+            return
+
+        sha = digest.hexdigest()
+        target = self.file_path(sha)
+        os.remove(version_file)
+        with self._lock:
+            if os.path.exists(target):
+                os.remove(part)
+                self.deduplicated += 1
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(part, target)
+                self.downloaded += 1
+            self.index[str(attachment['id'])] = {
+                'sha256': sha, 'name': attachment.get('name'), 'content_type': attachment.get('content_type'),
+                'size': attachment.get('size'), 'updated_at': attachment.get('updated_at'), 'article_id': article_id
+            }
+            self._unsaved += 1
+            due = self._unsaved >= SAVE_EVERY or time.monotonic() - self._saved_at >= SAVE_INTERVAL
+
+        # Saved as it goes, so an interrupted export does not download the finished files again
+        if due:
+            self.save_index()
+
+    def save_index(self) -> None:
+        with self._save_lock:
+            with self._lock:
+                data = json.dumps(self.index, indent=4)
+                self._unsaved = 0
+                self._saved_at = time.monotonic()
+            with open(self.index_file + '.tmp', 'w', encoding='utf-8') as file:
+                file.write(data)
+            os.replace(self.index_file + '.tmp', self.index_file)
+
+    def close(self) -> None:
+        """Waits for the queued downloads and writes the index."""
+        try:
+            self._pool.shutdown(wait=True)
+        finally:
+            self.save_index()
+
+    def summary(self) -> str:
+        return (f"Attachments: {self.downloaded} downloaded ({self.bytes / (1024 * 1024):.1f} MB), "
+                f"{self.deduplicated} duplicates of files already stored, {self.skipped} already present, "
+                f"{self.failed} failed.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
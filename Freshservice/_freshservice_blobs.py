@@ -0,0 +1,108 @@
+#
+# Script: Freshservice blob store
+#
+# Overview:
+# Content-addressed store for the large HTML bodies in exports (article
+# descriptions, canned response content). Each body is written once,
+# compressed, under its SHA-256 and the export row keeps a short
+# "blob:sha256:<hex>" reference instead. Identical bodies across articles
+# and across runs share one blob, so re-exports only write what is new.
+
+import os
+import gzip
+import hashlib
+import threading
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+REF_PREFIX = 'blob:sha256:'
+MIN_SIZE = 1024     # bodies shorter than this (in bytes) stay inline
+BLOB_DIR = 'blobs/'  # store directory under an export's root folder, where the exporters and restores look
+
+
+def is_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+class BlobStore:
+    """
+    Hash-addressed, compressed blobs under root/<2 hex>/<62 hex>.gz (or .zst).
+
+    Blobs are written to a temporary file and renamed into place, so
+    concurrent writers of the same body are harmless and a blob on disk is
+    always complete.
+    """
+
+    def __init__(self, root: str, compression: str = 'gzip', min_size: int = MIN_SIZE):
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package.")
+        if compression not in ('gzip', 'zstd'):
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.root = root
+        self.compression = compression
+        self.min_size = min_size
+        self.written = 0
+        self.reused = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> str:
+        ext = '.gz' if self.compression == 'gzip' else '.zst'
+        return os.path.join(self.root, digest[:2], digest[2:] + ext)
+
+    def put(self, body: Optional[str]) -> Optional[str]:
+        """
+        Stores a body and returns its reference. Empty and short bodies, and
+        values that already are references, are returned unchanged.
+        """
+        if not isinstance(body, str) or is_ref(body):
+            return body
+        data = body.encode('utf-8')
+        if len(data) < self.min_size:
+            return body
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            with self._lock:
+                self.reused += 1
+            return REF_PREFIX + digest
+
+        packed = gzip.compress(data, mtime=0) if self.compression == 'gzip' else zstandard.ZstdCompressor().compress(data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as file:
+            file.write(packed)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self.written += 1
+            self.bytes_written += len(packed)
+        return REF_PREFIX + digest
+
+    def get(self, ref: str) -> str:
+        """Returns the body for a reference."""
+        digest = ref[len(REF_PREFIX):]
+        for path in (os.path.join(self.root, digest[:2], digest[2:] + '.gz'),
+                     os.path.join(self.root, digest[:2], digest[2:] + '.zst')):
+            if os.path.exists(path):
+                with open(path, 'rb') as file:
+                    packed = file.read()
+                if path.endswith('.gz'):
+                    return gzip.decompress(packed).decode('utf-8')
+                if zstandard is None:
+                    raise ValueError("Reading zstd blobs requires the 'zstandard' package.")
+                return zstandard.ZstdDecompressor().decompress(packed).decode('utf-8')
+        raise FileNotFoundError(f"Blob {digest} not found in {self.root}")
+
+    def resolve(self, value):
+        """Returns the body for a reference, or the value itself if it is not one."""
+        return self.get(value) if is_ref(value) else value
+
+    def summary(self) -> str:
+        return (f"{self.written} new blobs written ({self.bytes_written / 1024:.1f} KB), "
+                f"{self.reused} reused from {self.root}.")
@@ -0,0 +1,210 @@
+#
+# Script: Freshservice response cache
+#
+# Overview:
+# Opt-in on-disk cache for GET requests made through _freshservice_api.
+# Entries are kept fresh for a per-endpoint TTL, then revalidated with
+# If-None-Match / If-Modified-Since so an unchanged resource costs a 304
+# instead of a full download. The cache directory is bounded in size and
+# evicts least recently used entries first. The size is tracked as entries
+# are stored, so the directory is scanned only on the first store, every
+# EVICT_EVERY stores and once the bound is reached.
+#
+# Enable with FS_CACHE=1. FS_CACHE_BYPASS=1 skips cached reads for a run
+# (fresh responses are still stored).
+
+import os
+import json
+import time
+import hashlib
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.structures import CaseInsensitiveDict
+from typing import Dict, Optional, Tuple
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'freshservice')
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+EVICT_EVERY = 200      # stores between full scans of the cache directory
+
+# Seconds an entry is served without revalidation, by endpoint path prefix
+DEFAULT_TTL = 300
+CACHE_TTLS = {
+    '/api/v2/workspaces': 24 * 3600,
+    '/api/v2/sla_policies': 12 * 3600,
+    '/api/v2/ticket_form_fields': 12 * 3600,
+    '/api/v2/solutions/categories': 3600,
+}
+
+# Response headers worth keeping alongside the body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link')
+
+# Running estimate of the cache size, so a store only scans the directory
+# when the bound may be exceeded (or every EVICT_EVERY stores, to pick up
+# what other processes wrote)
+_size = {'bytes': None, 'stores': 0}
+_size_lock = threading.Lock()
+
+
+def is_cache_mode() -> bool:
+    """Check if the response cache is enabled via environment variable."""
+    return os.getenv('FS_CACHE', 'False').lower() in ['true', '1', 't', 'y', 'yes']
+
+
+def is_cache_bypass() -> bool:
+    """Check if cached reads should be skipped via environment variable."""
+    return os.getenv('FS_CACHE_BYPASS', 'False').lower() in ['true', '1', 't', 'y', 'yes']
+
+
+def ttl_for(url: str) -> int:
+    """Returns the TTL of the longest matching endpoint prefix for the URL."""
+    url_path = urlsplit(url).path
+    matches = [prefix for prefix in CACHE_TTLS if url_path.startswith(prefix)]
+    return CACHE_TTLS[max(matches, key=len)] if matches else DEFAULT_TTL
+
+
+def cache_key(url: str, auth: Optional[Tuple[str, str]] = None) -> str:
+    """Key entries by URL and credentials so tenants and API keys never share an entry."""
+    user = auth[0] if auth else ''
+    return hashlib.sha256(f'{user}\n{url}'.encode('utf-8')).hexdigest()
+
+
+def _paths(key: str) -> Tuple[str, str]:
+    base = os.path.join(CACHE_DIR, key[:2], key)
+    return base + '.json', base + '.body'
+
+
+def load(key: str) -> Optional[Tuple[Dict, bytes]]:
+    """
+    Reads a cache entry and marks it as recently used.
+
+    Returns:
+        tuple: (metadata, body), or None when the entry is missing or unreadable.
+    """
+    meta_path, body_path = _paths(key)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        with open(body_path, 'rb') as file:
+            body = file.read()
+        # The body's mtime doubles as the LRU timestamp
+        os.utime(body_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None     # missing, half-written or evicted meanwhile: a miss
+    return meta, body
+
+
+def is_fresh(meta: Dict) -> bool:
+    return time.time() - meta['stored_at'] < ttl_for(meta['url'])
+
+
+def store(key: str, response: requests.Response) -> None:
+    """Writes a 200 response to the cache, then evicts if over the size bound."""
+    meta_path, body_path = _paths(key)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+    meta = {
+        'url': response.url,
+        'status': response.status_code,
+        'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+        'stored_at': time.time()
+    }
+
+    try:
+        replaced = os.stat(body_path).st_size
+    except FileNotFoundError:
+        replaced = 0
+
+    # Write to temporary files first so concurrent readers never see half an entry; the names are
+    # per thread, since the workers of one process may store the same key at once
+    for target, data, mode in ((body_path, response.content, 'wb'),
+                               (meta_path, json.dumps(meta), 'w')):
+        tmp = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, mode) as file:
+            file.write(data)
+        os.replace(tmp, target)
+
+    with _size_lock:
+        _size['stores'] += 1
+        if _size['bytes'] is not None:
+            _size['bytes'] += len(response.content) - replaced
+        due = _size['bytes'] is None or _size['bytes'] > MAX_CACHE_BYTES or _size['stores'] >= EVICT_EVERY
+    if due:
+        evict()
+
+
+def refresh(key: str, meta: Dict) -> None:
+    """Restarts an entry's TTL after a 304 Not Modified."""
+    meta_path, body_path = _paths(key)
+    meta['stored_at'] = time.time()
+    try:
+        os.utime(body_path)
+    except FileNotFoundError:
+        return      # evicted meanwhile; the next request stores it again
+    tmp = f'{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as file:
+        json.dump(meta, file)
+    os.replace(tmp, meta_path)
+
+
+def conditional_headers(meta: Dict) -> Dict:
+    """Builds the revalidation headers for a stale entry."""
+    headers = {}
+    if meta['headers'].get('ETag'):
+        headers['If-None-Match'] = meta['headers']['ETag']
+    if meta['headers'].get('Last-Modified'):
+        headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+    return headers
+
+
+def to_response(meta: Dict, body: bytes) -> requests.Response:
+    """Rebuilds a requests.Response from a cache entry."""
+    response = requests.Response()
+    response.status_code = meta['status']
+    response.url = meta['url']
+    response.headers = CaseInsensitiveDict(meta['headers'])
+    response.headers['X-Cache'] = 'HIT'
+    response.encoding = 'utf-8'
+    response._content = body
+    return response
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """
+    Removes least recently used entries until the cache fits in max_bytes
+    (MAX_CACHE_BYTES by default).
+
+    Returns:
+        int: Number of entries removed.
+    """
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if not name.endswith('.body'):
+                continue
+            body_path = os.path.join(root, name)
+            try:
+                stat = os.stat(body_path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, body_path))
+            total += stat.st_size
+
+    removed = 0
+    for _, size, body_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        for target in (body_path, body_path[:-len('.body')] + '.json'):
+            try:
+                os.remove(target)
+            except FileNotFoundError:
+                pass
+        total -= size
+        removed += 1
+
+    with _size_lock:
+        _size['bytes'] = total
+        _size['stores'] = 0
+    return removed
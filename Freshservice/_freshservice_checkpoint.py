@@ -0,0 +1,105 @@
+#
+# Script: Freshservice export checkpoints
+#
+# Overview:
+# Append-only journal of completed pages for long paginated exports. Every
+# page is written and fsync'd together with its records as soon as it has
+# been fetched, so a run that dies on page 300 can be restarted with
+# --resume: the journaled pages are replayed from disk and fetching carries
+# on from the next page, producing the same final output.
+
+import os
+import sys
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def is_resume_mode() -> bool:
+    """Check if the script was started with --resume."""
+    return '--resume' in sys.argv[1:]
+
+
+class Checkpoint:
+    """
+    Journal of completed pages stored as JSON lines next to the export.
+
+    The first line holds run metadata (e.g. the output file name) so a
+    resumed run writes to the same place. Each following line holds one
+    page: {"page": n, "size": items on the API page, "records": [...]}.
+    """
+
+    def __init__(self, path: str, meta: Optional[Dict] = None, resume: bool = False):
+        self.path = path
+        self.meta = meta or {}
+        self._replay = 0
+
+        if resume and os.path.exists(path):
+            self._replay = self._recover()
+            print(f"Resuming from {path}: {self._replay} completed pages.")
+        else:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(json.dumps({'meta': self.meta}) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _recover(self) -> int:
+        """Reads the metadata, drops a torn last line, and returns the page count."""
+        good = 0
+        pages = 0
+        with open(self.path, 'rb') as file:
+            for index, line in enumerate(file):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                if index == 0:
+                    self.meta = entry['meta']
+                else:
+                    pages += 1
+                good += len(line)
+
+        with open(self.path, 'r+b') as file:
+            file.truncate(good)
+        return pages
+
+    def pages(self) -> Iterator[Tuple[int, List, int]]:
+        """
+        Replays the pages completed by an interrupted run, in order.
+
+        Yields:
+            tuple: (page number, records, API page size)
+        """
+        if not self._replay:
+            return
+        with open(self.path, 'r', encoding='utf-8') as file:
+            next(file)
+            for _, line in zip(range(self._replay), file):
+                entry = json.loads(line)
+                yield entry['page'], entry['records'], entry['size']
+
+    def save_page(self, page: int, records: List, size: Optional[int] = None) -> None:
+        """
+        Durably records a completed page.
+
+        Args:
+            page (int): Page number.
+            records (list): Records (or rows) to replay for this page.
+            size (int): Items the API returned for the page, when it differs
+                from len(records); used to tell whether more pages follow.
+        """
+        entry = {'page': page, 'size': len(records) if size is None else size, 'records': records}
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def finish(self) -> None:
+        """Removes the journal once the export is complete."""
+        self._file.close()
+        os.remove(self.path)
+
+    def close(self) -> None:
+        self._file.close()
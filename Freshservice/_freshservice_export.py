@@ -0,0 +1,320 @@
+#
+# Script: Freshservice export writers
+#
+# Overview:
+# Streaming writers shared by the CSV exporters. Rows are written a page at
+# a time as they are decoded, so memory stays flat regardless of catalog size
+# and an interrupted run still leaves a well-formed file up to the last page.
+
+import io
+import ast
+import csv
+import gzip
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+class CSVStream:
+    """
+    Writes rows to a CSV file one page at a time.
+
+    Each page is serialised in memory first and then written and flushed in
+    a single call, so the file on disk never ends with half a page of rows.
+    """
+
+    def __init__(self, csv_file: str, fieldnames: List[str]):
+        self.csv_file = csv_file
+        self.fieldnames = fieldnames
+        self.rows = 0
+        self._file = open(csv_file, mode='w', newline='', encoding='utf-8')
+        self.write_page([])
+
+    def write_page(self, rows: Iterable[Dict]) -> int:
+        """
+        Writes a page of rows and flushes it to disk.
+
+        Args:
+            rows (iterable): Row dictionaries keyed by the CSV headers.
+
+        Returns:
+            int: Number of rows written for this page.
+        """
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.fieldnames)
+        if self._file.tell() == 0:
+            writer.writeheader()
+
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+
+        self._file.write(buffer.getvalue())
+        self._file.flush()
+        self.rows += count
+        return count
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class NDJSONStream:
+    """
+    Writes records as newline-delimited JSON, optionally gzip or zstd compressed.
+
+    Pages may be written from several threads; each page is written as one
+    block under a lock so lines from different threads never interleave.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = 'gzip'):
+        self.path = path
+        self.records = 0
+        self._lock = threading.Lock()
+
+        if compression == 'gzip':
+            self._file = gzip.open(path, mode='wt', encoding='utf-8')
+        elif compression == 'zstd':
+            if zstandard is None:
+                raise ValueError("zstd compression requires the 'zstandard' package.")
+            self._file = zstandard.open(path, mode='wt', encoding='utf-8')
+        elif compression is None:
+            self._file = open(path, mode='w', encoding='utf-8')
+        else:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+    def write_page(self, records: Iterable[Dict]) -> int:
+        """
+        Writes a page of records, one compact JSON document per line.
+
+        Args:
+            records (iterable): JSON-serialisable records.
+
+        Returns:
+            int: Number of records written for this page.
+        """
+        lines = [json.dumps(record, separators=(',', ':')) + '\n' for record in records]
+        with self._lock:
+            self._file.write(''.join(lines))
+            self.records += len(lines)
+        return len(lines)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _nested(value):
+    """Nested values arrive as objects, or as their str() when replayed from a CSV."""
+    if isinstance(value, str):
+        try:
+            return ast.literal_eval(value) if value else None
+        except (ValueError, SyntaxError):
+            pass
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _to_timestamp(value):
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+def _to_bool(value):
+    if value in (None, ''):
+        return None
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 't', 'y', 'yes')
+    return bool(value)
+
+
+def _to_string_list(value):
+    value = _nested(value)
+    if value is None:
+        return None
+    return [str(item) for item in (value if isinstance(value, list) else [value])]
+
+
+def _to_attachments(value):
+    value = _nested(value)
+    if not value:
+        return None
+    return [{'id': a.get('id'), 'name': a.get('name'), 'content_type': a.get('content_type'),
+             'size': a.get('size'), 'attachment_url': a.get('attachment_url'),
+             'created_at': _to_timestamp(a.get('created_at')), 'updated_at': _to_timestamp(a.get('updated_at'))}
+            for a in value]
+
+
+def _infer_type(values):
+    """
+    Arrow type for free-form JSON values: objects become structs (union of
+    their keys), arrays lists, numbers int64 or float64. Values that mix
+    kinds, and keys seen only with nulls, become JSON text (string).
+    """
+    values = [v for v in values if v is not None]
+    if not values:
+        return pa.string()
+    if all(isinstance(v, dict) for v in values):
+        keys = {}
+        for value in values:
+            keys.update(dict.fromkeys(value))
+        if not keys:
+            return pa.string()      # Parquet has no empty struct
+        return pa.struct([(str(key), _infer_type([v.get(key) for v in values])) for key in keys])
+    if all(isinstance(v, list) for v in values):
+        return pa.list_(_infer_type([item for v in values for item in v]))
+    if all(isinstance(v, bool) for v in values):
+        return pa.bool_()
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return pa.int64()
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return pa.float64()
+    return pa.string()
+
+
+def _conform(value, arrow_type, path: str):
+    """Fits a JSON value to an inferred type; raises ValueError for keys or shapes the type lacks."""
+    if value is None:
+        return None
+    if pa.types.is_struct(arrow_type):
+        if not isinstance(value, dict):
+            raise ValueError(f"{path}: expected an object, got {value!r}")
+        fields = {arrow_type.field(i).name: arrow_type.field(i).type for i in range(arrow_type.num_fields)}
+        unknown = [key for key in value if str(key) not in fields]
+        if unknown:
+            raise ValueError(f"{path}: keys {unknown} are not in the column type inferred from the first row group")
+        return {name: _conform(value.get(name), field_type, f'{path}.{name}') for name, field_type in fields.items()}
+    if pa.types.is_list(arrow_type):
+        if not isinstance(value, list):
+            raise ValueError(f"{path}: expected an array, got {value!r}")
+        return [_conform(item, arrow_type.value_type, f'{path}[]') for item in value]
+    if pa.types.is_string(arrow_type):
+        return value if isinstance(value, str) else json.dumps(value)
+    number = isinstance(value, (int, float)) and not isinstance(value, bool)
+    if pa.types.is_floating(arrow_type) and number:
+        return float(value)
+    if ((pa.types.is_integer(arrow_type) and not (number and isinstance(value, int)))
+            or (pa.types.is_boolean(arrow_type) and not isinstance(value, bool))):
+        raise ValueError(f"{path}: {value!r} does not fit the {arrow_type} inferred from the first row group")
+    return value
+
+
+def _column_types():
+    """Column kinds usable in a ParquetStream schema: (arrow type, converter)."""
+    timestamp = pa.timestamp('s', tz='UTC')
+    return {
+        'int': (pa.int64(), lambda v: None if v in (None, '') else int(v)),
+        'float': (pa.float64(), lambda v: None if v in (None, '') else float(v)),
+        'bool': (pa.bool_(), _to_bool),
+        'string': (pa.string(), lambda v: None if v is None else str(v)),
+        'timestamp': (timestamp, _to_timestamp),
+        'string_list': (pa.list_(pa.string()), _to_string_list),
+        # free-form objects and arrays: nested struct/list columns, type inferred from the first row group
+        'nested': (None, lambda v: _nested(v) if v not in ('', {}, []) else None),
+        'attachments': (pa.list_(pa.struct([
+            ('id', pa.int64()), ('name', pa.string()), ('content_type', pa.string()),
+            ('size', pa.int64()), ('attachment_url', pa.string()),
+            ('created_at', timestamp), ('updated_at', timestamp)])), _to_attachments),
+    }
+
+
+class ParquetStream:
+    """
+    Writes rows to a Parquet file with an explicit, typed schema.
+
+    Takes the same row dictionaries as CSVStream. The schema maps each CSV
+    header to a column kind from _column_types(); the Parquet column name is
+    the header in snake_case. 'nested' columns get struct/list types
+    inferred from the first row group, so readers can query their fields
+    directly; a later row with keys that group did not have raises
+    ValueError rather than losing them. Rows are buffered into row groups
+    of row_group_size and the file is finalised on close.
+    """
+
+    def __init__(self, path: str, schema: Dict[str, str], row_group_size: int = 10000):
+        if pa is None:
+            raise ValueError("Parquet output requires the 'pyarrow' package.")
+
+        types = _column_types()
+        self.path = path
+        self.rows = 0
+        self.row_group_size = row_group_size
+        self._columns = [(header, types[kind][1]) for header, kind in schema.items()]
+        self._names = [header.lower().replace(' ', '_') for header in schema]
+        self._types = [types[kind][0] for kind in schema.values()]
+        self._buffer = [[] for _ in self._columns]
+        self._schema = None
+        self._writer = None
+
+    def write_page(self, rows: Iterable[Dict]) -> int:
+        """
+        Converts a page of rows to the schema types and buffers them.
+
+        Returns:
+            int: Number of rows written for this page.
+        """
+        count = 0
+        for row in rows:
+            for column, (header, convert) in zip(self._buffer, self._columns):
+                column.append(convert(row.get(header)))
+            count += 1
+
+        self.rows += count
+        if len(self._buffer[0]) >= self.row_group_size:
+            self._flush()
+        return count
+
+    def _flush(self) -> None:
+        if self._writer is None:
+            # The first row group settles the types of the nested columns
+            self._schema = pa.schema([pa.field(name, arrow_type or _infer_type(column))
+                                      for name, arrow_type, column in zip(self._names, self._types, self._buffer)])
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression='zstd')
+        if not self._buffer[0]:
+            return
+        arrays = []
+        for name, arrow_type, column, field in zip(self._names, self._types, self._buffer, self._schema):
+            if arrow_type is None:
+                column = [_conform(value, field.type, name) for value in column]
+            arrays.append(pa.array(column, type=field.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+        self._buffer = [[] for _ in self._columns]
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,38 @@
+#
+# Script: Freshservice JSON decoding
+#
+# Overview:
+# Decodes API response bodies straight from response.content. Going
+# through response.text first keeps a decoded text copy of every page next
+# to the records (and runs charset detection on it). When orjson is
+# installed it decodes the bytes, otherwise the standard json module does.
+# Same backends and JSON_BACKEND variable as the Freshstatus scripts'
+# _freshstatus_json.py.
+#
+# Environment:
+#   JSON_BACKEND=builtin     use the json module even if orjson is installed
+
+import os
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def backend() -> str:
+    """Returns the backend in use: orjson when installed, unless JSON_BACKEND says otherwise."""
+    if orjson is not None and os.getenv('JSON_BACKEND', 'orjson').lower() == 'orjson':
+        return 'orjson'
+    return 'builtin'
+
+
+def loads(data):
+    """Decodes a JSON document from bytes or str, e.g. response.content."""
+    if backend() == 'orjson':
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass    # NaN, integers over 64 bits, ...: let json decide
+    return json.loads(data)
@@ -0,0 +1,192 @@
+#
+# Script: Freshservice SQLite mirror
+#
+# Overview:
+# Keeps a local, indexed SQLite copy of the asset and requester data that
+# FSAssets.py exports, so lookups such as "which assets sit at location X
+# with vendor Y?" are answered from disk instead of re-exporting the tenant.
+# Each record is stored whole as JSON next to the columns worth indexing.
+# Later syncs upsert in place and drop records that no longer exist.
+
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Union
+
+# Indexed columns per resource, in addition to id, name, data and synced_at
+RESOURCES = {
+    'asset_types': ['parent_asset_type_id'],
+    'vendors': [],
+    'locations': ['parent_location_id'],
+    'products': ['asset_type_id', 'manufacturer'],
+    'assets': ['display_id', 'asset_type_id', 'location_id', 'vendor_id', 'user_id',
+               'department_id', 'updated_at'],
+    'requesters': ['primary_email', 'location_id', 'active', 'updated_at'],
+}
+
+
+def _vendor_id(record: Dict) -> Optional[int]:
+    """Assets carry their vendor inside type_fields as vendor_<asset type id>."""
+    for key, value in (record.get('type_fields') or {}).items():
+        if key.startswith('vendor_') and value:
+            return value
+    return None
+
+
+def _like_prefix(text: str) -> str:
+    """LIKE pattern (with ESCAPE '\\') matching values that start with text, taken literally."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _name(resource: str, record: Dict) -> Optional[str]:
+    if resource == 'requesters':
+        return ' '.join(filter(None, [record.get('first_name'), record.get('last_name')])) or None
+    return record.get('name')
+
+
+class AssetMirror:
+    """
+    Local SQLite mirror of Freshservice assets, requesters and lookup tables.
+
+    Pages may be written from several threads; writes share one connection
+    under a lock.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock, self._conn:
+            for resource, columns in RESOURCES.items():
+                extra = ''.join(f', {column}' for column in columns)
+                self._conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS {resource} '
+                    f'(id INTEGER PRIMARY KEY, name TEXT{extra}, data TEXT NOT NULL, synced_at REAL NOT NULL)'
+                )
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS ix_{resource}_name ON {resource} (name)')
+                for column in columns:
+                    self._conn.execute(f'CREATE INDEX IF NOT EXISTS ix_{resource}_{column} ON {resource} ({column})')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS sync_log (resource TEXT PRIMARY KEY, '
+                               'started_at REAL, finished_at REAL, records INTEGER)')
+
+    def upsert_page(self, resource: str, records: Iterable[Dict], synced_at: float) -> int:
+        """
+        Inserts or updates a page of records.
+
+        Args:
+            resource (str): One of RESOURCES.
+            records (iterable): Records as returned by the API.
+            synced_at (float): Start time of the current sync, used by prune().
+
+        Returns:
+            int: Number of records written.
+        """
+        columns = RESOURCES[resource]
+        names = ['id', 'name'] + columns + ['data', 'synced_at']
+        rows = []
+        for record in records:
+            values = {column: record.get(column) for column in columns}
+            if 'vendor_id' in values:
+                values['vendor_id'] = _vendor_id(record)
+            rows.append([record['id'], _name(resource, record)] + [values[column] for column in columns]
+                        + [json.dumps(record, separators=(',', ':')), synced_at])
+
+        updates = ', '.join(f'{name} = excluded.{name}' for name in names[1:])
+        sql = (f'INSERT INTO {resource} ({", ".join(names)}) VALUES ({", ".join("?" * len(names))}) '
+               f'ON CONFLICT(id) DO UPDATE SET {updates}')
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+        return len(rows)
+
+    def prune(self, resource: str, synced_at: float, records: int) -> int:
+        """
+        Removes records not seen by the sync that started at synced_at.
+        Only call after the resource has been fully fetched.
+
+        Returns:
+            int: Number of records removed.
+        """
+        with self._lock, self._conn:
+            removed = self._conn.execute(f'DELETE FROM {resource} WHERE synced_at < ?', (synced_at,)).rowcount
+            self._conn.execute('INSERT OR REPLACE INTO sync_log VALUES (?, ?, ?, ?)',
+                               (resource, synced_at, time.time(), records))
+        return removed
+
+    def query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        """Runs a read-only query against the mirror."""
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def get(self, resource: str, record_id: int) -> Optional[Dict]:
+        """Returns the full record for an id, or None."""
+        rows = self.query(f'SELECT data FROM {resource} WHERE id = ?', (record_id,))
+        return json.loads(rows[0]['data']) if rows else None
+
+    def find_assets(self, location: Union[int, str, None] = None, vendor: Union[int, str, None] = None,
+                    asset_type: Union[int, str, None] = None, user: Union[int, str, None] = None) -> List[Dict]:
+        """
+        Finds assets by location, vendor, asset type and/or user. Each filter
+        accepts an id or an exact name (for user, a primary email).
+
+        Returns:
+            list: Matching asset records.
+        """
+        where, params = [], []
+        for column, value, table, label in (('location_id', location, 'locations', 'name'),
+                                             ('vendor_id', vendor, 'vendors', 'name'),
+                                             ('asset_type_id', asset_type, 'asset_types', 'name'),
+                                             ('user_id', user, 'requesters', 'primary_email')):
+            if value is None:
+                continue
+            if isinstance(value, int):
+                where.append(f'a.{column} = ?')
+            else:
+                where.append(f'a.{column} IN (SELECT id FROM {table} WHERE {label} = ?)')
+            params.append(value)
+
+        sql = 'SELECT a.data FROM assets a' + (' WHERE ' + ' AND '.join(where) if where else '')
+        return [json.loads(row['data']) for row in self.query(sql, params)]
+
+    def find_requesters(self, email: Optional[str] = None, name: Optional[str] = None,
+                        location: Union[int, str, None] = None, active: Optional[bool] = None) -> List[Dict]:
+        """
+        Finds requesters by primary email, name prefix, location and/or active flag.
+
+        Returns:
+            list: Matching requester records.
+        """
+        where, params = [], []
+        if email is not None:
+            where.append('r.primary_email = ?')
+            params.append(email)
+        if name is not None:
+            where.append("r.name LIKE ? ESCAPE '\\'")
+            params.append(_like_prefix(name))
+        if location is not None:
+            if isinstance(location, int):
+                where.append('r.location_id = ?')
+            else:
+                where.append('r.location_id IN (SELECT id FROM locations WHERE name = ?)')
+            params.append(location)
+        if active is not None:
+            where.append('r.active = ?')
+            params.append(int(active))
+
+        sql = 'SELECT r.data FROM requesters r' + (' WHERE ' + ' AND '.join(where) if where else '')
+        return [json.loads(row['data']) for row in self.query(sql, params)]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,120 @@
+#
+# Script: Freshservice pagination
+#
+# Overview:
+# Fetches the pages of a paginated /api/v2 list ahead of the caller and
+# hands them back strictly in order. The page count is taken from the
+# response headers when the endpoint reports it (X-Total-Count or a
+# rel="last" Link); otherwise a bounded window of pages is requested
+# speculatively and the end is found by probing: the first page that is
+# short, or that comes back without a rel="next" Link, ends the list and
+# anything fetched past it is dropped. Ending on the Link header also saves
+# the empty request the old loops made when the total was a multiple of 100.
+
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from _freshservice_api import api_get
+from _freshservice_json import loads
+
+PER_PAGE = 100
+PREFETCH_WINDOW = 4     # pages requested ahead of the one being processed
+
+_last_re = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>\s*;\s*rel="last"')
+
+
+def page_count(response, per_page: int = PER_PAGE) -> Optional[int]:
+    """
+    Reads the number of pages from the response headers, if the endpoint
+    reports it.
+
+    Returns:
+        int: Page count, or None when it has to be discovered.
+    """
+    for header in ('X-Total-Count', 'X-Total'):
+        total = response.headers.get(header)
+        if total and total.isdigit():
+            return max(1, -(-int(total) // per_page))
+    match = _last_re.search(response.headers.get('Link', ''))
+    return int(match.group(1)) if match else None
+
+
+def has_next(response) -> bool:
+    return 'rel="next"' in response.headers.get('Link', '')
+
+
+def iter_pages(url_for: Callable[[int], str], key: str, auth=None, headers: Optional[Dict] = None,
+               start: int = 1, per_page: int = PER_PAGE, window: int = PREFETCH_WINDOW,
+               slots: Optional[threading.Semaphore] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Yields the pages of a list endpoint in order while up to `window` later
+    pages are already being fetched.
+
+    Args:
+        url_for (callable): Returns the URL for a page number; must request
+            per_page records per page.
+        key (str): Key holding the records in the response body, e.g. 'assets'.
+        auth (tuple): Basic auth tuple, e.g. (api_key, 'X').
+        headers (dict): Extra request headers.
+        start (int): First page to fetch (e.g. after a resumed checkpoint).
+        per_page (int): Page size used by url_for.
+        window (int): Pages in flight ahead of the caller; 1 disables prefetching.
+        slots (Semaphore): Optional semaphore held around each request, to
+            share a request budget between several paginated resources.
+
+    Yields:
+        tuple: (page number, decoded response body). A body without `key`
+               (e.g. an error) is yielded and ends the iteration.
+    """
+    def fetch(page):
+        if slots:
+            with slots:
+                response = api_get(url_for(page), headers=headers, auth=auth)
+        else:
+            response = api_get(url_for(page), headers=headers, auth=auth)
+        return response, loads(response.content)
+
+    response, body = fetch(start)
+    yield start, body
+    records = body.get(key)
+    if records is None or len(records) < per_page or ('Link' in response.headers and not has_next(response)):
+        return
+
+    last = page_count(response, per_page)
+    # Only trust a missing rel="next" once the endpoint has shown it sends one
+    uses_links = has_next(response)
+
+    def is_last(future):
+        response, body = future.result()
+        records = body.get(key)
+        return records is None or len(records) < per_page or (uses_links and not has_next(response))
+
+    pending = deque()
+    next_page = start + 1
+
+    pool = ThreadPoolExecutor(max_workers=max(1, window))
+    try:
+        while True:
+            # A page that already came back as the last one stops further speculation
+            for page, future in pending:
+                if future.done() and not future.exception() and is_last(future):
+                    last = page if last is None else min(last, page)
+                    break
+
+            while len(pending) < window and (last is None or next_page <= last):
+                pending.append((next_page, pool.submit(fetch, next_page)))
+                next_page += 1
+            if not pending:
+                return
+
+            page, future = pending.popleft()
+            yield page, future.result()[1]
+
+            if is_last(future):
+                return
+    finally:
+        for _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
@@ -0,0 +1,185 @@
+#
+# Script: Freshservice record model
+#
+# Overview:
+# Compact in-memory form of the records the exporters hold on to (the
+# assets and requesters of FSAssets). Records use __slots__ instead of a
+# per-record dict, repeated strings such as job titles and location names
+# are interned, and the heavy payloads (descriptions, type_fields,
+# custom_fields, ...) are kept as compact, zlib-compressed JSON and only
+# decoded when accessed. A RecordTable holds the records of one type with an
+# id index. to_dict() gives back the original record, keys in their original
+# order.
+
+import sys
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+COMPRESS_OVER = 256     # encoded heavy values longer than this (bytes) are compressed
+
+# Tag byte of an encoded heavy value: plain or compressed, string or JSON
+_STR, _JSON, _ZSTR, _ZJSON = b's', b'j', b'S', b'J'
+
+_orders: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _encode(value):
+    """Packs a heavy value into tagged bytes; None, numbers and short strings stay as they are."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) <= 64:
+            return value
+        tag, data = _STR, value.encode('utf-8')
+    else:
+        tag, data = _JSON, json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if len(data) > COMPRESS_OVER:
+        tag, data = (_ZSTR if tag == _STR else _ZJSON), zlib.compress(data)
+    return tag + data
+
+
+def _decode(packed):
+    if not isinstance(packed, bytes):
+        return packed
+    tag, data = packed[:1], packed[1:]
+    if tag in (_ZSTR, _ZJSON):
+        data = zlib.decompress(data)
+    text = data.decode('utf-8')
+    return text if tag in (_STR, _ZSTR) else json.loads(text)
+
+
+class Record:
+    """
+    Base class of the slotted records.
+
+    Subclasses list their LIGHT fields (stored decoded, one slot each), their
+    HEAVY fields (stored packed, decoded on every access), the LIGHT string
+    fields to INTERN, and declare __slots__ = slots_for(LIGHT, HEAVY). Keys
+    a subclass does not know about are packed together and still returned
+    by to_dict(), get() and [].
+    """
+
+    __slots__ = ('_order', '_extra')
+    LIGHT: Tuple[str, ...] = ()
+    HEAVY: Tuple[str, ...] = ()
+    INTERN: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for field in cls.HEAVY:
+            setattr(cls, field, property(lambda self, slot='_' + field: _decode(getattr(self, slot))))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Record':
+        record = cls.__new__(cls)
+        order = tuple(data)
+        record._order = _orders.setdefault(order, order)
+        for field in cls.LIGHT:
+            value = data.get(field)
+            if field in cls.INTERN and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(record, field, value)
+        for field in cls.HEAVY:
+            setattr(record, '_' + field, _encode(data.get(field)))
+        extra = {key: value for key, value in data.items() if key not in cls._known()}
+        record._extra = _encode(extra) if extra else None
+        return record
+
+    @classmethod
+    def _known(cls) -> frozenset:
+        known = cls.__dict__.get('_known_fields')
+        if known is None:
+            known = frozenset(cls.LIGHT + cls.HEAVY)
+            setattr(cls, '_known_fields', known)
+        return known
+
+    def get(self, key: str, default=None):
+        if key not in self._order:
+            return default
+        if key in self.LIGHT or key in self.HEAVY:
+            return getattr(self, key)
+        return _decode(self._extra)[key]
+
+    def __getitem__(self, key: str):
+        if key not in self._order:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._order
+
+    def to_dict(self) -> Dict:
+        """Decodes the full record, keys in the order the API returned them."""
+        extra = _decode(self._extra) or {}
+        return {key: extra[key] if key in extra else getattr(self, key) for key in self._order}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+
+def slots_for(light: Tuple[str, ...], heavy: Tuple[str, ...]) -> Tuple[str, ...]:
+    return light + tuple('_' + field for field in heavy)
+
+
+class Asset(Record):
+    LIGHT = ('id', 'display_id', 'name', 'asset_type_id', 'asset_tag', 'impact', 'author_type', 'usage_type',
+             'user_id', 'location_id', 'department_id', 'agent_id', 'group_id', 'workspace_id', 'assigned_on',
+             'created_at', 'updated_at')
+    HEAVY = ('description', 'type_fields')
+    INTERN = ('impact', 'author_type', 'usage_type')
+    __slots__ = slots_for(LIGHT, HEAVY)
+
+
+class Requester(Record):
+    LIGHT = ('id', 'first_name', 'last_name', 'primary_email', 'job_title', 'work_phone_number',
+             'mobile_phone_number', 'reporting_manager_id', 'location_id', 'location_name', 'language',
+             'time_zone', 'time_format', 'active', 'has_logged_in', 'vip_user', 'is_agent', 'created_at',
+             'updated_at')
+    HEAVY = ('address', 'background_information', 'custom_fields', 'secondary_emails', 'department_ids',
+             'department_names')
+    INTERN = ('job_title', 'location_name', 'language', 'time_zone', 'time_format')
+    __slots__ = slots_for(LIGHT, HEAVY)
+
+
+class RecordTable:
+    """
+    Records of one type, indexed by id.
+
+    Adding a record with an id already present replaces it in place.
+    """
+
+    def __init__(self, record_class=Record):
+        self.record_class = record_class
+        self.records: List[Record] = []
+        self._index: Dict[int, int] = {}
+
+    def add(self, data: Dict) -> Record:
+        record = self.record_class.from_dict(data)
+        position = self._index.get(data['id'])
+        if position is None:
+            self._index[data['id']] = len(self.records)
+            self.records.append(record)
+        else:
+            self.records[position] = record
+        return record
+
+    def extend(self, items: Iterable[Dict]) -> int:
+        count = 0
+        for data in items:
+            self.add(data)
+            count += 1
+        return count
+
+    def get(self, record_id: int) -> Optional[Record]:
+        position = self._index.get(record_id)
+        return None if position is None else self.records[position]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Record]:
+        return iter(self.records)
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self._index
@@ -0,0 +1,243 @@
+#
+# Script: Freshservice KB search index
+#
+# Overview:
+# Local full-text search over exported KB articles, so lookups no longer
+# need a round-trip to /solutions/articles/search. Articles are read from a
+# KB_Import.py CSV or an FSSolutions.py tree, indexed on title, keywords and
+# description text, and ranked with BM25 (title and keyword matches weigh
+# more). Re-syncing only re-tokenizes articles whose updated_at changed.
+#
+# Usage:
+#   python _freshservice_search.py --csv Freshservice_KB_Export_....csv
+#   python _freshservice_search.py --tree C:/Users/.../Downloads/
+#   python _freshservice_search.py "cisco vpn"
+
+import os
+import re
+import csv
+import sys
+import math
+import json
+import heapq
+import pickle
+import argparse
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+INDEX_FILE = 'Freshservice_KB_Search.idx'
+
+# BM25 parameters and per-field weights
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = {'title': 3.0, 'keywords': 2.0, 'description_text': 1.0}
+
+STOPWORDS = frozenset('a an and are as at be by for from how i in is it of on or the this to what with'.split())
+_token_re = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _token_re.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    Inverted index of KB articles with BM25 ranking.
+
+    postings maps term -> {article id: weighted term frequency}; docs keeps
+    per-article metadata, its weighted length and its terms (for removal).
+    """
+
+    def __init__(self):
+        self.docs: Dict[str, Dict] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.total_length = 0.0
+        self._norms = None
+
+    def add(self, article: Dict) -> bool:
+        """
+        Adds or replaces an article. Articles whose updated_at is unchanged
+        are left alone.
+
+        Args:
+            article (dict): Needs id, title, updated_at; keywords and
+                description_text are optional.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        doc_id = str(article['id'])
+        current = self.docs.get(doc_id)
+        if current and current['updated_at'] == article.get('updated_at'):
+            return False
+        if current:
+            self.remove(doc_id)
+
+        weights = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            value = article.get(field) or ''
+            if isinstance(value, list):
+                value = ' '.join(map(str, value))
+            for term in tokenize(value):
+                weights[term] += weight
+
+        for term, tf in weights.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+        length = sum(weights.values())
+        self.docs[doc_id] = {
+            'id': article['id'],
+            'title': article.get('title', ''),
+            'folder_id': article.get('folder_id'),
+            'url': article.get('url', ''),
+            'updated_at': article.get('updated_at'),
+            'length': length,
+            'terms': list(weights)
+        }
+        self.total_length += length
+        self._norms = None
+        return True
+
+    def remove(self, doc_id: str) -> None:
+        doc = self.docs.pop(str(doc_id), None)
+        if not doc:
+            return
+        for term in doc['terms']:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(str(doc_id), None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= doc['length']
+        self._norms = None
+
+    def _length_norms(self) -> Dict[str, float]:
+        """BM25 length normalisation per article, cached until the index changes."""
+        if self._norms is None:
+            avg_length = self.total_length / len(self.docs) or 1.0
+            self._norms = {doc_id: K1 * (1 - B + B * doc['length'] / avg_length)
+                           for doc_id, doc in self.docs.items()}
+        return self._norms
+
+    def sync(self, articles: Iterable[Dict]) -> Tuple[int, int, int]:
+        """
+        Brings the index in line with a complete export: changed articles are
+        re-indexed and articles missing from the export are removed.
+
+        Returns:
+            tuple: (added or updated, removed, unchanged)
+        """
+        seen = set()
+        changed = unchanged = 0
+        for article in articles:
+            seen.add(str(article['id']))
+            if self.add(article):
+                changed += 1
+            else:
+                unchanged += 1
+
+        stale = [doc_id for doc_id in self.docs if doc_id not in seen]
+        for doc_id in stale:
+            self.remove(doc_id)
+        return changed, len(stale), unchanged
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[float, Dict]]:
+        """
+        Ranks articles against the query with BM25.
+
+        Returns:
+            list: (score, article metadata) pairs, best first.
+        """
+        if not self.docs:
+            return []
+
+        n = len(self.docs)
+        norms = self._length_norms()
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            boost = idf * (K1 + 1)
+            for doc_id, tf in postings.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + boost * tf / (tf + norms[doc_id])
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, {k: v for k, v in self.docs[doc_id].items() if k not in ('terms', 'length')})
+                for doc_id, score in best]
+
+    def save(self, path: str = INDEX_FILE) -> None:
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as file:
+            pickle.dump({k: v for k, v in self.__dict__.items() if k != '_norms'}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> 'SearchIndex':
+        """Loads a saved index, or returns an empty one if none exists yet."""
+        index = cls()
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                index.__dict__.update(pickle.load(file))
+        return index
+
+
+def articles_from_csv(csv_file: str) -> Iterable[Dict]:
+    """Reads articles from a KB_Import.py export."""
+    with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            yield {
+                'id': row['Article ID'],
+                'title': row['Title'],
+                'keywords': row.get('Keywords', ''),
+                'description_text': row.get('Description Text', ''),
+                'folder_id': row.get('Folder ID'),
+                'url': row.get('URL', ''),
+                'updated_at': row['Updated At']
+            }
+
+
+def articles_from_tree(root: str) -> Iterable[Dict]:
+    """Reads articles from the .json files of an FSSolutions.py export."""
+    for dirpath, _, files in os.walk(root):
+        for name in sorted(files):
+            if not name.endswith('.json') or name == 'solutions_manifest.json':
+                continue
+            with open(os.path.join(dirpath, name), 'r', encoding='utf-8') as file:
+                article = json.load(file)
+            if 'id' in article and 'title' in article:
+                yield article
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search exported Freshservice KB articles locally.')
+    parser.add_argument('query', nargs='?', help='Search terms')
+    parser.add_argument('--index', default=INDEX_FILE, help='Index file (default: %(default)s)')
+    parser.add_argument('--csv', help='Sync the index from a KB_Import.py CSV export')
+    parser.add_argument('--tree', help='Sync the index from an FSSolutions.py export directory')
+    parser.add_argument('--limit', type=int, default=10, help='Number of results (default: %(default)s)')
+    args = parser.parse_args()
+
+    index = SearchIndex.load(args.index)
+
+    if args.csv or args.tree:
+        source = articles_from_csv(args.csv) if args.csv else articles_from_tree(args.tree)
+        changed, removed, unchanged = index.sync(source)
+        index.save(args.index)
+        print(f"Index updated: {changed} added or updated, {removed} removed, {unchanged} unchanged.")
+
+    if args.query:
+        results = index.search(args.query, args.limit)
+        if not results:
+            print(f"No articles found for '{args.query}'.")
+        for score, article in results:
+            print(f"{score:7.3f}  {article['id']}  {article['title']}")
+    elif not (args.csv or args.tree):
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
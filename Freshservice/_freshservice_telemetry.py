@@ -0,0 +1,225 @@
+#
+# Script: Freshservice HTTP telemetry
+#
+# Overview:
+# Records what every request made through _freshservice_api costs: latency
+# histograms per endpoint, bytes sent and received, retries, 429s, time spent
+# pacing for the rate limit and the lowest X-RateLimit-Remaining seen per
+# host. A summary is printed when the script exits, so a slow export can be
+# put down to latency, throttling or local processing. The Freshstatus
+# scripts use this module too (through _freshstatus_telemetry.py), with
+# their own Telemetry instance and metric prefix.
+#
+# Environment:
+#   TELEMETRY=false          no end-of-run summary
+#   TELEMETRY_JSON=<path>    also write the report as JSON
+#   TELEMETRY_PROM=<path>    also write a Prometheus textfile (node_exporter
+#                            textfile collector format)
+
+import os
+import re
+import json
+import time
+import atexit
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+from typing import Dict, Optional
+
+METRIC_PREFIX = 'freshservice'
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+
+_id_re = re.compile(r'/\d+(?=/|$)')
+
+
+def is_telemetry_mode() -> bool:
+    """Check if the end-of-run summary is enabled via environment variable."""
+    return os.getenv('TELEMETRY', 'True').lower() in ['true', '1', 't', 'y', 'yes']
+
+
+def endpoint_of(url: str) -> str:
+    """Groups URLs by path with record ids collapsed, e.g. /api/v2/solutions/folders/{id}."""
+    return _id_re.sub('/{id}', urlsplit(url).path.rstrip('/')) or '/'
+
+
+class Telemetry:
+    """Thread-safe per-endpoint and per-host request statistics."""
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self.started = time.time()
+        self.endpoints: Dict[tuple, Dict] = {}
+        self.hosts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, status: int, elapsed: float, bytes_out: int = 0,
+               bytes_in: int = 0, retries: int = 0, throttled: int = 0, cached: bool = False) -> None:
+        """
+        Records one call to make_api_request.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            status (int): Final status code.
+            elapsed (float): Seconds for the whole call, retries included.
+            bytes_out (int): Request body size.
+            bytes_in (int): Response body size.
+            retries (int): Attempts beyond the first.
+            throttled (int): 429 responses among all attempts.
+            cached (bool): Served from the response cache.
+        """
+        key = (method, endpoint_of(url))
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = {'count': 0, 'seconds': 0.0, 'max': 0.0,
+                                               'buckets': [0] * len(BUCKETS), 'bytes_out': 0, 'bytes_in': 0,
+                                               'retries': 0, 'throttled': 0, 'cached': 0, 'statuses': Counter()}
+            stats['count'] += 1
+            stats['seconds'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+            stats['buckets'][next(i for i, bound in enumerate(BUCKETS) if elapsed <= bound)] += 1
+            stats['bytes_out'] += bytes_out
+            stats['bytes_in'] += bytes_in
+            stats['retries'] += retries
+            stats['throttled'] += throttled
+            stats['cached'] += int(cached)
+            stats['statuses'][status] += 1
+
+    def _host(self, host: str) -> Dict:
+        return self.hosts.setdefault(host, {'remaining_min': None, 'quota': None, 'paced_seconds': 0.0, 'paced': 0})
+
+    def record_rate_limit(self, host: str, remaining: int, total: int) -> None:
+        """Tracks the lowest rate-limit headroom seen for a host."""
+        with self._lock:
+            stats = self._host(host)
+            if stats['remaining_min'] is None or remaining < stats['remaining_min']:
+                stats['remaining_min'] = remaining
+            stats['quota'] = total or stats['quota']
+
+    def record_pacing(self, host: str, seconds: float) -> None:
+        """Records time spent waiting for rate-limit headroom."""
+        with self._lock:
+            stats = self._host(host)
+            stats['paced'] += 1
+            stats['paced_seconds'] += seconds
+
+    @staticmethod
+    def _quantile(stats: Dict, q: float) -> float:
+        """Upper bound of the histogram bucket holding the q-th quantile."""
+        target = q * stats['count']
+        seen = 0
+        for bound, count in zip(BUCKETS, stats['buckets']):
+            seen += count
+            if seen >= target:
+                return min(bound, stats['max'])
+        return stats['max']
+
+    def report(self) -> Dict:
+        """Returns the collected statistics as a JSON-serialisable dict."""
+        with self._lock:
+            endpoints = [{
+                'method': method, 'endpoint': endpoint, 'count': s['count'],
+                'seconds_total': round(s['seconds'], 4), 'seconds_max': round(s['max'], 4),
+                'seconds_p50': round(self._quantile(s, 0.5), 4), 'seconds_p95': round(self._quantile(s, 0.95), 4),
+                'buckets': {('+Inf' if bound == float('inf') else str(bound)): count
+                            for bound, count in zip(BUCKETS, s['buckets'])},
+                'bytes_out': s['bytes_out'], 'bytes_in': s['bytes_in'], 'retries': s['retries'],
+                'throttled': s['throttled'], 'cached': s['cached'],
+                'statuses': {str(status): count for status, count in sorted(s['statuses'].items())}
+            } for (method, endpoint), s in sorted(self.endpoints.items(), key=lambda item: -item[1]['seconds'])]
+            hosts = {host: dict(s, paced_seconds=round(s['paced_seconds'], 4)) for host, s in self.hosts.items()}
+        return {'started': self.started, 'wall_seconds': round(time.time() - self.started, 4),
+                'endpoints': endpoints, 'hosts': hosts}
+
+    def summary(self, report: Optional[Dict] = None) -> str:
+        report = report or self.report()
+        endpoints = report['endpoints']
+        lines = [f"{'Endpoint':<48}{'Calls':>7}{'p50 s':>8}{'p95 s':>8}{'Max s':>8}{'Retry':>7}{'429':>6}{'KB in':>10}"]
+        for e in endpoints:
+            name = f"{e['method']} {e['endpoint']}"
+            lines.append(f"{name[:47]:<48}{e['count']:>7}{e['seconds_p50']:>8.2f}{e['seconds_p95']:>8.2f}"
+                         f"{e['seconds_max']:>8.2f}{e['retries']:>7}{e['throttled']:>6}{e['bytes_in'] / 1024:>10.1f}")
+
+        http = sum(e['seconds_total'] for e in endpoints)
+        paced = sum(h['paced_seconds'] for h in report['hosts'].values())
+        lines.append(f"{sum(e['count'] for e in endpoints)} requests in {report['wall_seconds']:.1f}s wall: "
+                     f"{http:.1f}s cumulative in HTTP calls, {paced:.1f}s of it pacing for the rate limit, "
+                     f"{sum(e['throttled'] for e in endpoints)} throttled (429).")
+        for host, h in report['hosts'].items():
+            if h['remaining_min'] is not None:
+                lines.append(f"{host}: lowest rate-limit headroom {h['remaining_min']}"
+                             + (f" of {h['quota']}" if h['quota'] else '') + '.')
+        return '\n'.join(lines)
+
+    def prometheus(self, report: Optional[Dict] = None) -> str:
+        """Renders the report in the Prometheus text exposition format."""
+        report = report or self.report()
+        p = self.prefix
+        lines = [f'# HELP {p}_http_request_duration_seconds Time per API call, retries included.',
+                 f'# TYPE {p}_http_request_duration_seconds histogram']
+        for e in report['endpoints']:
+            labels = f'method="{e["method"]}",endpoint="{e["endpoint"]}"'
+            cumulative = 0
+            for bound, count in e['buckets'].items():
+                cumulative += count
+                lines.append(f'{p}_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{p}_http_request_duration_seconds_sum{{{labels}}} {e["seconds_total"]}')
+            lines.append(f'{p}_http_request_duration_seconds_count{{{labels}}} {e["count"]}')
+
+        for metric, field, help_text in (('http_request_bytes_total', 'bytes_out', 'Request body bytes sent.'),
+                                         ('http_response_bytes_total', 'bytes_in', 'Response body bytes received.'),
+                                         ('http_retries_total', 'retries', 'Attempts beyond the first.'),
+                                         ('http_throttled_total', 'throttled', 'Responses with status 429.'),
+                                         ('http_cache_hits_total', 'cached', 'Calls answered from the response cache.')):
+            lines += [f'# HELP {p}_{metric} {help_text}', f'# TYPE {p}_{metric} counter']
+            lines += [f'{p}_{metric}{{method="{e["method"]}",endpoint="{e["endpoint"]}"}} {e[field]}'
+                      for e in report['endpoints']]
+
+        lines += [f'# HELP {p}_http_responses_total Final responses by status code.', f'# TYPE {p}_http_responses_total counter']
+        lines += [f'{p}_http_responses_total{{method="{e["method"]}",endpoint="{e["endpoint"]}",status="{status}"}} {count}'
+                  for e in report['endpoints'] for status, count in e['statuses'].items()]
+
+        lines += [f'# HELP {p}_rate_limit_remaining_min Lowest X-RateLimit-Remaining seen.', f'# TYPE {p}_rate_limit_remaining_min gauge']
+        lines += [f'{p}_rate_limit_remaining_min{{host="{host}"}} {h["remaining_min"]}'
+                  for host, h in report['hosts'].items() if h['remaining_min'] is not None]
+        lines += [f'# HELP {p}_rate_limit_paced_seconds_total Time spent waiting for rate-limit headroom.',
+                  f'# TYPE {p}_rate_limit_paced_seconds_total counter']
+        lines += [f'{p}_rate_limit_paced_seconds_total{{host="{host}"}} {h["paced_seconds"]}'
+                  for host, h in report['hosts'].items()]
+
+        lines += [f'# HELP {p}_run_wall_seconds Wall time of the run.', f'# TYPE {p}_run_wall_seconds gauge',
+                  f'{p}_run_wall_seconds {report["wall_seconds"]}']
+        return '\n'.join(lines) + '\n'
+
+
+def _write(path: str, text: str) -> None:
+    """Writes via a temporary file so collectors never read a partial report."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(tmp, path)
+
+
+def install(prefix: str) -> Telemetry:
+    """Creates a Telemetry whose metrics are named <prefix>_... and reports it when the script exits."""
+    instance = Telemetry(prefix)
+    atexit.register(_finish, instance)
+    return instance
+
+
+def _finish(instance: Telemetry) -> None:
+    if not instance.endpoints:
+        return
+    report = instance.report()
+    if is_telemetry_mode():
+        print('\n' + instance.summary(report))
+    if os.getenv('TELEMETRY_JSON'):
+        _write(os.getenv('TELEMETRY_JSON'), json.dumps(report, indent=4))
+    if os.getenv('TELEMETRY_PROM'):
+        _write(os.getenv('TELEMETRY_PROM'), instance.prometheus(report))
+
+
+telemetry = install(METRIC_PREFIX)
@@ -0,0 +1,151 @@
+#
+# Script: Freshservice ticket windows
+#
+# Overview:
+# Time-window walk used by Tickets_Import.py. The updated_since range of an
+# export is cut into windows that are fetched in parallel. Each window
+# lists tickets updated since its start, ordered by updated_at, and stops
+# at the first ticket updated at or after its end. A window with more
+# tickets than the API's pagination depth is split in two. The walk needs
+# the pages in updated_at order. Freshservice only documents order_type for
+# /api/v2/tickets, and without order_by the list is sorted by created_at.
+# So every page is checked, and a window whose updated_at goes backwards
+# raises instead of silently dropping the tickets after the early stop.
+# TicketWriter drops the copies of a ticket that more than one window
+# returned.
+
+import os
+import gzip
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from _freshservice_export import zstandard
+
+ISO_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+Window = Tuple[datetime, datetime]
+
+
+def parse_time(value: str) -> datetime:
+    """Parses one of the API's UTC timestamps."""
+    return datetime.strptime(value, ISO_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def format_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime(ISO_FORMAT)
+
+
+def initial_windows(start: datetime, end: datetime, window_days: int) -> List[Window]:
+    """Cuts [start, end) into windows of window_days."""
+    windows = []
+    while start < end:
+        windows.append((start, min(start + timedelta(days=window_days), end)))
+        start = windows[-1][1]
+    return windows
+
+
+def fetch_window(start: datetime, end: datetime, writer: 'TicketWriter',
+                 pages_for: Callable[[datetime], Iterator[Tuple[int, Dict]]], max_pages: int) -> List[Window]:
+    """
+    Walks one window and writes its tickets.
+
+    Args:
+        start (datetime): Start of the window (inclusive).
+        end (datetime): End of the window (exclusive).
+        writer (TicketWriter): Receives the tickets of every page.
+        pages_for (callable): Returns the (page, body) iterator of the tickets
+            updated since a point in time, ordered by updated_at (e.g. iter_pages).
+        max_pages (int): The API's pagination depth limit.
+
+    Returns:
+        list: The sub-windows still to fetch when the window is too dense for
+              max_pages, otherwise an empty list.
+
+    Raises:
+        RuntimeError: When a page is an error, or the tickets do not come
+            back in updated_at order.
+    """
+    last_seen = None
+    previous = None
+    pages = pages_for(start)
+    try:
+        for page, body in pages:
+            if 'tickets' not in body:
+                raise RuntimeError(f"Fetching tickets updated since {format_time(start)} failed: {body}")
+
+            stamps = [parse_time(t['updated_at']) for t in body['tickets']]
+            for ticket, stamp in zip(body['tickets'], stamps):
+                if previous is not None and stamp < previous:
+                    raise RuntimeError(f"Tickets updated since {format_time(start)} are not in updated_at order "
+                                       f"(ticket {ticket['id']} on page {page} is older than the one before it); "
+                                       f"stopping at the window's end would drop tickets.")
+                previous = stamp
+
+            tickets = [t for t, stamp in zip(body['tickets'], stamps) if start <= stamp < end]
+            writer.write(tickets)
+            if tickets:
+                last_seen = parse_time(tickets[-1]['updated_at'])
+
+            if len(tickets) < len(body['tickets']):
+                return []
+            if page == max_pages:
+                break
+        else:
+            return []
+    finally:
+        pages.close()
+
+    # Too dense: the rest of the window starts at the last ticket seen (tickets
+    # sharing that timestamp are fetched again and de-duplicated) and is split in two
+    if last_seen is None or last_seen <= start:
+        print(f"Warning: over {max_pages * 100} tickets updated at {format_time(start)}; some may be missing.")
+        return []
+    middle = (last_seen + (end - last_seen) / 2).replace(microsecond=0)
+    if middle <= last_seen:
+        return [(last_seen, end)]
+    print(f"Window {format_time(start)} - {format_time(end)} is dense, splitting at {format_time(middle)}.")
+    return [(last_seen, middle), (middle, end)]
+
+
+class TicketWriter:
+    """
+    Streams tickets to the NDJSON file, skipping copies already written.
+
+    A ticket updated while the export runs can turn up again in a later
+    window. Only a newer copy is written; the older one is dropped when the
+    file is compacted at the end.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.seen: Dict[int, str] = {}
+        self.superseded: Dict[int, Set[str]] = {}
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    def write(self, tickets: List[Dict]) -> None:
+        with self._lock:
+            fresh = []
+            for ticket in tickets:
+                previous = self.seen.get(ticket['id'])
+                if previous is not None and previous >= ticket['updated_at']:
+                    self.duplicates += 1
+                    continue
+                if previous is not None:
+                    self.superseded.setdefault(ticket['id'], set()).add(previous)
+                self.seen[ticket['id']] = ticket['updated_at']
+                fresh.append(ticket)
+            self.stream.write_page(fresh)
+
+
+def compact(path: str, superseded: Dict[int, Set[str]], compression: Optional[str] = 'gzip') -> None:
+    """Drops superseded ticket copies from the finished file."""
+    opener = {'gzip': gzip.open, 'zstd': zstandard and zstandard.open}.get(compression, open)
+    tmp = path + '.tmp'
+    with opener(path, 'rt', encoding='utf-8') as source, opener(tmp, 'wt', encoding='utf-8') as target:
+        for line in source:
+            ticket = json.loads(line)
+            if ticket['updated_at'] not in superseded.get(ticket['id'], ()):
+                target.write(line)
+    os.replace(tmp, path)
@@ -0,0 +1,107 @@
+#
+# Script: Freshservice workspace fan-out
+#
+# Overview:
+# Runs a workspace-scoped export across several workspaces at once. The
+# workspace list is discovered once from /api/v2/workspaces (or taken from
+# the script's configured ids), each workspace is fetched on its own thread,
+# and the results come back tagged with the workspace they belong to so
+# they can be merged into one output.
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from _freshservice_api import api_get
+from _freshservice_json import loads
+
+ALL = 'all'
+MAX_WORKERS = 4     # workspaces fetched at the same time
+
+_done = object()
+
+
+def discover_workspaces(domain: str, auth, headers: Dict = None) -> List[Dict]:
+    """
+    Lists the workspaces of the Freshservice instance.
+
+    Returns:
+        list: Workspace records (id, name, state, ...).
+    """
+    response = api_get(f'https://{domain}.freshservice.com/api/v2/workspaces', headers=headers, auth=auth, cache=True)
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to list workspaces. Status code: {response.status_code}, Response: {response.text}")
+    return loads(response.content)['workspaces']
+
+
+def resolve_workspaces(selection: Union[str, Iterable[int]], domain: str, auth, headers: Dict = None) -> List[Dict]:
+    """
+    Turns a script's workspace setting into workspace records.
+
+    Args:
+        selection: ALL to discover every workspace, or a list of workspace ids.
+
+    Returns:
+        list: Workspace records; ids that were not discovered get {'id': id, 'name': ''}.
+    """
+    if selection == ALL:
+        return discover_workspaces(domain, auth, headers)
+    return [{'id': workspace_id, 'name': ''} for workspace_id in selection]
+
+
+def fan_out(workspaces: List[Dict], fetch: Callable[[Dict], object],
+            max_workers: int = MAX_WORKERS) -> List[Tuple[Dict, object]]:
+    """
+    Calls fetch(workspace) for every workspace in parallel.
+
+    Returns:
+        list: (workspace, result) pairs in the order of `workspaces`.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(workspaces)))) as pool:
+        return list(zip(workspaces, pool.map(fetch, workspaces)))
+
+
+def merge_pages(workspaces: List[Dict], pages_for: Callable[[Dict], Iterable],
+                max_workers: int = MAX_WORKERS) -> Iterator[Tuple[Dict, object]]:
+    """
+    Drains pages_for(workspace) for every workspace in parallel and yields
+    the pages in the caller's thread as they arrive, so a single writer can
+    merge them into one file. Each workspace's pages keep their order.
+
+    Yields:
+        tuple: (workspace, page)
+    """
+    pages = queue.Queue(maxsize=2 * max(1, max_workers))
+    stop = threading.Event()
+
+    def drain(workspace):
+        try:
+            for page in pages_for(workspace):
+                if stop.is_set():
+                    return
+                pages.put((workspace, page))
+        except BaseException as e:
+            pages.put((workspace, e))
+        finally:
+            pages.put((workspace, _done))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(workspaces)))) as pool:
+        for workspace in workspaces:
+            pool.submit(drain, workspace)
+
+        remaining = len(workspaces)
+        try:
+            while remaining:
+                workspace, page = pages.get()
+                if page is _done:
+                    remaining -= 1
+                elif isinstance(page, BaseException):
+                    raise page
+                else:
+                    yield workspace, page
+        finally:
+            # Unblock producers that are still waiting to hand over a page
+            stop.set()
+            while remaining:
+                if pages.get()[1] is _done:
+                    remaining -= 1
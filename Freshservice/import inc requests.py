@@ -1,4 +1,5 @@
-import requests
+from _freshservice_api import api_get
+from _freshservice_workspaces import ALL, resolve_workspaces, fan_out
 import json
 
 # Define the API key and domain
@@ -6,10 +7,14 @@ api_key = '[redacted]'
 domain = 'hts-fs-sandbox'
 headers = {'Content-Type': 'application/json'}
 
+# Workspaces to fetch ticket form fields for: a list of ids, or ALL to
+# discover every workspace and fetch them in parallel
+workspaces = [1]
+
 # Function to fetch ticket details
-def fetch_ticket(ticket_id):
-    ticket_url = f'https://{domain}.freshservice.com/api/v2/ticket_form_fields?workspace_id=1'
-    response = requests.get(ticket_url, headers=headers, auth=(api_key, 'X'))
+def fetch_ticket(ticket_id, workspace_id=1):
+    ticket_url = f'https://{domain}.freshservice.com/api/v2/ticket_form_fields?workspace_id={workspace_id}'
+    response = api_get(ticket_url, headers=headers, auth=(api_key, 'X'), cache=True)
     
     # Check if the response status code is 200 (OK)
     if response.status_code == 200:
@@ -20,8 +25,10 @@ def fetch_ticket(ticket_id):
 
 # Fetch ticket details for ticket ID 20
 ticket_id = 115
-ticket_details = fetch_ticket(ticket_id)
+results = fan_out(resolve_workspaces(workspaces, domain, (api_key, 'X'), headers),
+                  lambda workspace: fetch_ticket(ticket_id, workspace['id']))
 
-# Print the ticket details if the fetch was successful
+# Print the ticket details, merged and keyed by workspace, if the fetch was successful
+ticket_details = {str(workspace['id']): details for workspace, details in results if details}
 if ticket_details:
     print(json.dumps(ticket_details, indent=4))
\ No newline at end of file
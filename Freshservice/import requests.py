@@ -1,4 +1,4 @@
-import requests
+from _freshservice_api import api_get
 import json
 
 # Define the API key and domain
@@ -11,7 +11,7 @@ def fetch_article(s_term, user_email, page=1, per_page=10):
     article_url = f'https://{domain}.freshservice.com/api/v2/solutions/articles/search?search_term={s_term}&' if user_email == user_email else '' + f'&page={page}&per_page={per_page}'
     
     # Make the API request to fetch the article
-    response = requests.get(article_url, headers=headers, auth=(api_key, 'X'))
+    response = api_get(article_url, headers=headers, auth=(api_key, 'X'))
     
     # Check if the request was successful
     if response.status_code == 200:
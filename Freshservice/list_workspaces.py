@@ -1,5 +1,5 @@
-import requests
-import json
+from _freshservice_api import api_get
+from _freshservice_json import loads
 
 # Define the API key and domain
 api_key = '[redacted]'
@@ -9,8 +9,8 @@ headers = {'Content-Type': 'application/json'}
 # Function to fetch workspaces
 def fetch_workspaces():
     workspaces_url = f'https://{domain}.freshservice.com/api/v2/workspaces'
-    response = requests.get(workspaces_url, headers=headers, auth=(api_key, 'X'))
-    return json.loads(response.text)
+    response = api_get(workspaces_url, headers=headers, auth=(api_key, 'X'), cache=True)
+    return loads(response.content)
 
 # Fetch workspaces
 workspaces = fetch_workspaces()
@@ -1,4 +1,5 @@
-import requests
+from _freshservice_api import api_get
+from _freshservice_workspaces import ALL, resolve_workspaces, fan_out
 import json
 
 # Define the API key and domain
@@ -6,10 +7,14 @@ api_key = '[redacted]'
 domain = 'hts'
 headers = {'Content-Type': 'application/json'}
 
-# Function to fetch SLA policies
-def fetch_sla_policies():
-    sla_policies_url = f'https://{domain}.freshservice.com/api/v2/sla_policies?workspace_id=2'
-    response = requests.get(sla_policies_url, headers=headers, auth=(api_key, 'X'))
+# Workspaces to list SLA policies for: a list of ids, or ALL to discover
+# every workspace and fetch them in parallel
+workspaces = [2]
+
+# Function to fetch the SLA policies of a workspace
+def fetch_sla_policies(workspace):
+    sla_policies_url = f'https://{domain}.freshservice.com/api/v2/sla_policies?workspace_id={workspace["id"]}'
+    response = api_get(sla_policies_url, headers=headers, auth=(api_key, 'X'), cache=True)
     
     # Check if the response status code is 200 (OK)
     if response.status_code == 200:
@@ -18,10 +23,11 @@ def fetch_sla_policies():
         print(f"Failed to fetch SLA policies. Status code: {response.status_code}, Response: {response.text}")
         return None
 
-# Fetch SLA policies
-sla_policies = fetch_sla_policies()
+# Fetch SLA policies for every selected workspace
+results = fan_out(resolve_workspaces(workspaces, domain, (api_key, 'X'), headers), fetch_sla_policies)
 
-# Print the list of SLA policies if the fetch was successful
-if sla_policies:
-    for sla in sla_policies['sla_policies']:
-        print(f"SLA ID: {sla['id']}, SLA Name: {sla['name']}")
\ No newline at end of file
+# Print the merged list of SLA policies, tagged with their workspace
+for workspace, sla_policies in results:
+    if sla_policies:
+        for sla in sla_policies['sla_policies']:
+            print(f"Workspace ID: {workspace['id']}, SLA ID: {sla['id']}, SLA Name: {sla['name']}")
\ No newline at end of file
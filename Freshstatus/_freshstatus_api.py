@@ -1,11 +1,17 @@
 import os
 import json
+import time
 import requests
+from urllib.parse import urlsplit
+from _freshstatus_telemetry import telemetry
 from typing import Optional, Tuple, Dict
 
 class DryRunModeError(Exception):
     pass
 
+# Base URL of the Freshstatus public API; FRESHSTATUS_API_BASE points it elsewhere (e.g. a local mock)
+API_ENDPOINT = os.getenv('FRESHSTATUS_API_BASE', 'https://public-api.freshstatus.io/api/v1/').rstrip('/') + '/'
+
 # Constants for HTTP methods
 GET = 'GET'
 POST = 'POST'
@@ -36,7 +42,7 @@ def validate_payload(payload: dict) -> bool:
 
 def get_service_components(auth: Tuple[str, str]) -> dict:
     api_key, account_name = auth
-    url = 'https://public-api.freshstatus.io/api/v1/services'
+    url = API_ENDPOINT + 'services'
     headers = {'Authorization': f'Bearer {api_key}'}
     with requests.Session() as session:
         session.headers.update(headers)
@@ -44,20 +50,30 @@ def get_service_components(auth: Tuple[str, str]) -> dict:
         response.raise_for_status()
         return response.json()
 
-def create_group(auth: Tuple[str, str], group_name: str, parent_id: str) -> dict:
-    api_key, account_name = auth
-    url = 'https://public-api.freshstatus.io/api/v1/groups'
-    headers = {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
+def create_group(auth: Tuple[str, str], group_name: str, parent_id: str, order: Optional[int] = None) -> dict:
+    """Creates a group on the status page of auth's account and returns it."""
+    _, account_name = auth
     data = {'name': group_name, 'parent_id': parent_id}
-    with requests.Session() as session:
-        session.headers.update(headers)
-        response = session.post(url, json=data)
-        response.raise_for_status()
-        return response.json()
+    if order is not None:
+        data['order'] = order
+    response = make_api_request('groups/', 'POST', acct=account_name, payload=data)
+    response.raise_for_status()
+    return response.json()
+
+def record_telemetry(mode: str, response: requests.Response, elapsed: float) -> None:
+    """Record a finished request for the end-of-run telemetry report."""
+    host = urlsplit(response.url).netloc
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining and remaining.isdigit():
+        total = response.headers.get('X-RateLimit-Total', '')
+        telemetry.record_rate_limit(host, int(remaining), int(total) if total.isdigit() else 0)
+    telemetry.record(mode, response.url, response.status_code, elapsed,
+                     bytes_out=len(response.request.body or b''), bytes_in=len(response.content),
+                     throttled=int(response.status_code == 429))
 
 def make_api_request(resource: Optional[str] = None, mode: Optional[str] = 'GET', 
                      acct: Optional[str] = None, payload: Optional[Dict] = None) -> requests.Response:
-    endpoint = 'https://public-api.freshstatus.io/api/v1/'
+    endpoint = API_ENDPOINT
 
     if acct is None:
         acct = input("Please enter your Freshstatus account name "
@@ -80,11 +96,13 @@ def make_api_request(resource: Optional[str] = None, mode: Optional[str] = 'GET'
         if is_dry_run_mode() and mode in ['POST', 'PUT', 'DELETE']:
             raise DryRunModeError("API commands are disabled in dry-run mode. Please switch to live mode to execute this command.")
         try:
+            started = time.perf_counter()
             response = session.request(
                 method=mode,
                 url=endpoint + resource,
                 json=payload if payload else None
             )
+            record_telemetry(mode, response, time.perf_counter() - started)
             response.raise_for_status()
 
         except requests.exceptions.RequestException as req_err:
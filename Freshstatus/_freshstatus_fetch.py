@@ -15,6 +15,7 @@ import json
 from datetime import datetime
 from typing import Dict
 from _freshstatus_api import make_api_request
+from _freshstatus_json import loads
 
 
 def build_services_list(acct: str) -> Dict:
@@ -29,11 +30,11 @@ def build_services_list(acct: str) -> Dict:
     """
     print("Fetching groups...")
     groups_response = make_api_request(resource='groups/', mode='GET', acct=acct)
-    groups = groups_response.json()['results']
+    groups = loads(groups_response.content)['results']
 
     print("Fetching services...")
     services_response = make_api_request(resource='services/', mode='GET', acct=acct)
-    services = services_response.json()['results']
+    services = loads(services_response.content)['results']
 
     return {"groups": groups, "services": services}
 
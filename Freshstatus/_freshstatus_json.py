@@ -0,0 +1,219 @@
+#
+# Script: Freshstatus JSON decoding
+#
+# Overview:
+# Decodes backups and API responses without first holding the whole
+# document as text. Backup files are memory-mapped and their top-level
+# arrays are yielded one record at a time. Three backends are tried in
+# order:
+#   orjson   decodes straight from the mapped bytes (fastest, if installed);
+#            the whole document becomes one tree before the first record
+#            is yielded, so memory grows with the file
+#   ijson    incremental C/Python parser, record by record (if installed)
+#   builtin  json.JSONDecoder over a sliding text buffer, record by record
+# Only ijson and builtin keep memory bounded by the largest record; set
+# JSON_BACKEND to one of them for backups too large to decode at once.
+#
+# Environment:
+#   JSON_BACKEND=builtin     force a backend (orjson, ijson or builtin)
+
+import os
+import re
+import json
+import mmap
+import codecs
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+CHUNK_SIZE = 1024 * 1024
+_NUMBER_TAIL = 2     # longest end of a cut number that raw_decode leaves unparsed: 'e+' / 'e-'
+
+_ws = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def backend() -> str:
+    """Returns the backend in use: JSON_BACKEND if that one is installed, else the fastest available."""
+    available = [name for name, module in (('orjson', orjson), ('ijson', ijson)) if module] + ['builtin']
+    chosen = os.getenv('JSON_BACKEND', '').lower()
+    return chosen if chosen in available else available[0]
+
+
+def loads(data):
+    """
+    Decodes a JSON document from bytes or str, e.g. response.content.
+
+    Decoding the bytes directly skips the response.text copy (and its
+    charset detection).
+    """
+    if orjson is not None and backend() == 'orjson':
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass    # NaN, integers over 64 bits, ...: let json decide
+    return json.loads(data)
+
+
+class _Reader:
+    """Sliding text window over a byte or text stream for JSONDecoder.raw_decode."""
+
+    def __init__(self, source, chunk_size: int = CHUNK_SIZE):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self._utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+
+    def fill(self) -> None:
+        # Read at least as much as is buffered, so a record spanning many chunks is retried a few times only
+        chunk = self.source.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if isinstance(chunk, (bytes, bytearray)):
+            text = self._utf8.decode(chunk, final=not chunk)
+        else:
+            text = chunk or ''
+        self.eof = not chunk
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character ('' at the end)."""
+        while True:
+            self.pos = _ws.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        while True:
+            self.peek()
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            # A number cut by the end of the buffer may continue in the next chunk, also when the cut
+            # left a '.', 'e' or 'e-' behind it ([1. + 5,2] would otherwise decode as 1)
+            if len(self.buf) - end <= _NUMBER_TAIL and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def items(self) -> Iterator:
+        """Yields the elements of the array starting at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            self.expect(',')
+
+
+def _builtin_records(source, keys: Optional[Iterable[str]]) -> Iterator[Tuple[str, object]]:
+    reader = _Reader(source)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if reader.peek() == '[' and (keys is None or key in keys):
+            for item in reader.items():
+                yield key, item
+        else:
+            reader.value()      # not wanted, or not an array: parsed and dropped
+        if reader.peek() == '}':
+            return
+        reader.expect(',')
+
+
+def _ijson_records(source, keys: Optional[Iterable[str]]) -> Iterator[Tuple[str, object]]:
+    # Walks the event stream so only one record is built at a time
+    events = ijson.parse(source, use_float=True)
+    for prefix, event, value in events:
+        if event != 'start_array' or not prefix or '.' in prefix or (keys is not None and prefix not in keys):
+            continue
+        key, item = prefix, prefix + '.item'
+        for prefix, event, value in events:
+            if prefix == key and event == 'end_array':
+                break
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                for prefix, event, value in events:
+                    builder.event(event, value)
+                    if prefix == item and event in ('end_map', 'end_array'):
+                        break
+            yield key, builder.value
+
+
+def iter_records(source, keys: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, object]]:
+    """
+    Streams the records of the top-level arrays of a JSON object, e.g. the
+    groups and services of a backup.
+
+    Args:
+        source: Binary or text file object (or an mmap) positioned at the document.
+        keys: Top-level keys whose arrays are wanted; None for all of them.
+
+    Yields:
+        tuple: (key, record) in document order.
+    """
+    keys = set(keys) if keys is not None else None
+    chosen = backend()
+    if chosen == 'orjson':
+        if isinstance(source, mmap.mmap):
+            # orjson reads the mapped pages in place, no text copy, but still builds the whole tree
+            with memoryview(source) as view:
+                data = orjson.loads(view[3:] if view[:3] == codecs.BOM_UTF8 else view)
+        else:
+            data = source.read()
+            data = orjson.loads(data[3:] if data[:3] == codecs.BOM_UTF8 else data)
+        if not isinstance(data, dict):
+            raise json.JSONDecodeError("Expecting a JSON object", '', 0)
+        for key, value in data.items():
+            if isinstance(value, list) and (keys is None or key in keys):
+                for item in value:
+                    yield key, item
+    elif chosen == 'ijson':
+        yield from _ijson_records(source, keys)
+    else:
+        yield from _builtin_records(source, keys)
+
+
+def load_backup(file_path: str, keys: Iterable[str] = ('groups', 'services')) -> Dict[str, list]:
+    """
+    Loads the arrays of a backup file record by record from a memory map.
+
+    Returns:
+        dict: key -> list of records, for each of `keys` (missing arrays are empty).
+    """
+    data = {key: [] for key in keys}
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise json.JSONDecodeError("Expecting value", '', 0)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            for key, record in iter_records(source, keys):
+                data[key].append(record)
+    return data
@@ -1,15 +1,18 @@
 import requests
 import os
 import json
+import threading
 import pytz
 import tzlocal
 import pymsteams
 from datetime import datetime, timedelta, timezone, time
+from concurrent.futures import ThreadPoolExecutor
 from _freshstatus_api import is_debug_mode, is_dry_run_mode, make_api_request
 
 # Global variables
 os.environ['DEBUG'] = 'True'
 #os.environ['DRY_RUN'] = 'True'
+parallel = True     # post every account's maintenance and the Teams card at the same moment
 
 def get_user_timezone():
     """Get the user's local timezone. Default to EST if not detected."""
@@ -153,6 +156,87 @@ def process_teams_message(template, rel_ver, start_iso):
 
     return myteams, tmssg
 
+def build_maintenance_payload(template, acct, rel_ver, start_iso, end_iso):
+    """Build the maintenance payload for one account of the template."""
+    payload = {
+        "title": ("[TEST]: " if is_debug_mode() else "") + template["title"].format(rel_ver=rel_ver),
+        "description": template["description"].format(rel_ver=rel_ver),
+        "start_time": start_iso,
+        "end_time": end_iso,
+        "is_auto_start": template["is_auto_start"],
+        "is_auto_end": template["is_auto_end"],
+        "is_private": True if is_debug_mode() else template["is_private"],
+        "affected_components": template['account'][acct]['affected_components'],
+        "notification_options": template["notification_options"] if not is_debug_mode() else { 
+            "send_notification": "false",
+            "send_tweet": "false",
+            "email_on_start": "false",
+            "email_on_complete": "false",
+            "email_before_day_hour": "false",
+            "email_before_one_hour": "false"
+        },
+        "maintenance_updates": template["maintenance_updates"]
+    }
+
+    # Add the array from template["account"][acct] to the payload
+    payload.update(template["account"][acct])
+    return payload
+
+def post_maintenance(acct, name, payload, started):
+    """POST one account's maintenance and return its row of the results table."""
+    result = {'account': acct, 'name': name, 'ok': False, 'status': None, 'detail': '', 'after': None}
+    try:
+        response = make_api_request(resource='maintenance/', mode='POST', acct=acct, payload=payload)
+        result['after'] = datetime.now().timestamp() - started
+        result['status'] = response.status_code
+        result['ok'] = response.status_code in [200, 201]
+        if not result['ok']:
+            result['detail'] = response.text[:200]
+    except Exception as e:
+        result['detail'] = str(e)
+    return result
+
+def send_teams_message(myteams, started):
+    """Send the Teams card and return its row of the results table."""
+    result = {'account': 'teams', 'name': 'Teams notification', 'ok': False, 'status': None, 'detail': '', 'after': None}
+    try:
+        myteams.send()
+        result['after'] = datetime.now().timestamp() - started
+        result['ok'] = True
+        result['status'] = myteams.last_http_response.status_code if getattr(myteams, 'last_http_response', None) is not None else 200
+    except Exception as e:
+        result['detail'] = str(e)
+    return result
+
+def publish_all(jobs):
+    """
+    Run the posting jobs (callables taking the common start timestamp) at
+    the same moment, one thread each, and return their results in order.
+    """
+    go = threading.Event()
+    start = {}
+
+    def run(job):
+        go.wait()
+        return job(start['at'])
+
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        futures = [pool.submit(run, job) for job in jobs]
+        start['at'] = datetime.now().timestamp()
+        go.set()
+        return [future.result() for future in futures]
+
+def print_results(results):
+    """Print the per-account success/failure table."""
+    width = max([len(str(r['name'])) for r in results] + [7])
+    print(f"\n{'Account':<{width}}  {'Result':<8}{'Status':>7}{'After (s)':>11}  Details")
+    print('-' * (width + 40))
+    for r in results:
+        after = f"{r['after']:.2f}" if r['after'] is not None else '-'
+        print(f"{r['name']:<{width}}  {'OK' if r['ok'] else 'FAILED':<8}{str(r['status'] or '-'):>7}{after:>11}  {r['detail']}")
+    failed = [r['name'] for r in results if not r['ok']]
+    print(f"\n{len(results) - len(failed)} succeeded, {len(failed)} failed" + (f": {', '.join(failed)}" if failed else "."))
+
 def create_maintenance():
     try:
         rel_ver = input("Enter the TRAX Release version being scheduled: ")
@@ -201,13 +285,6 @@ def create_maintenance():
             while True:
                 start_iso, end_iso = prompt_for_times()
 
-                # Convert ISO 8601 UTC to local timezone for display
-                start_local = convert_from_iso_format(start_iso)
-                end_local = convert_from_iso_format(end_iso)
-
-                start_server = convert_from_iso_format(start_iso, tz_name='America/New_York')
-                end_server = convert_from_iso_format(end_iso, tz_name='America/New_York')
-
                 # Validate that end time is after start time
                 if end_iso <= start_iso:
                     print("Error: End time entered cannot be earlier than set start time. Please enter valid times.")
@@ -217,6 +294,13 @@ def create_maintenance():
                 else:
                     break
 
+        # Convert ISO 8601 UTC to local timezone for display
+        start_local = convert_from_iso_format(start_iso)
+        end_local = convert_from_iso_format(end_iso)
+
+        start_server = convert_from_iso_format(start_iso, tz_name='America/New_York')
+        end_server = convert_from_iso_format(end_iso, tz_name='America/New_York')
+
         # Display summary and ask for confirmation
         summary_state_test = "DRY RUN MODE ACTIVE " if is_dry_run_mode() else ""
         summary_state_test += "AND " if is_dry_run_mode() and is_debug_mode() else ""
@@ -233,6 +317,7 @@ def create_maintenance():
             f"Accounts: {', '.join([template['account'][acct]['name'] for acct in accounts])}\n"
         )
 
+        myteams = None
         if 'teams_integrated' in template:
             myteams, tmssg = process_teams_message(template, rel_ver, start_iso)
 
@@ -254,62 +339,42 @@ def create_maintenance():
             print("Maintenance posting cancelled.")
             return
         
-        if is_debug_mode(): 
+        if is_debug_mode() and myteams is not None: 
             print(myteams.payload)
 
-        if not is_dry_run_mode(): 
-            myteams.send()
-        
-        # Loop through the remaining accounts and post the maintenance
+        # Build every account's payload before anything is posted
+        payloads = []
         for acct in accounts:
              
             if 'account' not in template or acct not in template['account']:
                 print(f"Error: A template is not available for the account '{acct}'. Please check the account name and try again.")
                 continue
 
-            # Define the payload using the template and account-specific details
-            payload = {
-                "title": ("[TEST]: " if is_debug_mode() else "") + template["title"].format(rel_ver=rel_ver),
-                "description": template["description"].format(rel_ver=rel_ver),
-                "start_time": start_iso,
-                "end_time": end_iso,
-                "is_auto_start": template["is_auto_start"],
-                "is_auto_end": template["is_auto_end"],
-                "is_private": True if is_debug_mode() else template["is_private"],
-                "affected_components": template['account'][acct]['affected_components'],
-                "notification_options": template["notification_options"] if not is_debug_mode() else { 
-                    "send_notification": "false",
-                    "send_tweet": "false",
-                    "email_on_start": "false",
-                    "email_on_complete": "false",
-                    "email_before_day_hour": "false",
-                    "email_before_one_hour": "false"
-                },
-                "maintenance_updates": template["maintenance_updates"]
-            }
-
-            # Add the array from template["account"][acct] to the payload
-            payload.update(template["account"][acct])
+            payload = build_maintenance_payload(template, acct, rel_ver, start_iso, end_iso)
+            payloads.append((acct, template['account'][acct]['name'], payload))
 
             if is_debug_mode():
                 # Display the payload in JSON format for debugging
                 print("Debugging mode enabled. The payload is displayed below:")
                 print(json.dumps(payload, indent=4))
-            
-            if is_dry_run_mode():
-                # Display the payload in JSON format for debugging
-                print("Test mode enabled. The payload will not be sent.")
-            else:
-                # Send the POST request using make_api_request
-                response = make_api_request(resource='maintenance/', mode='POST', acct=acct, payload=payload)
 
-                # Print the response
-                if response.status_code in [200, 201]:
-                    print(f"Scheduled maintenance created successfully for account '{acct}'!")
-                else:
-                    print(f"Failed to create scheduled maintenance for account '{acct}'. Status code: {response.status_code}")
-                    print(response.text)
+        if is_dry_run_mode():
+            # Display the payload in JSON format for debugging
+            print("Test mode enabled. The payloads will not be sent.")
+        else:
+            jobs = [lambda started, acct=acct, name=name, payload=payload: post_maintenance(acct, name, payload, started)
+                    for acct, name, payload in payloads]
+            if myteams is not None:
+                jobs.append(lambda started: send_teams_message(myteams, started))
+
+            if parallel:
+                # All POSTs and the Teams card leave together, so every status page flips at about the same moment
+                results = publish_all(jobs)
+            else:
+                started = datetime.now().timestamp()
+                results = [job(started) for job in ([jobs[-1]] + jobs[:-1] if myteams is not None else jobs)]
 
+            print_results(results)
         print("Maintenance posting completed.")
 
     except requests.exceptions.RequestException as e:
@@ -2,15 +2,20 @@ import os
 import sys
 import json
 from typing import Dict, Optional
-from _freshstatus_api import make_api_request, is_debug_mode, validate_payload
+from _freshstatus_api import make_api_request, is_debug_mode, is_dry_run_mode, validate_payload
 from _freshstatus_fetch import build_services_list
+from _freshstatus_json import load_backup, loads
+from _freshstatus_reconcile import Plan, reconcile, service_payload, SKIP
+from _freshstatus_restore import RestoreResult, restore
+
+max_workers = 4     # requests in flight while restoring
 
 # os.environ['DEBUG'] = 'True'
 
 def read_backup_file(file_path: str) -> Dict:
+    # groups and services are read record by record from a memory map, see _freshstatus_json
     try:
-        with open(file_path, 'r') as file:
-            return json.load(file)
+        return load_backup(file_path)
     except FileNotFoundError:
         print(f"Backup file not found at {file_path}. Exiting script.")
         sys.exit(1)
@@ -18,73 +23,6 @@ def read_backup_file(file_path: str) -> Dict:
         print(f"Error decoding JSON from backup file at {file_path}. Exiting script.")
         sys.exit(1)
 
-from typing import Dict
-
-def compare_lists(target_data: Dict, backup_data: Dict) -> Dict:
-    """
-    Compare two dictionaries representing target data and backup data.
-    Returns a dictionary containing the differences between the two datasets.
-
-    Args:
-        target_data (Dict): The target data dictionary.
-        backup_data (Dict): The backup data dictionary.
-
-    Returns:
-        Dict: A dictionary containing the differences between the target and backup data.
-            The 'groups' key contains a list of differences in the groups.
-            The 'services' key contains a list of differences in the services.
-    """
-    differences = {'groups': [], 'services': []}
-
-    target_groups = target_data['groups']
-    backup_groups = backup_data['groups']
-    target_services = target_data['services']
-    backup_services = backup_data['services']
-
-    # Compare groups in target and backup data
-    for group in target_groups:
-        group['parent_name'] = next(({'name': g['name'], 'id': g['id']} for g in target_groups if g['id'] == group['parent']), None)
-
-    for group in backup_groups:
-        if group['name'] not in [g['name'] for g in target_groups]:
-            group['exist_in_server'] = None
-            if group['parent'] is not None and group['parent'] in [g['id'] for g in backup_groups]:
-                group['parent_name'] = next({'name': g['name'], 'id': g['id']} for g in backup_groups if g['id'] == group['parent'])
-            else:
-                group['parent_name'] = None
-        else:
-            group['exist_in_server'] = next(g['id'] for g in target_groups if g['name'] == group['name'])
-
-    differences['groups'] = backup_groups
-
-    # Compare services in target and backup data
-    for service in backup_services:
-        if 'group' in service and service['group']:
-            for group in differences['groups']:
-                if group['id'] == service['group']['id'] and 'exist_in_server' in group:
-                    service['group']['id'] = group['exist_in_server']
-                    break
-
-        service['exist_in_server'] = next(
-            (s['id'] for s in target_services if s['name'] == service['name'] and 'group' in s and 'group' in service and s['group']['name'] == service['group']['name']),
-            None
-        )
-
-    differences['services'] = backup_services
-
-    return differences
-
-def update_group_info(service, target_services, backup_groups):
-    if service['group']:
-        group_info = next(
-            (g for g in target_services if 'group' in g and g['group']['name'] == service['group']['name']),
-            None
-        )
-        if group_info:
-            service['group']['id'] = group_info['group']['id']
-        else:
-            service['group']['id'] = next(g['id'] for g in backup_groups if g['name'] == service['group']['name'])
-
 def process_services(data, acct):
     resource = 'services/'
 
@@ -100,11 +38,12 @@ def process_services(data, acct):
         response = make_api_request(resource, 'POST', acct=acct, payload=payload)
 
         if response.status_code == 201:
-            item['id'] = response.json()['id']
-            item['group']['id'] = response.json()['group']['id']
-            item['group']['name'] = response.json()['group']['name']
-            item['group']['parent'] = response.json()['group']['parent']
-            item['group']['order'] = response.json()['group']['order']
+            created = loads(response.content)
+            item['id'] = created['id']
+            item['group']['id'] = created['group']['id']
+            item['group']['name'] = created['group']['name']
+            item['group']['parent'] = created['group']['parent']
+            item['group']['order'] = created['group']['order']
         else:
             handle_http_error(response)
 
@@ -115,24 +54,22 @@ def handle_http_error(response):
     print(f"Response content: {response.content.decode('utf-8')}")
     sys.exit(1)
 
-def send_it(data: Dict, acct: str) -> Dict:
+def send_it(plan: Plan, acct: str) -> RestoreResult:
     if is_debug_mode():
         print('\n')
-        print(f'Account: {acct} \ndata: {json.dumps(data, indent=4)}\n')
+        print(f'Account: {acct} \nplan: {plan.to_json(include_skipped=True)}\n')
 
-    if not validate_payload(data):
+    payloads = [service_payload(item) for item in plan.services if item['action'] != SKIP]
+    if not all(validate_payload(payload) for payload in payloads):
         print("Invalid data sent to the server. Exiting script.")
         if is_debug_mode():
-            print('Please revise the data:\n', json.dumps(data, indent=4))
+            print('Please revise the data:\n', json.dumps(payloads, indent=4))
         sys.exit(1)
 
-    resource = 'services/'
-    for service in data['services']:
-        response = make_api_request(resource, 'POST', acct=acct, payload=service)
-        if response.status_code != 201:
-            handle_http_error(response)
-
-    return data
+    # groups parent-first, then services, max_workers requests at a time; failures are collected, not fatal
+    result = restore(plan, acct, max_workers)
+    print(result.summary())
+    return result
 
 def main():
     if is_debug_mode():
@@ -155,12 +92,22 @@ def main():
     
     data = read_backup_file(json_file_path)
     target_data = build_services_list(acct)
-    differences = compare_lists(target_data, data)
-
-    for service in differences['services']:
-        update_group_info(service, target_data['services'], differences['groups'])
-
-    send_it(differences, acct)
+    plan = reconcile(target_data, data)
+
+    print(plan.summary())
+    if plan.is_noop():
+        print("Nothing to restore, the status page already matches the backup.")
+        return
+    if is_dry_run_mode():
+        print(plan.to_json())
+        return
+    confirm = input("Push these changes? (yes/no): ").strip().lower()
+    if confirm != 'yes':
+        print("Nothing was pushed.")
+        return
+
+    if not send_it(plan, acct).ok:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
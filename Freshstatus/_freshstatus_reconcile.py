@@ -0,0 +1,202 @@
+#
+# Script: Freshstatus reconciliation
+#
+# Overview:
+# Works out what restoring a backup onto a status page has to do. The
+# groups and services already on the page are indexed once by
+# (group name, parent group name) and (service name, group name), and every
+# backup record is looked up in those indexes to decide whether it has to be
+# created, updated (same key, different fields) or skipped. The result is a
+# Plan that can be printed or saved and checked before anything is pushed.
+# Neither the backup nor the target data is modified.
+
+import json
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CREATE = 'create'
+UPDATE = 'update'
+SKIP = 'skip'
+
+# Fields compared to tell an update from a skip
+GROUP_FIELDS = ('order',)
+SERVICE_FIELDS = ('description', 'order', 'display_options')
+
+GroupKey = Tuple[str, Optional[str]]
+ServiceKey = Tuple[str, Optional[str]]
+
+
+def _ids(groups: Iterable[Dict]) -> Dict:
+    return {group['id']: group for group in groups}
+
+
+def group_key(group: Dict, groups_by_id: Dict) -> GroupKey:
+    """(name, parent name) of a group; the parent is looked up among the groups of the same page."""
+    parent = groups_by_id.get(group.get('parent'))
+    return group['name'], parent['name'] if parent else None
+
+
+def service_key(service: Dict) -> ServiceKey:
+    """(name, group name) of a service."""
+    group = service.get('group')
+    return service['name'], group['name'] if group else None
+
+
+def index_groups(groups: Iterable[Dict]) -> Dict[GroupKey, Dict]:
+    """Groups by (name, parent name). The first of two groups with the same key wins."""
+    groups = list(groups)
+    by_id = _ids(groups)
+    index = {}
+    for group in groups:
+        index.setdefault(group_key(group, by_id), group)
+    return index
+
+
+def index_services(services: Iterable[Dict]) -> Dict[ServiceKey, Dict]:
+    """Services by (name, group name). The first of two services with the same key wins."""
+    index = {}
+    for service in services:
+        index.setdefault(service_key(service), service)
+    return index
+
+
+def _changes(source: Dict, target: Dict, fields: Tuple[str, ...]) -> Dict:
+    return {field: {'from': target.get(field), 'to': source.get(field)}
+            for field in fields if field in source and source.get(field) != target.get(field)}
+
+
+class Plan:
+    """
+    Actions that bring a status page in line with a backup.
+
+    Every action is a dict with:
+        action      CREATE, UPDATE or SKIP
+        key         the record's index key
+        source      the backup record (not modified)
+        target_id   id of the matching record on the page, None for CREATE
+        changes     field -> {'from', 'to'} for UPDATE
+    Group actions also carry parent_key (the key of the parent group, or
+    None). Service actions carry group_key and group_id, the id of the
+    service's group on the page when it already exists there (None when the
+    group is created by the plan or the service has no group).
+    """
+
+    def __init__(self):
+        self.groups: List[Dict] = []
+        self.services: List[Dict] = []
+
+    def actions(self, kind: str, action: Optional[str] = None) -> List[Dict]:
+        """The group or service actions ('groups' / 'services'), optionally of one action only."""
+        return [item for item in getattr(self, kind) if action is None or item['action'] == action]
+
+    def counts(self) -> Dict[str, Counter]:
+        return {kind: Counter(item['action'] for item in getattr(self, kind)) for kind in ('groups', 'services')}
+
+    def is_noop(self) -> bool:
+        return all(item['action'] == SKIP for item in self.groups + self.services)
+
+    def summary(self) -> str:
+        counts = self.counts()
+        return '\n'.join(f"{kind.capitalize():<9} create {counts[kind][CREATE]:>5}   update {counts[kind][UPDATE]:>5}   "
+                         f"skip {counts[kind][SKIP]:>5}" for kind in ('groups', 'services'))
+
+    def to_dict(self, include_skipped: bool = False) -> Dict:
+        def entry(item):
+            return {**{k: v for k, v in item.items() if k != 'source'}, 'name': item['source']['name']}
+        return {kind: [entry(item) for item in getattr(self, kind) if include_skipped or item['action'] != SKIP]
+                for kind in ('groups', 'services')}
+
+    def to_json(self, include_skipped: bool = False) -> str:
+        return json.dumps(self.to_dict(include_skipped), indent=4)
+
+
+def reconcile(target_data: Dict, backup_data: Dict) -> Plan:
+    """
+    Plans the restore of backup_data onto the page described by target_data.
+
+    Args:
+        target_data (Dict): Groups and services on the page, as from build_services_list.
+        backup_data (Dict): Groups and services from the backup file.
+
+    Returns:
+        Plan: Group actions parent-first in backup order, then service actions in backup order.
+    """
+    plan = Plan()
+    target_groups = index_groups(target_data.get('groups', []))
+    target_services = index_services(target_data.get('services', []))
+
+    backup_groups = backup_data.get('groups', [])
+    backup_by_id = _ids(backup_groups)
+    keys = {group['id']: group_key(group, backup_by_id) for group in backup_groups}
+
+    planned_groups = set()
+    for group in backup_groups:
+        key = keys[group['id']]
+        if key in planned_groups:
+            continue
+        planned_groups.add(key)
+        target = target_groups.get(key)
+        if target is None:
+            action, changes = CREATE, {}
+        else:
+            changes = _changes(group, target, GROUP_FIELDS)
+            action = UPDATE if changes else SKIP
+        plan.groups.append({'action': action, 'key': key, 'parent_key': keys.get(group.get('parent')),
+                            'source': group, 'target_id': target['id'] if target else None, 'changes': changes})
+
+    # A service's group is matched on its full key when the backup lists it, else on its name alone
+    target_group_ids = {}
+    for (name, _), group in target_groups.items():
+        target_group_ids.setdefault(name, group['id'])
+
+    planned = set()
+    for service in backup_data.get('services', []):
+        key = service_key(service)
+        if key in planned:
+            continue
+        planned.add(key)
+        target = target_services.get(key)
+        if target is None:
+            action, changes = CREATE, {}
+        else:
+            changes = _changes(service, target, SERVICE_FIELDS)
+            action = UPDATE if changes else SKIP
+
+        group = service.get('group')
+        gkey = (keys.get(group.get('id')) or (group['name'], None)) if group else None
+        if gkey is None:
+            group_id = None
+        elif gkey in target_groups:
+            group_id = target_groups[gkey]['id']
+        elif gkey in planned_groups:
+            group_id = None         # created by the plan
+        else:
+            group_id = target_group_ids.get(gkey[0])
+        plan.services.append({'action': action, 'key': key, 'source': service,
+                              'target_id': target['id'] if target else None, 'changes': changes,
+                              'group_key': gkey, 'group_id': group_id})
+
+    # Parents before children, so the groups can be created in plan order
+    plan.groups = _parent_first(plan.groups)
+    return plan
+
+
+def _parent_first(groups: List[Dict]) -> List[Dict]:
+    by_key = {item['key']: item for item in groups}
+    ordered, seen = [], set()
+    for item in groups:
+        chain = []
+        while item is not None and item['key'] not in seen:
+            seen.add(item['key'])
+            chain.append(item)
+            item = by_key.get(item['parent_key'])
+        ordered.extend(reversed(chain))
+    return ordered
+
+
+def service_payload(item: Dict, group_id=None) -> Dict:
+    """Body for creating or updating the service of a plan action, with its group set to group_id."""
+    source = item['source']
+    payload = {field: source[field] for field in ('name', 'description', 'order', 'display_options') if field in source}
+    payload['group'] = group_id if group_id is not None else item['group_id']
+    return payload
@@ -0,0 +1,160 @@
+#
+# Script: Freshstatus restore executor
+#
+# Overview:
+# Carries out a reconciliation Plan (see _freshstatus_reconcile.py) on a
+# status page. Missing groups are created first, one level of the group
+# tree at a time so every parent exists before its children, and then the
+# services are created or updated. Each level and the services are sent
+# with a bounded number of requests in flight. A failed item is recorded
+# and the run goes on; only the groups and services that depend on it (the
+# children and services of a group that could not be created) are left
+# out, and all failures are reported at the end.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from _freshstatus_api import make_api_request
+from _freshstatus_reconcile import Plan, service_payload, CREATE, UPDATE, SKIP
+
+MAX_WORKERS = 4     # requests in flight per level
+
+
+def group_levels(groups: List[Dict]) -> List[List[Dict]]:
+    """
+    Splits plan group actions into levels: a group's parent is always in an
+    earlier level (groups whose parent is not in the plan are level 0).
+    """
+    depth: Dict = {}
+    levels: List[List[Dict]] = []
+    for item in groups:     # plan groups are parent-first
+        level = depth[item['parent_key']] + 1 if item['parent_key'] in depth else 0
+        depth[item['key']] = level
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(item)
+    return levels
+
+
+class RestoreResult:
+    """What a restore did: created, updated and unchanged counts per kind, and the failures."""
+
+    def __init__(self):
+        self.created: Dict[str, int] = {'groups': 0, 'services': 0}
+        self.updated: Dict[str, int] = {'groups': 0, 'services': 0}
+        self.skipped: Dict[str, int] = {'groups': 0, 'services': 0}
+        self.failures: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def count(self, kind: str, action: str) -> None:
+        with self._lock:
+            {CREATE: self.created, UPDATE: self.updated, SKIP: self.skipped}[action][kind] += 1
+
+    def fail(self, kind: str, item: Dict, error: str) -> None:
+        with self._lock:
+            self.failures.append({'kind': kind, 'name': item['source']['name'], 'key': item['key'],
+                                  'action': item['action'], 'error': error})
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def summary(self) -> str:
+        lines = [f"{kind.capitalize():<9} created {self.created[kind]:>5}   updated {self.updated[kind]:>5}   "
+                 f"unchanged {self.skipped[kind]:>5}" for kind in ('groups', 'services')]
+        if self.failures:
+            lines.append(f"\n{len(self.failures)} failed:")
+            lines += [f"  {f['kind'][:-1]} {f['name']!r} ({f['action']}): {f['error']}" for f in self.failures]
+        return '\n'.join(lines)
+
+
+def _error(response) -> str:
+    return f"{response.status_code} {response.reason}: {response.content.decode('utf-8', 'replace')[:200]}"
+
+
+class RestoreExecutor:
+    """
+    Applies a Plan to the status page of acct.
+
+    Args:
+        acct (str): Freshstatus account name.
+        max_workers (int): Requests in flight at a time.
+    """
+
+    def __init__(self, acct: str, max_workers: int = MAX_WORKERS):
+        self.acct = acct
+        self.max_workers = max(1, max_workers)
+        self.result = RestoreResult()
+        self.group_ids: Dict = {}       # group key -> id on the page, for the groups that exist or were created
+
+    def run(self, plan: Plan) -> RestoreResult:
+        for item in plan.groups:
+            if item['target_id'] is not None:
+                self.group_ids[item['key']] = item['target_id']
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for level in group_levels(plan.groups):
+                list(pool.map(self._group, level))
+            list(pool.map(self._service, plan.services))
+        return self.result
+
+    def _group(self, item: Dict) -> None:
+        if item['action'] == SKIP:
+            self.result.count('groups', SKIP)
+            return
+
+        source = item['source']
+        parent_id = None
+        if item['parent_key'] is not None:
+            parent_id = self.group_ids.get(item['parent_key'])
+            if parent_id is None:
+                self.result.fail('groups', item, f"parent group {item['parent_key'][0]!r} was not created")
+                return
+
+        try:
+            payload = {'name': source['name'], 'parent_id': parent_id, 'order': source.get('order')}
+            if item['action'] == CREATE:
+                response = make_api_request('groups/', 'POST', acct=self.acct, payload=payload)
+                if response.status_code != 201:
+                    raise RuntimeError(_error(response))
+                self.group_ids[item['key']] = response.json()['id']
+            else:
+                response = make_api_request(f"groups/{item['target_id']}/", 'PUT', acct=self.acct, payload=payload)
+                if response.status_code != 200:
+                    raise RuntimeError(_error(response))
+        except Exception as e:
+            self.result.fail('groups', item, str(e))
+            return
+        self.result.count('groups', item['action'])
+
+    def _service(self, item: Dict) -> None:
+        if item['action'] == SKIP:
+            self.result.count('services', SKIP)
+            return
+
+        group_id = item['group_id']
+        if group_id is None and item['group_key'] is not None:
+            group_id = self.group_ids.get(item['group_key'])
+            if group_id is None:
+                self.result.fail('services', item, f"group {item['group_key'][0]!r} was not created")
+                return
+
+        payload = service_payload(item, group_id)
+        try:
+            if item['action'] == CREATE:
+                response = make_api_request('services/', 'POST', acct=self.acct, payload=payload)
+                expected = 201
+            else:
+                response = make_api_request(f"services/{item['target_id']}/", 'PUT', acct=self.acct, payload=payload)
+                expected = 200
+            if response.status_code != expected:
+                raise RuntimeError(_error(response))
+        except Exception as e:
+            self.result.fail('services', item, str(e))
+            return
+        self.result.count('services', item['action'])
+
+
+def restore(plan: Plan, acct: str, max_workers: int = MAX_WORKERS) -> RestoreResult:
+    """Applies plan to the status page of acct and returns what was done and what failed."""
+    return RestoreExecutor(acct, max_workers).run(plan)
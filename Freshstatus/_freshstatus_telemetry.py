@@ -0,0 +1,22 @@
+#
+# Script: Freshstatus HTTP telemetry
+#
+# Overview:
+# Records what every request made through _freshstatus_api costs, using the
+# Freshservice scripts' _freshservice_telemetry.py: same report format and
+# environment variables, with metrics prefixed freshstatus_. The module is
+# imported from this folder when it is deployed next to these scripts, and
+# from the sibling Freshservice folder of the repository otherwise.
+
+import os
+import sys
+
+try:
+    from _freshservice_telemetry import install
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Freshservice'))
+    from _freshservice_telemetry import install
+
+METRIC_PREFIX = 'freshstatus'
+
+telemetry = install(METRIC_PREFIX)
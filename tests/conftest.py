@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The scripts import their helper modules as top-level modules from their own folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('Freshservice', 'Freshstatus'):
+    sys.path.insert(0, os.path.join(ROOT, folder))
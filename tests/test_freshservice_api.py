@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+import _freshservice_api as api
+from _freshservice_api import RATE_LIMIT_HEADROOM, RATE_LIMIT_WINDOW
+
+
+class Response:
+    def __init__(self, **headers):
+        self.headers = headers
+
+
+@pytest.fixture
+def slept(monkeypatch):
+    delays = []
+    monkeypatch.setattr(api.time, 'sleep', delays.append)
+    monkeypatch.setattr(api, '_rate_limits', {})
+    return delays
+
+
+def throttle_after(headers, calls=1):
+    api._record_rate_limit('host', Response(**headers))
+    for _ in range(calls):
+        api._throttle('host')
+
+
+def test_no_pacing_with_plenty_left(slept):
+    throttle_after({'X-RateLimit-Remaining': '4000', 'X-RateLimit-Total': '5000'}, calls=3)
+    assert slept == []
+
+
+def test_no_pacing_without_headers(slept):
+    throttle_after({}, calls=3)
+    assert slept == []
+
+
+def test_pacing_starts_well_before_the_quota_runs_out(slept):
+    throttle_after({'X-RateLimit-Remaining': '1200', 'X-RateLimit-Total': '5000'})
+    assert slept == [pytest.approx(RATE_LIMIT_WINDOW / (1200 - RATE_LIMIT_HEADROOM))]
+
+
+def test_delay_grows_as_the_quota_runs_out(slept):
+    for remaining in (1000, 500, 100, 30, 11):
+        throttle_after({'X-RateLimit-Remaining': str(remaining), 'X-RateLimit-Total': '5000'})
+    assert slept == sorted(slept)
+    assert slept[-1] == RATE_LIMIT_WINDOW
+
+
+def test_spent_quota_waits_a_window(slept):
+    throttle_after({'X-RateLimit-Remaining': '0', 'X-RateLimit-Total': '5000'})
+    assert slept == [RATE_LIMIT_WINDOW]
+
+
+def test_unknown_total_paces_only_the_last_calls(slept):
+    throttle_after({'X-RateLimit-Remaining': str(2 * RATE_LIMIT_HEADROOM + 1)})
+    assert slept == []
+    throttle_after({'X-RateLimit-Remaining': str(2 * RATE_LIMIT_HEADROOM)})
+    assert slept == [RATE_LIMIT_WINDOW / RATE_LIMIT_HEADROOM]
+
+
+def test_concurrent_calls_reserve_the_quota(slept):
+    api._record_rate_limit('host', Response(**{'X-RateLimit-Remaining': '1260', 'X-RateLimit-Total': '5000'}))
+    threads = [threading.Thread(target=api._throttle, args=('host',)) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert api._rate_limits['host']['remaining'] == 1240
+    # 1250 is the pacing threshold: the calls that took 1250 ... 1241 are paced, each a little longer
+    assert sorted(slept) == [pytest.approx(RATE_LIMIT_WINDOW / (r - RATE_LIMIT_HEADROOM)) for r in range(1250, 1240, -1)]
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+import _freshservice_attachments
+from _freshservice_attachments import AttachmentDownloader
+
+CONTENT = b'0123456789' * 1000
+
+
+class Response:
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Serves CONTENT (or server.content) with Range support and records the Range headers asked for."""
+    class Server:
+        content = CONTENT
+        ranges = []
+
+        def get(self, url, headers=None, stream=False):
+            start = int(headers['Range'][6:-1]) if headers else 0
+            self.ranges.append(start)
+            size = len(self.content)
+            if start >= size:
+                return Response(416, headers={'Content-Range': f'bytes */{size}'})
+            if start:
+                return Response(206, self.content[start:], {'Content-Range': f'bytes {start}-{size - 1}/{size}'})
+            return Response(200, self.content)
+
+    instance = Server()
+    instance.ranges = []
+    monkeypatch.setattr(_freshservice_attachments, 'api_get', instance.get)
+    return instance
+
+
+def attachment(**fields):
+    return {'id': 7, 'name': 'a.bin', 'attachment_url': 'http://x/7', 'size': len(CONTENT),
+            'updated_at': '2024-01-01T00:00:00Z', **fields}
+
+
+def stored(root, content):
+    digest = hashlib.sha256(content).hexdigest()
+    with open(os.path.join(root, 'files', digest[:2], digest), 'rb') as file:
+        return file.read()
+
+
+def start_part(root, content, version):
+    os.makedirs(os.path.join(root, 'partial'), exist_ok=True)
+    with open(os.path.join(root, 'partial', '7.part'), 'wb') as file:
+        file.write(content)
+    if version is not None:
+        with open(os.path.join(root, 'partial', '7.part.json'), 'w', encoding='utf-8') as file:
+            json.dump(version, file)
+
+
+def download(root, item):
+    with AttachmentDownloader(str(root), max_workers=1) as downloader:
+        downloader.submit([item], article_id=1)
+    return downloader
+
+
+def test_resumes_a_part_of_the_same_version(tmp_path, server):
+    start_part(tmp_path, CONTENT[:4000], {'updated_at': '2024-01-01T00:00:00Z', 'size': len(CONTENT)})
+    downloader = download(tmp_path, attachment())
+    assert server.ranges == [4000]
+    assert downloader.downloaded == 1 and downloader.failed == 0
+    assert stored(tmp_path, CONTENT) == CONTENT
+    assert os.listdir(tmp_path / 'partial') == []
+
+
+@pytest.mark.parametrize('version', [None, {'updated_at': '2023-01-01T00:00:00Z', 'size': len(CONTENT)}])
+def test_part_of_another_version_is_restarted(tmp_path, server, version):
+    start_part(tmp_path, b'old contents of the attachment', version)
+    downloader = download(tmp_path, attachment())
+    assert server.ranges == [0]
+    assert downloader.downloaded == 1
+    assert stored(tmp_path, CONTENT) == CONTENT
+
+
+def test_resumed_part_with_the_wrong_length_is_downloaded_again(tmp_path, server):
+    # Same version recorded, but the server's file is shorter than what the part already holds
+    server.content = CONTENT[:3000]
+    start_part(tmp_path, b'x' * 5000, {'updated_at': '2024-01-01T00:00:00Z', 'size': 3000})
+    downloader = download(tmp_path, attachment(size=3000))
+    assert server.ranges == [5000, 0]
+    assert downloader.downloaded == 1
+    assert stored(tmp_path, CONTENT[:3000]) == CONTENT[:3000]
+
+
+def test_size_mismatch_fails_and_leaves_no_part(tmp_path, server):
+    downloader = download(tmp_path, attachment(size=len(CONTENT) + 1))
+    assert downloader.failed == 1 and downloader.downloaded == 0
+    assert os.listdir(tmp_path / 'partial') == []
+    assert '7' not in downloader.index
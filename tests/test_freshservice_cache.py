@@ -0,0 +1,104 @@
+import os
+import threading
+
+import pytest
+import requests
+
+import _freshservice_cache as cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(cache, '_size', {'bytes': None, 'stores': 0})
+    return tmp_path
+
+
+def response(body, url='https://x.freshservice.com/api/v2/assets'):
+    result = requests.Response()
+    result.status_code = 200
+    result.url = url
+    result._content = body
+    result.headers = requests.structures.CaseInsensitiveDict({'ETag': '"1"', 'Content-Type': 'application/json'})
+    return result
+
+
+def age(key, seconds_ago):
+    _, body_path = cache._paths(key)
+    stamp = os.stat(body_path).st_mtime - seconds_ago
+    os.utime(body_path, (stamp, stamp))
+
+
+def test_store_and_load_round_trip():
+    cache.store('a' * 64, response(b'{"assets": []}'))
+    meta, body = cache.load('a' * 64)
+    assert body == b'{"assets": []}'
+    assert meta['headers'] == {'Content-Type': 'application/json', 'ETag': '"1"'}
+    assert cache.to_response(meta, body).headers['X-Cache'] == 'HIT'
+    assert cache.conditional_headers(meta) == {'If-None-Match': '"1"'}
+
+
+def test_evict_removes_least_recently_used_first():
+    for index, key in enumerate(('a' * 64, 'b' * 64, 'c' * 64)):
+        cache.store(key, response(b'x' * 100))
+        age(key, 100 - index * 10)           # a is the oldest, c the newest
+    cache.load('a' * 64)                     # reading a makes it the most recent
+
+    assert cache.evict(max_bytes=200) == 1
+    assert cache.load('b' * 64) is None
+    assert cache.load('a' * 64) is not None and cache.load('c' * 64) is not None
+    assert not os.path.exists(cache._paths('b' * 64)[0])     # metadata goes with the body
+
+
+def test_store_evicts_once_the_tracked_size_passes_the_bound(monkeypatch):
+    monkeypatch.setattr(cache, 'MAX_CACHE_BYTES', 250)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, 'evict', lambda *args: scans.append(1) or evict(*args))
+
+    for index in range(5):
+        key = str(index) * 64
+        cache.store(key, response(b'x' * 100))
+        age(key, 100 - index)
+    # The first store scans, the second fits (200 bytes), every later one pushes the total past 250
+    assert len(scans) == 4
+    assert sorted(key[0] for key in ('0' * 64, '1' * 64, '2' * 64, '3' * 64, '4' * 64)
+                  if cache.load(key)) == ['3', '4']
+
+
+def test_replacing_an_entry_does_not_grow_the_tracked_size():
+    cache.store('a' * 64, response(b'x' * 100))
+    cache.store('a' * 64, response(b'x' * 40))
+    assert cache._size['bytes'] == 40
+
+
+def test_entry_evicted_while_loading_is_a_miss(monkeypatch):
+    cache.store('a' * 64, response(b'x'))
+    utime = os.utime
+
+    def evicted_first(path, *args):
+        cache.evict(max_bytes=0)
+        return utime(path, *args)
+
+    monkeypatch.setattr(cache.os, 'utime', evicted_first)
+    assert cache.load('a' * 64) is None
+
+
+def test_threads_storing_the_same_key():
+    errors = []
+
+    def worker(index):
+        try:
+            for _ in range(30):
+                cache.store('k' * 64, response(str(index).encode() * 500))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    _, body = cache.load('k' * 64)
+    assert len(set(body)) == 1 and len(body) == 500
@@ -0,0 +1,52 @@
+import json
+
+from _freshservice_checkpoint import Checkpoint
+
+
+def journal(tmp_path, pages):
+    path = str(tmp_path / 'export.checkpoint')
+    checkpoint = Checkpoint(path, {'csv_file': 'out.csv'})
+    for page, records in pages:
+        checkpoint.save_page(page, records, size=100)
+    checkpoint.close()
+    return path
+
+
+def test_resume_replays_completed_pages(tmp_path):
+    path = journal(tmp_path, [(1, [{'id': 1}]), (2, [{'id': 2}, {'id': 3}])])
+    checkpoint = Checkpoint(path, {'csv_file': 'other.csv'}, resume=True)
+    assert checkpoint.meta == {'csv_file': 'out.csv'}
+    assert list(checkpoint.pages()) == [(1, [{'id': 1}], 100), (2, [{'id': 2}, {'id': 3}], 100)]
+    checkpoint.close()
+
+
+def test_torn_last_line_is_dropped_and_appending_continues(tmp_path):
+    path = journal(tmp_path, [(1, [{'id': 1}]), (2, [{'id': 2}])])
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"page":3,"size":100,"records":[{"id":')      # cut off mid-write
+
+    checkpoint = Checkpoint(path, resume=True)
+    assert [page for page, _, _ in checkpoint.pages()] == [1, 2]
+    checkpoint.save_page(3, [{'id': 3}])
+    checkpoint.close()
+
+    with open(path, encoding='utf-8') as file:
+        lines = file.read().splitlines()
+    assert [json.loads(line)['page'] for line in lines[1:]] == [1, 2, 3]
+    assert list(Checkpoint(path, resume=True).pages())[-1] == (3, [{'id': 3}], 1)
+
+
+def test_complete_json_without_newline_is_dropped(tmp_path):
+    # fsync'd JSON but no newline yet: the page may be incomplete on disk, so it is fetched again
+    path = journal(tmp_path, [(1, [{'id': 1}])])
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"page":2,"size":100,"records":[]}')
+    assert [page for page, _, _ in Checkpoint(path, resume=True).pages()] == [1]
+
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = journal(tmp_path, [(1, [{'id': 1}])])
+    checkpoint = Checkpoint(path, {'csv_file': 'new.csv'})
+    assert list(checkpoint.pages()) == []
+    checkpoint.finish()
+    assert not (tmp_path / 'export.checkpoint').exists()
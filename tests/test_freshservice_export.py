@@ -0,0 +1,65 @@
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from _freshservice_export import ParquetStream
+
+SCHEMA = {'ID': 'int', 'Configs': 'nested', 'Custom Fields': 'nested'}
+
+
+def write(path, rows, row_group_size=10000):
+    with ParquetStream(str(path), SCHEMA, row_group_size=row_group_size) as stream:
+        for row in rows:
+            stream.write_page([row])
+    return pq.read_table(str(path))
+
+
+def test_nested_columns_are_native_structs_and_lists(tmp_path):
+    rows = [
+        {'ID': 1, 'Configs': {'attachment_mandatory': True, 'limits': {'max': 3}},
+         'Custom Fields': [{'name': 'cost_centre', 'value': 'CC-1'}]},
+        {'ID': 2, 'Configs': {'attachment_mandatory': False, 'subject': 'x'}, 'Custom Fields': []},
+    ]
+    table = write(tmp_path / 'items.parquet', rows)
+    configs = table.schema.field('configs').type
+    assert pa.types.is_struct(configs)
+    assert configs.field('attachment_mandatory').type == pa.bool_()
+    assert configs.field('limits').type == pa.struct([('max', pa.int64())])
+    assert table.schema.field('custom_fields').type == pa.list_(pa.struct([('name', pa.string()), ('value', pa.string())]))
+    assert table.column('configs').to_pylist() == [
+        {'attachment_mandatory': True, 'limits': {'max': 3}, 'subject': None},
+        {'attachment_mandatory': False, 'limits': None, 'subject': 'x'},
+    ]
+    assert table.column('custom_fields').to_pylist() == [[{'name': 'cost_centre', 'value': 'CC-1'}], None]
+
+
+def test_mixed_values_fall_back_to_json_text(tmp_path):
+    rows = [{'ID': 1, 'Configs': {'value': 5}}, {'ID': 2, 'Configs': {'value': 'five'}},
+            {'ID': 3, 'Configs': {'value': [1, 2]}}, {'ID': 4, 'Configs': {'value': 2.5}}]
+    table = write(tmp_path / 'mixed.parquet', rows)
+    assert table.schema.field('configs').type == pa.struct([('value', pa.string())])
+    assert [c['value'] for c in table.column('configs').to_pylist()] == ['5', 'five', '[1, 2]', '2.5']
+
+
+def test_values_replayed_from_csv_text(tmp_path):
+    table = write(tmp_path / 'replayed.parquet', [{'ID': 1, 'Configs': "{'a': 1, 'b': None}", 'Custom Fields': ''}])
+    assert table.column('configs').to_pylist() == [{'a': 1, 'b': None}]
+    assert table.column('custom_fields').to_pylist() == [None]
+
+
+def test_later_row_group_with_new_keys_raises(tmp_path):
+    rows = [{'ID': 1, 'Configs': {'a': 1}}, {'ID': 2, 'Configs': {'a': 2, 'b': 3}}]
+    with pytest.raises(ValueError, match="'b'"):
+        write(tmp_path / 'drift.parquet', rows, row_group_size=1)
+
+
+def test_later_row_group_within_the_type(tmp_path):
+    rows = [{'ID': 1, 'Configs': {'a': 1.5, 'b': None}}, {'ID': 2, 'Configs': {'a': 2}}]
+    table = write(tmp_path / 'groups.parquet', rows, row_group_size=1)
+    assert table.column('configs').to_pylist() == [{'a': 1.5, 'b': None}, {'a': 2.0, 'b': None}]
+
+
+def test_empty_file(tmp_path):
+    table = write(tmp_path / 'empty.parquet', [])
+    assert table.num_rows == 0 and table.schema.names == ['id', 'configs', 'custom_fields']
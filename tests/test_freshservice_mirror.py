@@ -0,0 +1,25 @@
+import pytest
+
+from _freshservice_mirror import AssetMirror
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    with AssetMirror(str(tmp_path / 'mirror.db')) as mirror:
+        yield mirror
+
+
+REQUESTERS = ['a_b', 'axb', 'a%b', 'aXXb', 'a\\b', 'a\\\\b', 'ab']
+
+
+@pytest.mark.parametrize('prefix, expected', [
+    ('a_b', ['a_b']),
+    ('a%b', ['a%b']),
+    ('a\\b', ['a\\b']),
+    ('a\\', ['a\\b', 'a\\\\b']),
+    ('a', REQUESTERS),
+    ('', REQUESTERS),
+])
+def test_name_prefix_is_literal(mirror, prefix, expected):
+    mirror.upsert_page('requesters', [{'id': i, 'first_name': name} for i, name in enumerate(REQUESTERS, 1)], 1.0)
+    assert sorted(r['first_name'] for r in mirror.find_requesters(name=prefix)) == sorted(expected)
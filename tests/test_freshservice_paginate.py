@@ -0,0 +1,107 @@
+import json
+import threading
+
+import pytest
+
+import _freshservice_paginate
+from _freshservice_paginate import has_next, iter_pages, page_count
+
+
+class Response:
+    def __init__(self, records, headers=None):
+        self.content = json.dumps({'items': records}).encode('utf-8')
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """A list endpoint of api.total records; api.links adds rel="next"/"last" Link headers."""
+    class Api:
+        total = 0
+        links = False
+        count_header = False
+        requested = []
+        lock = threading.Lock()
+
+        def get(self, url, headers=None, auth=None):
+            page = int(url.rsplit('=', 1)[1])
+            with self.lock:
+                self.requested.append(page)
+            records = list(range((page - 1) * 10, min(page * 10, self.total)))
+            response_headers = {}
+            if self.links and page * 10 < self.total:
+                response_headers['Link'] = f'<https://x/items?page={page + 1}>; rel="next"'
+            elif self.links:
+                response_headers['Link'] = f'<https://x/items?page=1>; rel="first"'
+            if self.count_header:
+                response_headers['X-Total-Count'] = str(self.total)
+            return Response(records, response_headers)
+
+    instance = Api()
+    instance.requested = []
+    monkeypatch.setattr(_freshservice_paginate, 'api_get', instance.get)
+    return instance
+
+
+def pages(**kwargs):
+    return list(iter_pages(lambda page: f'https://x/items?page={page}', 'items', per_page=10, **kwargs))
+
+
+def records(result):
+    return [record for _, body in result for record in body['items']]
+
+
+@pytest.mark.parametrize('total', [0, 5, 10, 35, 40])
+def test_pages_come_back_in_order_and_complete(api, total):
+    api.total = total
+    result = pages(window=3)
+    assert [page for page, _ in result] == list(range(1, len(result) + 1))
+    assert records(result) == list(range(total))
+
+
+def test_missing_next_link_ends_the_list_without_an_empty_page(api):
+    api.total, api.links = 40, True     # a multiple of the page size
+    result = pages(window=3)
+    assert [page for page, _ in result] == [1, 2, 3, 4]
+    assert records(result) == list(range(40))
+
+
+def test_without_links_a_full_last_page_costs_one_empty_page(api):
+    api.total = 40
+    assert [page for page, _ in pages(window=1)] == [1, 2, 3, 4, 5]
+    assert api.requested == [1, 2, 3, 4, 5]
+
+
+def test_total_count_header_bounds_the_requests(api):
+    api.total, api.count_header = 35, True
+    result = pages(window=8)
+    assert records(result) == list(range(35))
+    assert sorted(api.requested) == [1, 2, 3, 4]
+
+
+def test_prefetch_stops_at_the_last_page(api):
+    api.total = 25
+    result = pages(window=4)
+    assert records(result) == list(range(25))
+    # At most the window's worth of speculative requests past the last page, never yielded
+    assert max(api.requested) <= 3 + 4
+
+
+def test_start_resumes_from_a_later_page(api):
+    api.total = 35
+    assert records(pages(start=3, window=2)) == list(range(20, 35))
+
+
+def test_error_body_ends_the_iteration(monkeypatch):
+    monkeypatch.setattr(_freshservice_paginate, 'api_get',
+                        lambda url, headers=None, auth=None: type('R', (), {'content': b'{"code": "denied"}',
+                                                                            'headers': {}})())
+    assert pages() == [(1, {'code': 'denied'})]
+
+
+def test_header_helpers():
+    assert page_count(Response([], {'X-Total-Count': '201'}), per_page=100) == 3
+    assert page_count(Response([], {'Link': '<https://x/items?page=7>; rel="last"'})) == 7
+    assert page_count(Response([])) is None
+    assert has_next(Response([], {'Link': '<https://x?page=2>; rel="next"'}))
+    assert not has_next(Response([], {'Link': '<https://x?page=1>; rel="prev"'}))
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from _freshservice_records import (COMPRESS_OVER, Asset, Record, RecordTable, Requester,
+                                   _decode, _encode)
+
+
+@pytest.mark.parametrize('value', [
+    None, True, False, 0, -7, 2 ** 40, 1.5, '', 'short', 'x' * 64,
+    'x' * 65, 'é' * 200, 'y' * (COMPRESS_OVER * 4),
+    {}, [], {'a': 1, 'b': [1, 2, None]}, ['ü', {'nested': {'deep': 'x' * 500}}],
+])
+def test_encode_decode_round_trip(value):
+    assert _decode(_encode(value)) == value
+
+
+def test_encode_leaves_small_values_alone_and_compresses_large_ones():
+    assert _encode('x' * 64) == 'x' * 64
+    assert _encode('x' * 65)[:1] == b's'
+    assert _encode('x' * (COMPRESS_OVER + 1))[:1] == b'S'
+    assert _encode({'a': 1})[:1] == b'j'
+    assert _encode({'a': 'x' * COMPRESS_OVER})[:1] == b'J'
+
+
+REQUESTER = {
+    'id': 42, 'first_name': 'Ann', 'last_name': 'Lee', 'primary_email': 'ann@example.com',
+    'custom_fields': {'cost_centre': 'CC-1', 'notes': 'n' * 1000}, 'job_title': 'Engineer',
+    'unknown_field': {'kept': True}, 'address': None, 'department_ids': [1, 2, 3],
+    'background_information': 'b' * 300, 'active': True, 'updated_at': '2024-01-02T03:04:05Z',
+}
+
+
+@pytest.mark.parametrize('record_class', [Record, Requester, Asset])
+def test_record_to_dict_round_trip_keeps_key_order(record_class):
+    record = record_class.from_dict(REQUESTER)
+    assert record.to_dict() == REQUESTER
+    assert list(record.to_dict()) == list(REQUESTER)
+    assert json.dumps(record.to_dict()) == json.dumps(REQUESTER)
+
+
+def test_record_access():
+    record = Requester.from_dict(REQUESTER)
+    assert record.id == 42
+    assert record.custom_fields == REQUESTER['custom_fields']
+    assert record['unknown_field'] == {'kept': True}
+    assert record.get('address') is None
+    assert record.get('missing', 'default') == 'default'
+    assert 'job_title' in record and 'missing' not in record
+    with pytest.raises(KeyError):
+        record['missing']
+
+
+def test_known_fields_missing_from_the_record_are_not_added():
+    record = Asset.from_dict({'id': 1, 'name': 'laptop'})
+    assert record.to_dict() == {'id': 1, 'name': 'laptop'}
+    assert record.get('description') is None
+
+
+def test_record_table_replaces_duplicates_in_place():
+    table = RecordTable(Requester)
+    assert table.extend([{'id': 1, 'first_name': 'a'}, {'id': 2, 'first_name': 'b'}]) == 2
+    table.add({'id': 1, 'first_name': 'c'})
+    assert len(table) == 2
+    assert [record.first_name for record in table] == ['c', 'b']
+    assert 2 in table and 3 not in table
+    assert table.get(1).first_name == 'c' and table.get(3) is None
@@ -0,0 +1,121 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from _freshservice_tickets import (TicketWriter, compact, fetch_window, format_time, initial_windows,
+                                   parse_time)
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def ticket(id, at, **fields):
+    return {'id': id, 'updated_at': format_time(at), **fields}
+
+
+class Stream:
+    def __init__(self):
+        self.records = []
+
+    def write_page(self, records):
+        self.records += records
+
+
+def source(tickets, per_page=2, order=True):
+    """pages_for over `tickets`: those updated since start, sorted by updated_at unless order=False."""
+    requested = []
+
+    def pages_for(start):
+        requested.append(start)
+        selected = [t for t in tickets if parse_time(t['updated_at']) >= start]
+        if order:
+            selected.sort(key=lambda t: (t['updated_at'], t['id']))
+        for page in range(1, len(selected) // per_page + 2):
+            chunk = selected[(page - 1) * per_page:page * per_page]
+            yield page, {'tickets': chunk}
+            if len(chunk) < per_page:
+                return
+
+    pages_for.requested = requested
+    return pages_for
+
+
+def run(tickets, windows, max_pages=100, **kwargs):
+    """Walks the windows (and the halves of dense ones) one at a time, like run_windows."""
+    writer = TicketWriter(Stream())
+    pages_for = source(tickets, **kwargs)
+    queue, walked = list(windows), []
+    while queue:
+        start, end = queue.pop(0)
+        walked.append((start, end))
+        queue += fetch_window(start, end, writer, pages_for, max_pages)
+    return writer, walked
+
+
+def test_initial_windows_cover_the_range():
+    windows = initial_windows(T0, T0 + timedelta(days=65), 30)
+    assert windows == [(T0, T0 + timedelta(days=30)), (T0 + timedelta(days=30), T0 + timedelta(days=60)),
+                       (T0 + timedelta(days=60), T0 + timedelta(days=65))]
+
+
+def test_window_stops_at_its_end():
+    tickets = [ticket(i, T0 + timedelta(hours=i)) for i in range(10)]
+    writer, _ = run(tickets, [(T0, T0 + timedelta(hours=4))])
+    assert [t['id'] for t in writer.stream.records] == [0, 1, 2, 3]
+
+
+def test_dense_window_is_split_and_nothing_is_lost():
+    tickets = [ticket(i, T0 + timedelta(minutes=i)) for i in range(40)]
+    writer, walked = run(tickets, [(T0, T0 + timedelta(hours=1))], max_pages=3)
+    assert len(walked) > 1
+    assert sorted(t['id'] for t in writer.stream.records) == list(range(40))
+    assert writer.duplicates >= 1      # the boundary ticket is fetched again by the next window
+
+
+def test_split_windows_cover_the_rest_of_the_window():
+    tickets = [ticket(i, T0 + timedelta(minutes=i)) for i in range(10)]
+    writer = TicketWriter(Stream())
+    rest = fetch_window(T0, T0 + timedelta(hours=1), writer, source(tickets), max_pages=2)
+    assert rest[0][0] == T0 + timedelta(minutes=3) and rest[-1][1] == T0 + timedelta(hours=1)
+    assert rest[0][1] == rest[-1][0]
+
+
+def test_pages_out_of_updated_at_order_raise():
+    tickets = [ticket(1, T0 + timedelta(hours=5)), ticket(2, T0 + timedelta(hours=1)), ticket(3, T0)]
+    with pytest.raises(RuntimeError, match='not in updated_at order'):
+        run(tickets, [(T0, T0 + timedelta(hours=2))], order=False)
+
+
+def test_error_page_raises():
+    def pages_for(start):
+        yield 1, {'code': 'access_denied'}
+    with pytest.raises(RuntimeError, match='failed'):
+        fetch_window(T0, T0 + timedelta(days=1), TicketWriter(Stream()), pages_for, 10)
+
+
+def test_writer_keeps_the_newest_copy_and_compact_drops_the_older_one(tmp_path):
+    path = str(tmp_path / 'tickets.ndjson.gz')
+
+    class File:
+        def __init__(self):
+            self.file = gzip.open(path, 'wt', encoding='utf-8')
+
+        def write_page(self, records):
+            for record in records:
+                self.file.write(json.dumps(record) + '\n')
+
+    stream = File()
+    writer = TicketWriter(stream)
+    writer.write([ticket(1, T0, v='a'), ticket(2, T0)])
+    writer.write([ticket(1, T0)])                                       # same copy again
+    writer.write([ticket(1, T0 + timedelta(hours=1), v='b')])           # newer copy
+    writer.write([ticket(1, T0, v='a')])                                # older copy after the newer one
+    stream.file.close()
+
+    assert writer.duplicates == 2
+    assert writer.superseded == {1: {format_time(T0)}}
+    compact(path, writer.superseded, 'gzip')
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        lines = [json.loads(line) for line in file]
+    assert [(t['id'], t.get('v')) for t in lines] == [(2, None), (1, 'b')]
@@ -0,0 +1,70 @@
+import io
+import json
+
+import pytest
+
+import _freshstatus_json
+from _freshstatus_json import _builtin_records, iter_records
+
+DOCUMENTS = [
+    '{"groups": [1.5,2,-3.25e+2,1E-2,0,10,-0.5e3], "services": []}',
+    '{"groups": [{"id": 12345, "name": "Caf\\u00e9 \\"A\\"", "order": 1.125}, true, false, null],'
+    ' "meta": {"skip": [1, 2]}, "services": [{"id": 1, "tags": ["über", "☃"], "n": 9.75e-1}]}',
+    ' { "groups" : [ ] , "services" : [ [ 1 , [ 2.0 ] ] , "x" , 123456789012 ] } ',
+    '\ufeff{"services": [100, 2.5e10]}',
+]
+
+
+class Pieces:
+    """A stream returning the given pieces, one per read() whatever size is asked for."""
+
+    def __init__(self, *pieces):
+        self.end = pieces[0][:0]
+        self.pieces = [piece for piece in pieces if piece]
+
+    def read(self, size=-1):
+        return self.pieces.pop(0) if self.pieces else self.end
+
+
+def _expected(document):
+    data = json.loads(document.lstrip('\ufeff'))
+    return [(key, item) for key, value in data.items() if isinstance(value, list) for item in value]
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+@pytest.mark.parametrize('as_bytes', [False, True])
+def test_split_at_every_boundary(document, as_bytes):
+    if not as_bytes and document.startswith('\ufeff'):
+        pytest.skip('text streams come without the BOM')
+    data = document.encode('utf-8') if as_bytes else document
+    expected = _expected(document)
+    for cut in range(len(data) + 1):
+        records = list(_builtin_records(Pieces(data[:cut], data[cut:]), None))
+        assert records == expected, f"cut at {cut}: {data[:cut]!r} | {data[cut:]!r}"
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_one_byte_at_a_time(document):
+    data = document.encode('utf-8')
+    records = list(_builtin_records(Pieces(*(data[i:i + 1] for i in range(len(data)))), None))
+    assert records == _expected(document)
+
+
+def test_number_cut_after_the_point():
+    assert list(_builtin_records(Pieces('{"groups": [1.', '5,2]}'), None)) == [('groups', 1.5), ('groups', 2)]
+    assert list(_builtin_records(Pieces('{"groups": [1e', '-2]}'), None)) == [('groups', 0.01)]
+
+
+def test_keys_filter_and_backends_agree(monkeypatch):
+    document = DOCUMENTS[1]
+    wanted = [(key, item) for key, item in _expected(document) if key == 'services']
+    for name in ('builtin', 'orjson', 'ijson'):
+        monkeypatch.setenv('JSON_BACKEND', name)
+        if _freshstatus_json.backend() != name:
+            continue
+        assert list(iter_records(io.BytesIO(document.encode('utf-8')), ['services'])) == wanted
+
+
+def test_truncated_document_raises():
+    with pytest.raises(json.JSONDecodeError):
+        list(_builtin_records(Pieces('{"groups": [1, 2'), None))
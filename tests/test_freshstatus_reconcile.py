@@ -0,0 +1,75 @@
+from _freshstatus_reconcile import CREATE, SKIP, UPDATE, _parent_first, reconcile, service_payload
+
+
+def group(id, name, parent=None, order=0):
+    return {'id': id, 'name': name, 'parent': parent, 'order': order}
+
+
+def service(id, name, group=None, **fields):
+    return {'id': id, 'name': name, 'group': group, **fields}
+
+
+def test_groups_are_created_updated_or_skipped_by_name_and_parent():
+    target = {'groups': [group(1, 'Web', order=1), group(2, 'API', order=2), group(3, 'EU', parent=1)]}
+    backup = {'groups': [group(10, 'Web', order=1), group(11, 'API', order=5), group(12, 'EU', parent=11),
+                         group(13, 'EU', parent=10)]}
+    plan = reconcile(target, backup)
+    actions = {item['key']: (item['action'], item['target_id']) for item in plan.groups}
+    assert actions == {('Web', None): (SKIP, 1), ('API', None): (UPDATE, 2),
+                       ('EU', 'API'): (CREATE, None), ('EU', 'Web'): (SKIP, 3)}
+    assert plan.actions('groups', UPDATE)[0]['changes'] == {'order': {'from': 2, 'to': 5}}
+
+
+def test_groups_are_planned_parent_first():
+    # Backup lists the grandchild first; the plan must create the chain top-down
+    backup = {'groups': [group(3, 'C', parent=2), group(2, 'B', parent=1), group(1, 'A'), group(4, 'D')]}
+    plan = reconcile({'groups': []}, backup)
+    assert [item['key'] for item in plan.groups] == [('A', None), ('B', 'A'), ('C', 'B'), ('D', None)]
+    assert [item['parent_key'] for item in plan.groups] == [None, ('A', None), ('B', 'A'), None]
+
+
+def test_parent_first_keeps_order_and_handles_missing_parents():
+    items = [{'key': 'c', 'parent_key': 'b'}, {'key': 'x', 'parent_key': 'not planned'},
+             {'key': 'b', 'parent_key': 'a'}, {'key': 'a', 'parent_key': None}]
+    assert [item['key'] for item in _parent_first(items)] == ['a', 'b', 'c', 'x']
+
+
+def test_duplicate_backup_records_are_planned_once():
+    backup = {'groups': [group(1, 'A'), group(2, 'A')],
+              'services': [service(1, 'S', description='one'), service(2, 'S', description='two')]}
+    plan = reconcile({}, backup)
+    assert len(plan.groups) == 1 and len(plan.services) == 1
+    assert plan.services[0]['source']['description'] == 'one'
+
+
+def test_service_groups_resolve_to_existing_or_planned_groups():
+    target = {'groups': [group(1, 'Web')],
+              'services': [service(5, 'Login', {'id': 1, 'name': 'Web'}, description='old', order=1)]}
+    backup = {'groups': [group(10, 'Web'), group(11, 'API')],
+              'services': [service(20, 'Login', {'id': 10, 'name': 'Web'}, description='new', order=1),
+                           service(21, 'Tokens', {'id': 11, 'name': 'API'}),
+                           service(22, 'Status'),
+                           service(23, 'Search', {'id': 99, 'name': 'Web'})]}
+    plan = reconcile(target, backup)
+    by_name = {item['source']['name']: item for item in plan.services}
+
+    assert by_name['Login']['action'] == UPDATE and by_name['Login']['target_id'] == 5
+    assert by_name['Login']['changes'] == {'description': {'from': 'old', 'to': 'new'}}
+    assert by_name['Login']['group_id'] == 1
+    assert by_name['Tokens']['action'] == CREATE
+    assert by_name['Tokens']['group_key'] == ('API', None) and by_name['Tokens']['group_id'] is None
+    assert by_name['Status']['group_key'] is None and by_name['Status']['group_id'] is None
+    # A group the backup does not list is matched on its name alone
+    assert by_name['Search']['group_id'] == 1
+
+    assert service_payload(by_name['Tokens'], 42) == {'name': 'Tokens', 'group': 42}
+    assert service_payload(by_name['Login'])['group'] == 1
+
+
+def test_noop_plan_and_sources_are_not_modified():
+    data = {'groups': [group(1, 'Web')], 'services': [service(1, 'Login', {'id': 1, 'name': 'Web'})]}
+    snapshot = repr(data)
+    plan = reconcile(data, data)
+    assert plan.is_noop()
+    assert repr(data) == snapshot
+    assert plan.to_dict() == {'groups': [], 'services': []}
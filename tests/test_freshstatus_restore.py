@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+import _freshstatus_restore
+from _freshstatus_reconcile import reconcile
+from _freshstatus_restore import group_levels, restore
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.reason = 'Created' if status_code == 201 else 'Error'
+        self.content = b'{}'
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Fake make_api_request: records the calls, creates ids, fails the group names listed in api.fail."""
+    class Api:
+        calls = []
+        created = {}
+        fail = set()
+        next_id = 100
+        lock = threading.Lock()
+
+        def request(self, resource, mode='GET', acct=None, payload=None):
+            with self.lock:
+                self.calls.append((mode, resource, dict(payload or {})))
+                if payload and payload.get('name') in self.fail:
+                    return Response(500)
+                if mode == 'POST':
+                    self.next_id += 1
+                    self.created[payload['name']] = self.next_id
+                    return Response(201, {'id': self.next_id, **payload})
+                return Response(200, payload)
+
+    instance = Api()
+    instance.calls, instance.created, instance.fail = [], {}, set()
+    monkeypatch.setattr(_freshstatus_restore, 'make_api_request', instance.request)
+    return instance
+
+
+def group(id, name, parent=None):
+    return {'id': id, 'name': name, 'parent': parent, 'order': id}
+
+
+BACKUP = {
+    'groups': [group(4, 'Leaf', parent=3), group(3, 'Mid', parent=1), group(1, 'Root'), group(2, 'Other')],
+    'services': [{'id': 9, 'name': 'S1', 'group': {'id': 4, 'name': 'Leaf'}},
+                 {'id': 8, 'name': 'S2', 'group': {'id': 2, 'name': 'Other'}}],
+}
+
+
+def test_group_levels():
+    plan = reconcile({}, BACKUP)
+    assert [[item['key'][0] for item in level] for level in group_levels(plan.groups)] == \
+        [['Root', 'Other'], ['Mid'], ['Leaf']]
+
+
+def test_groups_are_created_before_their_children(api):
+    result = restore(reconcile({}, BACKUP), 'acct', max_workers=4)
+    assert result.ok, result.summary()
+    posts = [(resource, payload) for mode, resource, payload in api.calls if mode == 'POST']
+    groups = [payload['name'] for resource, payload in posts if resource == 'groups/']
+    assert groups.index('Root') < groups.index('Mid') < groups.index('Leaf')
+
+    ids = api.created
+    parents = {payload['name']: payload['parent_id'] for resource, payload in posts if resource == 'groups/'}
+    assert parents == {'Root': None, 'Other': None, 'Mid': ids['Root'], 'Leaf': ids['Mid']}
+    services = {payload['name']: payload['group'] for resource, payload in posts if resource == 'services/'}
+    assert services == {'S1': ids['Leaf'], 'S2': ids['Other']}
+    assert result.created == {'groups': 4, 'services': 2}
+
+
+def test_failed_group_skips_its_subtree_only(api):
+    api.fail = {'Mid'}
+    result = restore(reconcile({}, BACKUP), 'acct', max_workers=2)
+    failed = {(f['kind'], f['name']) for f in result.failures}
+    assert failed == {('groups', 'Mid'), ('groups', 'Leaf'), ('services', 'S1')}
+    assert [payload['name'] for mode, resource, payload in api.calls if mode == 'POST'].count('Leaf') == 0
+    assert result.created == {'groups': 2, 'services': 1}
+
+
+def test_existing_groups_are_updated_in_place(api):
+    target = {'groups': [{'id': 7, 'name': 'Root', 'parent': None, 'order': 0}]}
+    result = restore(reconcile(target, {'groups': [group(1, 'Root'), group(3, 'Mid', parent=1)]}), 'acct')
+    assert result.ok
+    assert ('PUT', 'groups/7/', {'name': 'Root', 'parent_id': None, 'order': 1}) in api.calls
+    assert ('POST', 'groups/', {'name': 'Mid', 'parent_id': 7, 'order': 3}) in api.calls